@@ -0,0 +1,155 @@
+"""Lista de espera: quando um horário vaga, oferece na hora a quem está esperando.
+
+1. O cliente entra na lista pela página pública: serviço, profissional (ou
+   qualquer um), janela de datas e faixa de horário preferida.
+2. Cancelar ou apagar um agendamento ativo enfileira `booking.oferecer_vaga`
+   com o trecho liberado (booking/signals.py), depois do commit.
+3. A tarefa busca as candidatas pelo índice parcial (salão, serviço,
+   data_fim) das entradas que aguardam — nunca varre a lista —, confere na
+   Agenda o que está livre de verdade e enfileira um aviso por candidata
+   (`booking.avisar_espera`), até LISTA_ESPERA_AVISOS_POR_VAGA.
+4. Todos os avisados recebem o mesmo horário e quem confirmar primeiro leva:
+   `confirmar_vaga` reserva pelo caminho atômico de booking.reservas (agenda
+   do profissional travada) e os demais recebem HorarioIndisponivel.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Salon
+from jobs.fila import enfileirar
+from scheduling.agenda import Agenda, hhmm, minutos
+from scheduling.models import Professional, WaitlistEntry
+from .reservas import HorarioIndisponivel, reservar_horario, travar_agenda
+
+
+class EntradaIndisponivel(Exception):
+    """A entrada não existe, já foi atendida/cancelada ou não aceita o horário pedido."""
+
+
+def dias_maximos():
+    return getattr(settings, 'LISTA_ESPERA_DIAS_MAXIMO', 60)
+
+
+def candidatas(salon_id, professional_id, data):
+    """Entradas que aguardam uma vaga desse profissional nesse dia, da mais antiga para a mais nova."""
+    servicos = Professional.services.through.objects.filter(professional_id=professional_id).values('service_id')
+    return (
+        WaitlistEntry.objects
+        .filter(salon_id=salon_id, status=WaitlistEntry.AGUARDANDO, service_id__in=servicos, data_fim__gte=data, data_inicio__lte=data)
+        .filter(Q(professional_id=professional_id) | Q(professional__isnull=True))
+        .select_related('service')
+        .order_by('created_at', 'id')
+    )
+
+
+def aceita(entrada, professional_id, data, inicio):
+    """A entrada aceita começar às `inicio` (minutos) nesse profissional/dia?"""
+    if entrada.professional_id and entrada.professional_id != professional_id:
+        return False
+    if not entrada.data_inicio <= data <= entrada.data_fim:
+        return False
+    fim = inicio + entrada.service.duracao_minutos
+    de = minutos(entrada.hora_inicio) if entrada.hora_inicio else 0
+    ate = minutos(entrada.hora_fim) if entrada.hora_fim else 24 * 60
+    return de <= inicio and fim <= ate
+
+
+def horario_para(entrada, professional_id, data, livres, inicio, fim, passo, depois_de=None):
+    """Primeiro início dentro do trecho liberado [inicio, fim) em que o serviço cabe e a entrada aceita, ou None."""
+    duracao = entrada.service.duracao_minutos
+    t = inicio
+    while t < fim:
+        if (depois_de is None or t > depois_de) and aceita(entrada, professional_id, data, t) \
+                and any(i <= t and t + duracao <= f for i, f in livres):
+            return t
+        t += passo
+    return None
+
+
+def oferecer_vaga(salon_id, professional_id, data, inicio, fim):
+    """Casa o trecho liberado com a lista de espera e enfileira os avisos. Retorna quantos foram avisados."""
+    agora = timezone.localtime()
+    if data < agora.date():
+        return 0
+    salao = Salon.objects.filter(pk=salon_id).first()
+    if salao is None:
+        return 0
+    agenda = Agenda(salao, data, data, profissionais=[professional_id], holds=True)
+    if not agenda.profissionais:
+        return 0
+    depois_de = minutos(agora.time()) if data == agora.date() else None
+    limite = getattr(settings, 'LISTA_ESPERA_AVISOS_POR_VAGA', 5)
+
+    livres_por_servico = {}
+    avisados = 0
+    for entrada in candidatas(salon_id, professional_id, data).iterator(chunk_size=100):
+        if entrada.service_id not in livres_por_servico:
+            livres_por_servico[entrada.service_id] = agenda.livres_para(professional_id, data, entrada.service)
+        t = horario_para(entrada, professional_id, data, livres_por_servico[entrada.service_id], inicio, fim,
+                         salao.intervalo_minutos, depois_de)
+        if t is None:
+            continue
+        enfileirar(
+            'booking.avisar_espera',
+            {'entrada_id': entrada.id, 'professional_id': professional_id, 'data': data.isoformat(), 'horario': hhmm(t)},
+            salon=salon_id, chave=f"espera:{entrada.id}:{professional_id}:{data.isoformat()}:{t}",
+        )
+        avisados += 1
+        if avisados >= limite:
+            break
+    return avisados
+
+
+def vaga_liberada(appt, duracao):
+    """Chamado quando um agendamento ativo deixa de ocupar a agenda (cancelado ou apagado)."""
+    data = type(appt)._meta.get_field('data').to_python(appt.data)
+    inicio = minutos(type(appt)._meta.get_field('hora_inicio').to_python(appt.hora_inicio))
+    if data < timezone.localdate():
+        return
+    enfileirar(
+        'booking.oferecer_vaga',
+        {'salon_id': appt.salon_id, 'professional_id': appt.professional_id, 'data': data.isoformat(), 'inicio': inicio, 'fim': inicio + duracao},
+        salon=appt.salon_id, chave=f"vaga:{appt.professional_id}:{data.isoformat()}:{inicio}",
+    )
+
+
+def entrar(salao, service, professional, cliente_nome, cliente_whatsapp, data_inicio, data_fim, hora_inicio=None, hora_fim=None):
+    """Cria a entrada. Levanta ValueError com a mensagem para o cliente se o pedido for inválido."""
+    hoje = timezone.localdate()
+    if data_inicio < hoje:
+        data_inicio = hoje
+    if data_fim < data_inicio:
+        raise ValueError("a data final precisa ser depois da inicial")
+    if data_fim > hoje + timedelta(days=dias_maximos()):
+        raise ValueError(f"a lista de espera vale para até {dias_maximos()} dias à frente")
+    if (hora_inicio is None) != (hora_fim is None) or (hora_inicio and hora_inicio >= hora_fim):
+        raise ValueError("faixa de horário inválida")
+    if professional is not None and not professional.services.filter(pk=service.pk).exists():
+        raise ValueError("o profissional não faz esse serviço")
+    return WaitlistEntry.objects.create(
+        salon=salao, service=service, professional=professional, cliente_nome=cliente_nome, cliente_whatsapp=cliente_whatsapp,
+        data_inicio=data_inicio, data_fim=data_fim, hora_inicio=hora_inicio, hora_fim=hora_fim,
+    )
+
+
+def confirmar_vaga(salao, token, prof, date_obj, time_obj):
+    """Reserva a vaga oferecida para a entrada. O primeiro a confirmar leva; os outros recebem HorarioIndisponivel."""
+    with transaction.atomic():
+        # Agenda travada antes de tudo (no SQLite, a transação começa com uma escrita)
+        travar_agenda(prof.id, date_obj)
+        entrada = WaitlistEntry.objects.select_for_update(of=('self',)).select_related('service').filter(salon=salao, token=token).first()
+        if entrada is None or entrada.status != WaitlistEntry.AGUARDANDO:
+            raise EntradaIndisponivel("Essa inscrição na lista de espera não está mais ativa.")
+        if not aceita(entrada, prof.id, date_obj, minutos(time_obj)) or not prof.services.filter(pk=entrada.service_id).exists():
+            raise EntradaIndisponivel("Esse horário não corresponde à sua inscrição na lista de espera.")
+        agora = timezone.localtime()
+        if (date_obj, time_obj) <= (agora.date(), agora.time()):
+            raise HorarioIndisponivel()
+        appt = reservar_horario(salao, prof, entrada.service, date_obj, time_obj, entrada.cliente_nome, entrada.cliente_whatsapp)
+        entrada.status, entrada.appointment = WaitlistEntry.ATENDIDO, appt
+        entrada.save(update_fields=['status', 'appointment'])
+    return appt
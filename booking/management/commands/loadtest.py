@@ -0,0 +1,188 @@
+import asyncio
+import json
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+_JSON_SCRIPT = r'<script id="{}" type="application/json">(.*?)</script>'
+
+
+def _percentil(valores, q):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(q * len(valores)))] * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Gerador de carga do fluxo público de agendamento contra um servidor rodando "
+        "(ex: http://localhost:8000). Cada usuário virtual abre /agendar/<slug>, escolhe um "
+        "serviço, consulta profissionais-por-servico, sonda alguns dias de disponibilidade e "
+        "confirma um horário. Requer httpx. Todos os usuários saem do mesmo IP: rode o servidor "
+        "com LIMITES_REQUISICAO = {} para não medir só respostas 429."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("slug", help="Slug do salão alvo")
+        parser.add_argument("--url", default="http://localhost:8000", help="Base do servidor")
+        parser.add_argument("--usuarios", type=int, default=20, help="Usuários virtuais simultâneos")
+        parser.add_argument("--rampa", type=float, default=10.0, help="Segundos até todos os usuários estarem ativos")
+        parser.add_argument("--duracao", type=float, default=60.0, help="Duração do teste em segundos")
+        parser.add_argument("--dias", type=int, default=3, help="Dias de disponibilidade sondados por sessão")
+        parser.add_argument("--pausa", type=float, default=0.5, help="Pausa média (s) entre passos, simulando o cliente")
+        parser.add_argument("--sem-agendar", action="store_true", help="Só navega, não confirma agendamentos")
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            raise CommandError("O loadtest precisa do httpx: pip install httpx")
+        self.opts = options
+        self._validar_alvo()
+        self.latencias = defaultdict(list)
+        self.status = defaultdict(Counter)
+        self.sessoes = Counter()
+        asyncio.run(self._executar())
+        self._relatorio()
+
+    def _validar_alvo(self):
+        """Confere uma vez, antes de abrir os usuários, que a página do salão responde e tem serviços."""
+        import httpx
+
+        url = f"{self.opts['url'].rstrip('/')}/agendar/{self.opts['slug']}"
+        try:
+            pagina = httpx.get(url, timeout=self.opts["timeout"])
+        except httpx.HTTPError as exc:
+            raise CommandError(f"Não foi possível abrir {url}: {type(exc).__name__}")
+        if pagina.status_code != 200:
+            raise CommandError(f"{url} respondeu HTTP {pagina.status_code}")
+        if not self._json_da_pagina(pagina.text, "SERVICOS_JSON"):
+            raise CommandError("A página do salão não tem serviços cadastrados")
+
+    # --- execução ---
+
+    async def _executar(self):
+        import httpx
+
+        o = self.opts
+        limites = httpx.Limits(max_connections=o["usuarios"] * 2, max_keepalive_connections=o["usuarios"])
+        async with httpx.AsyncClient(base_url=o["url"], timeout=o["timeout"], limits=limites) as cliente:
+            self.inicio = time.perf_counter()
+            self.fim_previsto = self.inicio + o["duracao"]
+            passo_rampa = o["rampa"] / max(1, o["usuarios"])
+            tarefas = [asyncio.create_task(self._usuario(cliente, i * passo_rampa)) for i in range(o["usuarios"])]
+            await asyncio.gather(*tarefas)
+            self.total = time.perf_counter() - self.inicio
+
+    async def _requisicao(self, cliente, etapa, metodo, url, **kwargs):
+        import httpx
+
+        t0 = time.perf_counter()
+        try:
+            resposta = await cliente.request(metodo, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.status[etapa][type(exc).__name__] += 1
+            return None
+        self.latencias[etapa].append(time.perf_counter() - t0)
+        self.status[etapa][resposta.status_code] += 1
+        return resposta
+
+    async def _pausa(self):
+        if self.opts["pausa"]:
+            await asyncio.sleep(random.expovariate(1 / self.opts["pausa"]))
+
+    async def _usuario(self, cliente, atraso):
+        import httpx
+
+        await asyncio.sleep(atraso)
+        while time.perf_counter() < self.fim_previsto:
+            try:
+                resultado = await self._sessao(cliente)
+            except (httpx.HTTPError, ValueError):
+                # ValueError: resposta que não é o JSON esperado (ex: página de erro do proxy)
+                resultado = "erro"
+            self.sessoes[resultado] += 1
+
+    async def _sessao(self, cliente):
+        slug = self.opts["slug"]
+        base = f"/agendar/saloes/{slug}"
+
+        pagina = await self._requisicao(cliente, "pagina", "GET", f"/agendar/{slug}")
+        if pagina is None or pagina.status_code != 200:
+            return "erro"
+        servicos = self._json_da_pagina(pagina.text, "SERVICOS_JSON")
+        if not servicos:
+            return "erro"
+        servico = random.choice(servicos)
+        await self._pausa()
+
+        resp = await self._requisicao(cliente, "profissionais", "GET", f"{base}/profissionais-por-servico/{servico['id']}")
+        profissionais = resp.json() if resp is not None and resp.status_code == 200 else []
+        if not profissionais:
+            return "sem_profissional"
+        prof = random.choice(profissionais)
+        await self._pausa()
+
+        opcoes = []
+        hoje = date.today()
+        for offset in random.sample(range(0, 14), k=min(self.opts["dias"], 14)):
+            dia = (hoje + timedelta(days=offset)).isoformat()
+            resp = await self._requisicao(
+                cliente, "disponibilidade", "GET", f"{base}/disponibilidade/{dia}",
+                params={"service_id": servico["id"], "professional_id": prof["id"]},
+            )
+            if resp is not None and resp.status_code == 200:
+                for p in resp.json():
+                    opcoes.extend((dia, h) for h in p.get("horarios", []))
+            await self._pausa()
+
+        if not opcoes:
+            return "sem_horario"
+        if self.opts["sem_agendar"]:
+            return "navegou"
+
+        dia, horario = random.choice(opcoes)
+        n = random.randint(0, 99999999)
+        corpo = {
+            "servico_id": servico["id"], "profissional_id": prof["id"], "data": dia, "horario": horario,
+            "nome_cliente": f"Carga {n}", "whatsapp": f"(11) 9{n:08d}"[:16],
+        }
+        resp = await self._requisicao(cliente, "agendar", "POST", f"{base}/agendar", json=corpo)
+        if resp is None:
+            return "erro"
+        if resp.status_code == 409:
+            return "conflito"
+        return "agendou" if resp.status_code == 200 else "erro"
+
+    @staticmethod
+    def _json_da_pagina(html, elemento_id):
+        achado = re.search(_JSON_SCRIPT.format(elemento_id), html, re.S)
+        return json.loads(achado.group(1)) if achado else []
+
+    # --- relatório ---
+
+    def _relatorio(self):
+        total_req = sum(len(v) for v in self.latencias.values())
+        self.stdout.write(f"\nDuração: {self.total:.1f}s  usuários: {self.opts['usuarios']}  rampa: {self.opts['rampa']}s")
+        self.stdout.write(f"Requests: {total_req} ({total_req / self.total:.1f}/s)")
+        self.stdout.write(f"Sessões: {sum(self.sessoes.values())} ({sum(self.sessoes.values()) / self.total:.2f}/s) {dict(self.sessoes)}\n")
+
+        self.stdout.write(f"{'etapa':<16}{'n':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}  status")
+        for etapa in ("pagina", "profissionais", "disponibilidade", "agendar"):
+            lat = self.latencias.get(etapa, [])
+            if not lat and not self.status.get(etapa):
+                continue
+            self.stdout.write(
+                f"{etapa:<16}{len(lat):>7}{_percentil(lat, .5):>10.1f}{_percentil(lat, .9):>10.1f}"
+                f"{_percentil(lat, .99):>10.1f}{max(lat, default=0) * 1000:>10.1f}  {dict(self.status[etapa])}"
+            )
+
+        tentativas = self.sessoes["agendou"] + self.sessoes["conflito"]
+        if tentativas:
+            self.stdout.write(f"\nTaxa de conflito (409): {100 * self.sessoes['conflito'] / tentativas:.1f}% de {tentativas} confirmações")
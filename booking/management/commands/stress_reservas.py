@@ -0,0 +1,111 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dtime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from booking.reservas import HorarioIndisponivel, reservar_horario
+from core.models import Salon
+from scheduling.horarios import grade_do_salao, gravar_grade_do_salao
+from scheduling.models import Appointment, Professional, Service, WorkingHour
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de estresse do caminho de reserva: várias threads tentam agendar horários "
+        "sobrepostos (com durações diferentes) no mesmo profissional e dia. Cria um salão "
+        "temporário, verifica que não houve agendamentos sobrepostos e mostra a vazão. "
+        "Grava no banco configurado: rode contra um banco de teste (DATABASES apontando para "
+        "uma cópia); com DEBUG=False só roda com --permitir-producao."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--tentativas", type=int, default=400, help="Total de confirmações disparadas")
+        parser.add_argument("--manter", action="store_true", help="Não apaga o salão temporário no final")
+        parser.add_argument(
+            "--permitir-producao", action="store_true",
+            help="Roda mesmo com DEBUG=False (o salão temporário é criado no banco real)",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["permitir_producao"]:
+            raise CommandError(
+                "DEBUG=False: este comando cria um salão e centenas de agendamentos no banco configurado. "
+                "Use um banco de teste ou passe --permitir-producao."
+            )
+        salao = Salon.objects.create(nome="Stress", slug=f"stress-{uuid.uuid4().hex[:8]}")
+        try:
+            self._executar(salao, options)
+        finally:
+            if options["manter"]:
+                self.stdout.write(f"Salão temporário mantido: {salao.slug}")
+            else:
+                try:
+                    salao.delete()
+                except Exception as exc:
+                    self.stderr.write(f"Não foi possível apagar o salão temporário {salao.slug} (id {salao.pk}): {exc!r}")
+                    raise
+
+    def _executar(self, salao, options):
+        prof = Professional.objects.create(salon=salao, nome="Profissional Stress")
+        servicos = [Service.objects.create(salon=salao, nome=f"S{d}", preco=10, duracao_minutos=d) for d in (30, 60, 90)]
+        prof.services.set(servicos)
+        dia = date.today() + timedelta(days=7)
+        WorkingHour.objects.create(professional=prof, day_of_week=dia.weekday(), start_time="08:00", end_time="20:00")
+        salao.hora_abertura_padrao, salao.hora_fechamento_padrao = dtime(8), dtime(20)
+        salao.save()
+        gravar_grade_do_salao(salao, grade_do_salao(dtime(8), dtime(20)))
+
+        # Grade de 15 em 15 min: muitos pedidos se sobrepõem parcialmente
+        grade = [(datetime(2000, 1, 1, 8) + timedelta(minutes=15 * i)).time() for i in range(40)]
+        lock = threading.Lock()
+        resultado = {"ok": 0, "conflito": 0, "erro": 0}
+        latencias = []
+
+        def tentar(i):
+            close_old_connections()
+            svc = random.choice(servicos)
+            inicio = time.perf_counter()
+            try:
+                reservar_horario(salao, prof, svc, dia, random.choice(grade), f"Cliente {i}", "11999990000")
+                chave = "ok"
+            except HorarioIndisponivel:
+                chave = "conflito"
+            except Exception as exc:
+                chave = "erro"
+                self.stderr.write(f"  erro: {exc!r}")
+            finally:
+                close_old_connections()
+            with lock:
+                resultado[chave] += 1
+                latencias.append(time.perf_counter() - inicio)
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            list(pool.map(tentar, range(options["tentativas"])))
+        total = time.perf_counter() - t0
+
+        # Verificação: nenhum par de agendamentos do dia pode se sobrepor
+        agendados = sorted(
+            (datetime.combine(dia, a.hora_inicio), datetime.combine(dia, a.hora_inicio) + timedelta(minutes=a.service.duracao_minutos))
+            for a in Appointment.objects.ativos().filter(professional=prof, data=dia).select_related("service")
+        )
+        sobreposicoes = sum(1 for (_, fim), (ini, _) in zip(agendados, agendados[1:]) if ini < fim)
+
+        latencias.sort()
+        p = lambda q: latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000
+        self.stdout.write(
+            f"{options['tentativas']} confirmações em {total:.2f}s ({options['tentativas'] / total:.1f}/s) com {options['threads']} threads\n"
+            f"  reservados={resultado['ok']} conflitos={resultado['conflito']} erros={resultado['erro']}\n"
+            f"  latência p50={p(0.5):.1f}ms p95={p(0.95):.1f}ms p99={p(0.99):.1f}ms\n"
+            f"  agendamentos gravados={len(agendados)} sobreposições={sobreposicoes}"
+        )
+        if sobreposicoes or resultado["erro"]:
+            raise CommandError("Falha: houve agendamentos sobrepostos ou erros inesperados")
+        self.stdout.write(self.style.SUCCESS("OK: nenhuma reserva duplicada"))
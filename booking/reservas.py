@@ -0,0 +1,164 @@
+"""Caminho atômico de reserva de horários.
+
+Verificar disponibilidade e gravar o agendamento acontecem na mesma
+transação, com a agenda do profissional no dia travada (AgendaLock) e os
+recursos compartilhados que o serviço exige também travados. Assim
+duas confirmações simultâneas de horários que se sobrepõem — mesmo com
+durações diferentes, que o unique_together não pega — são serializadas e a
+segunda recebe HorarioIndisponivel.
+"""
+import random
+import string
+import uuid
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from scheduling.agenda import Agenda, minutos
+from scheduling.models import AgendaLock, Appointment, Resource, SlotHold
+
+
+class HorarioIndisponivel(Exception):
+    pass
+
+
+def travar_agenda(professional_id, data):
+    """Trava (professional, data) até o fim da transação atual.
+
+    O primeiro comando é um UPDATE de propósito: começar a transação com uma
+    escrita evita o deadlock de upgrade de lock do SQLite e, no Postgres,
+    já pega o lock da linha.
+    """
+    assert transaction.get_connection().in_atomic_block, "travar_agenda() precisa de transaction.atomic()"
+    travados = AgendaLock.objects.filter(professional_id=professional_id, data=data).update(versao=F('versao') + 1)
+    if travados:
+        return
+    try:
+        with transaction.atomic():
+            AgendaLock.objects.create(professional_id=professional_id, data=data, versao=1)
+    except IntegrityError:
+        # Outra transação criou a linha ao mesmo tempo: espera o lock dela
+        AgendaLock.objects.filter(professional_id=professional_id, data=data).update(versao=F('versao') + 1)
+
+
+def travar_recursos(services):
+    """Trava os recursos exigidos pelos serviços até o fim da transação.
+
+    Agendamentos de profissionais diferentes disputam o mesmo lavatório/sala,
+    e o lock por profissional não os serializa. No Postgres é um SELECT ...
+    FOR UPDATE nas linhas de Resource (em ordem de id, sem deadlock); no
+    SQLite a transação já tem o lock de escrita do banco.
+    """
+    ids = [s.id for s in services if s]
+    if ids:
+        list(Resource.objects.filter(services__id__in=ids).order_by('id').select_for_update().values_list('id', flat=True))
+
+
+def validar_token(token):
+    """UUID do hold ou None (tokens malformados são ignorados)."""
+    if not token:
+        return None
+    try:
+        return uuid.UUID(str(token))
+    except ValueError:
+        return None
+
+
+def criar_hold(salao, prof, svc, date_obj, time_obj):
+    """Pré-reserva o horário por HOLD_MINUTOS. Levanta HorarioIndisponivel."""
+    from .views import check_slot_availability
+
+    minutos = getattr(settings, 'HOLD_MINUTOS', 5)
+    with transaction.atomic():
+        travar_agenda(prof.id, date_obj)
+        travar_recursos([svc])
+        if not check_slot_availability(salao, prof, svc, date_obj, time_obj):
+            raise HorarioIndisponivel()
+        return SlotHold.objects.create(
+            salon=salao, professional=prof, service=svc, data=date_obj, hora_inicio=time_obj,
+            duracao_minutos=svc.duracao_minutos if svc else salao.intervalo_minutos,
+            expira_em=timezone.now() + timedelta(minutes=minutos),
+        )
+
+
+def liberar_hold(salao, token):
+    token = validar_token(token)
+    if token:
+        SlotHold.objects.filter(salon=salao, token=token).delete()
+
+
+def reservar_horario(salao, prof, svc, date_obj, time_obj, cliente_nome, cliente_whatsapp, hold_token=None):
+    """Cria o Appointment se o horário continuar livre. Levanta HorarioIndisponivel.
+
+    Com um `hold_token` válido para o mesmo horário, a pré-reserva do próprio
+    cliente não conta como conflito e é consumida.
+    """
+    from .views import check_slot_availability
+
+    token = validar_token(hold_token)
+    with transaction.atomic():
+        travar_agenda(prof.id, date_obj)
+        travar_recursos([svc])
+        hold = None
+        if token:
+            hold = SlotHold.objects.filter(
+                token=token, salon=salao, professional=prof, data=date_obj, hora_inicio=time_obj, expira_em__gt=timezone.now()
+            ).first()
+        if not check_slot_availability(salao, prof, svc, date_obj, time_obj, hold_token=hold.token if hold else None):
+            raise HorarioIndisponivel()
+
+        codigo = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        try:
+            with transaction.atomic():
+                appt = Appointment.objects.create(
+                    salon=salao, professional=prof, service=svc, cliente_nome=cliente_nome, cliente_whatsapp=cliente_whatsapp,
+                    data=date_obj, hora_inicio=time_obj, codigo_validacao=codigo,
+                )
+        except IntegrityError:
+            raise HorarioIndisponivel()
+        if hold:
+            hold.delete()
+    return appt
+
+
+def reservar_combo(salao, date_obj, time_obj, etapas, cliente_nome, cliente_whatsapp):
+    """Reserva a sequência de serviços [(svc, prof), ...] a partir de time_obj, tudo ou nada.
+
+    Os agendamentos compartilham `grupo` e código de validação. Levanta HorarioIndisponivel.
+    """
+    profs = sorted({prof.id for _, prof in etapas})
+    with transaction.atomic():
+        # Mesma ordem de travamento em todas as transações: sem deadlock entre combos
+        for prof_id in profs:
+            travar_agenda(prof_id, date_obj)
+        travar_recursos([svc for svc, _ in etapas])
+        agenda = Agenda(salao, date_obj, date_obj, profissionais=profs, holds=True)
+
+        cursor = minutos(time_obj)
+        horarios = []
+        for svc, prof in etapas:
+            if not agenda.cabe(prof.id, date_obj, cursor, svc.duracao_minutos, svc):
+                raise HorarioIndisponivel()
+            horarios.append(cursor)
+            cursor += svc.duracao_minutos
+
+        codigo = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        grupo = uuid.uuid4()
+        criados = []
+        try:
+            with transaction.atomic():
+                for (svc, prof), inicio in zip(etapas, horarios):
+                    criados.append(Appointment.objects.create(
+                        salon=salao, professional=prof, service=svc, cliente_nome=cliente_nome, cliente_whatsapp=cliente_whatsapp,
+                        data=date_obj, hora_inicio=time(inicio // 60, inicio % 60), codigo_validacao=codigo, grupo=grupo,
+                    ))
+        except IntegrityError:
+            raise HorarioIndisponivel()
+    return criados
+
+
+def limpar_holds_expirados():
+    return SlotHold.objects.filter(expira_em__lte=timezone.now()).delete()[0]
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from scheduling.agenda import DURACAO_PADRAO
+from scheduling.models import Appointment, Service
+from .lista_espera import vaga_liberada
+
+
+def _ja_passou(appt):
+    # to_python: o instance pode ter sido criado com strings ('2026-01-15')
+    return Appointment._meta.get_field('data').to_python(appt.data) < timezone.localdate()
+
+
+def _duracao(appt):
+    # Sem acessar appt.service: no post_delete o serviço pode já ter sido apagado
+    return Service.objects.filter(pk=appt.service_id).values_list('duracao_minutos', flat=True).first() or DURACAO_PADRAO
+
+
+# --- LISTA DE ESPERA (oferece o horário que vagou) ---
+
+@receiver(post_save, sender=Appointment)
+def _agendamento_cancelado(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created and instance.status == Appointment.CANCELADO \
+            and instance._status_original in Appointment.STATUS_ATIVOS and not _ja_passou(instance):
+        vaga_liberada(instance, _duracao(instance))
+
+
+@receiver(post_delete, sender=Appointment)
+def _agendamento_apagado(sender, instance, origin=None, **kwargs):
+    # Só quando o próprio agendamento é apagado; em cascata (salão, profissional) não há vaga a oferecer.
+    # Passados saem antes da consulta do serviço: o arquivamento apaga lotes de 500 ainda "agendados"
+    if getattr(origin, 'model', type(origin)) is Appointment and instance.status in Appointment.STATUS_ATIVOS \
+            and not _ja_passou(instance):
+        vaga_liberada(instance, _duracao(instance))
@@ -0,0 +1,88 @@
+from datetime import date, datetime
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from core import metricas
+from jobs.fila import tarefa
+from notifications.senders import get_sender
+from scheduling.models import Appointment, Professional, WaitlistEntry
+
+
+@tarefa('booking.enviar_confirmacao', max_tentativas=5)
+def enviar_confirmacao(appointment_id):
+    """Mensagem de confirmação para o cliente logo após o agendamento público."""
+    appt = Appointment.objects.select_related('salon', 'service', 'professional').filter(pk=appointment_id).first()
+    if appt is None:
+        return {'enviado': False, 'motivo': 'agendamento removido'}
+    if not appt.ativo:
+        return {'enviado': False, 'motivo': f'agendamento {appt.status}'}
+
+    servico = appt.service.nome if appt.service else 'atendimento'
+    profissional = appt.professional.nome
+    if appt.grupo:
+        # Combo: uma mensagem só, com os serviços em sequência
+        etapas = list(Appointment.objects.filter(grupo=appt.grupo).select_related('service', 'professional').order_by('hora_inicio'))
+        servico = ' + '.join(a.service.nome if a.service else 'atendimento' for a in etapas)
+        profissional = ' e '.join(dict.fromkeys(a.professional.nome for a in etapas))
+    mensagem = (
+        f"Olá, {appt.cliente_nome}! Seu agendamento de {servico} no {appt.salon.nome} "
+        f"com {profissional} em {appt.data.strftime('%d/%m/%Y')} às {appt.hora_inicio.strftime('%H:%M')} "
+        f"está confirmado. Código: {appt.codigo_validacao}"
+    )
+    id_externo = get_sender().enviar(appt.cliente_whatsapp, mensagem, salon_id=appt.salon_id, appointment_id=appt.id)
+    return {'enviado': True, 'id_externo': id_externo}
+
+
+@tarefa('booking.limpar_holds', max_tentativas=3)
+def limpar_holds():
+    """Remove pré-reservas vencidas (agendado para quando o hold mais recente expira)."""
+    from .reservas import limpar_holds_expirados
+    return {'removidos': limpar_holds_expirados()}
+
+
+@tarefa('booking.oferecer_vaga', max_tentativas=3)
+def oferecer_vaga(salon_id, professional_id, data, inicio, fim):
+    """Casa o horário que vagou com a lista de espera (booking/lista_espera.py)."""
+    from .lista_espera import oferecer_vaga as casar
+    return {'avisados': casar(salon_id, professional_id, date.fromisoformat(data), inicio, fim)}
+
+
+def url_publica(caminho):
+    """Link absoluto para mensagens. Sem URL_PUBLICA o link sairia relativo (inútil no WhatsApp): falha o job."""
+    base = getattr(settings, 'URL_PUBLICA', '').rstrip('/')
+    if not base.startswith(('http://', 'https://')):
+        raise ImproperlyConfigured("Defina URL_PUBLICA (ex: https://app.softskin.com.br) para enviar links nas mensagens.")
+    return base + caminho
+
+
+@tarefa('booking.avisar_espera', max_tentativas=5)
+def avisar_espera(entrada_id, professional_id, data, horario):
+    """Avisa um cliente da lista de espera que o horário abriu (se ainda estiver livre)."""
+    from .views import check_slot_availability
+    entrada = WaitlistEntry.objects.select_related('salon', 'service').filter(pk=entrada_id).first()
+    if entrada is None or entrada.status != WaitlistEntry.AGUARDANDO:
+        return {'enviado': False, 'motivo': 'fora da lista de espera'}
+    prof = Professional.objects.filter(pk=professional_id, salon=entrada.salon_id).first()
+    date_obj = date.fromisoformat(data)
+    time_obj = datetime.strptime(horario, "%H:%M").time()
+    if prof is None or not check_slot_availability(entrada.salon, prof, entrada.service, date_obj, time_obj):
+        return {'enviado': False, 'motivo': 'horário já ocupado'}
+
+    # A página pública lê estes parâmetros, mostra a vaga e confirma (static/js/agendar.js)
+    link = url_publica(reverse('agendar_publico', args=[entrada.salon.slug])) + '?' + urlencode({
+        'espera': entrada.token, 'profissional': prof.id, 'data': data, 'horario': horario,
+    })
+    mensagem = (
+        f"Olá, {entrada.cliente_nome}! Abriu um horário de {entrada.service.nome} no {entrada.salon.nome} "
+        f"com {prof.nome} em {date_obj.strftime('%d/%m/%Y')} às {horario}. "
+        f"Quem confirmar primeiro fica com a vaga: {link}"
+    )
+    id_externo = get_sender().enviar(entrada.cliente_whatsapp, mensagem, salon_id=entrada.salon_id)
+    WaitlistEntry.objects.filter(pk=entrada.pk).update(avisos=F('avisos') + 1, avisado_em=timezone.now())
+    metricas.AVISOS_LISTA_ESPERA.inc()
+    return {'enviado': True, 'id_externo': id_externo}
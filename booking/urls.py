@@ -6,7 +6,14 @@ urlpatterns = [
     path('<slug:slug>', views.pagina_agendamento, name='agendar_publico'),
     
     # APIs Públicas para o calendário
-    path('saloes/<slug:slug>/profissionais-por-servico/<int:service_id>', views.api_profissionais_por_servico),
-    path('saloes/<slug:slug>/disponibilidade/<str:data_iso>', views.api_disponibilidade),
-    path('saloes/<slug:slug>/agendar', views.api_confirmar_agendamento),
+    path('saloes/<slug:slug>/profissionais-por-servico/<int:service_id>', views.api_profissionais_por_servico, name='api_profissionais_por_servico'),
+    path('saloes/<slug:slug>/disponibilidade/<str:data_iso>', views.api_disponibilidade, name='api_disponibilidade'),
+    path('saloes/<slug:slug>/agendar', views.api_confirmar_agendamento, name='api_confirmar_agendamento'),
+    path('saloes/<slug:slug>/disponibilidade-combo/<str:data_iso>', views.api_disponibilidade_combo, name='api_disponibilidade_combo'),
+    path('saloes/<slug:slug>/agendar-combo', views.api_confirmar_combo, name='api_confirmar_combo'),
+    path('saloes/<slug:slug>/reservar', views.api_reservar_horario, name='api_reservar_horario'),
+    path('saloes/<slug:slug>/reservar/<str:token>', views.api_liberar_reserva, name='api_liberar_reserva'),
+    path('saloes/<slug:slug>/lista-espera', views.api_entrar_lista_espera, name='api_entrar_lista_espera'),
+    path('saloes/<slug:slug>/lista-espera/<uuid:token>', views.api_lista_espera, name='api_lista_espera'),
+    path('saloes/<slug:slug>/lista-espera/<uuid:token>/confirmar', views.api_confirmar_lista_espera, name='api_confirmar_lista_espera'),
 ]
\ No newline at end of file
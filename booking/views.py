@@ -1,88 +1,39 @@
 import json
-import random
-import string
-from datetime import datetime, timedelta
+from datetime import datetime, time
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
-from core.models import Salon
-from scheduling.models import Service, Professional, Appointment, Holiday, SpecialSchedule, WorkingHour, Category
+from core import metricas
+from core.limite import limitar
+from core.tenant import salao_da_url
+from jobs.fila import enfileirar
+from .lista_espera import EntradaIndisponivel, aceita, confirmar_vaga, entrar
+from .reservas import HorarioIndisponivel, criar_hold, liberar_hold, reservar_combo, reservar_horario
+from scheduling.models import Service, Professional, Holiday, SpecialSchedule, WorkingHour, Category, WaitlistEntry
+from scheduling.agenda import Agenda, hhmm, horarios_em_sequencia, horarios_semana, minutos
+from scheduling.materializacao import ler as ler_materializada
+from scheduling.miniaturas import url_miniatura
 
-# --- FUNÇÃO AUXILIAR (Mantida Igual) ---
-def check_slot_availability(salao, prof, svc, date_obj, slot_time_obj):
-    weekday = str(date_obj.weekday())
+# --- FUNÇÃO AUXILIAR ---
+def check_slot_availability(salao, prof, svc, date_obj, slot_time_obj, hold_token=None):
+    """O horário cabe na agenda pré-carregada do dia (expediente, pausas, feriados, folgas, agendamentos, holds e recursos)?"""
     duration = svc.duracao_minutos if svc else salao.intervalo_minutos
-    slot_start = slot_time_obj
-    dummy_date = datetime(2000, 1, 1, slot_start.hour, slot_start.minute)
-    slot_end_dt = dummy_date + timedelta(minutes=duration)
-    
-    if slot_end_dt.date() > dummy_date.date(): return False
-    if salao.dias_fechados and weekday in salao.dias_fechados.split(','): return False
-
-    abertura = salao.hora_abertura_padrao
-    fechamento = salao.hora_fechamento_padrao
-    if salao.horarios_customizados:
-        try:
-            c = salao.horarios_customizados
-            if isinstance(c, str): c = json.loads(c) if c.strip() else {}
-            if isinstance(c, dict) and weekday in c:
-                if c[weekday].get('inicio'): abertura = datetime.strptime(c[weekday]['inicio'], "%H:%M").time()
-                if c[weekday].get('fim'): fechamento = datetime.strptime(c[weekday]['fim'], "%H:%M").time()
-        except: pass
-
-    if slot_start < abertura or slot_end_dt.time() > fechamento: return False
-
-    feriados = Holiday.objects.filter(salon=salao, data=date_obj)
-    for f in feriados:
-        if not f.hora_inicio: return False
-        if f.hora_inicio and f.hora_fim:
-            if slot_start < f.hora_fim and slot_end_dt.time() > f.hora_inicio: return False
-
-    wh = WorkingHour.objects.filter(professional=prof, day_of_week=int(weekday)).first()
-    if not wh: return False
-    if slot_start < wh.start_time or slot_end_dt.time() > wh.end_time: return False
-
-    if hasattr(prof, 'intervalos') and prof.intervalos:
-        try:
-            intervals = prof.intervalos
-            if isinstance(intervals, str): intervals = json.loads(intervals) if intervals.strip() else []
-            if isinstance(intervals, list):
-                for interval in intervals:
-                    s_str = interval.get('start') or interval.get('inicio')
-                    e_str = interval.get('end') or interval.get('fim')
-                    if s_str and e_str:
-                        i_start = datetime.strptime(str(s_str)[:5], '%H:%M').time()
-                        i_end = datetime.strptime(str(e_str)[:5], '%H:%M').time()
-                        if slot_start < i_end and slot_end_dt.time() > i_start: return False
-        except: pass
-
-    if SpecialSchedule.objects.filter(salon=salao, professional=prof, data=date_obj, hora_inicio__isnull=True).exists(): return False
-    folgas = SpecialSchedule.objects.filter(salon=salao, professional=prof, data=date_obj, hora_inicio__isnull=False)
-    for folga in folgas:
-        if slot_start < folga.hora_fim and slot_end_dt.time() > folga.hora_inicio: return False
-
-    apps = Appointment.objects.filter(professional=prof, data=date_obj).exclude(status='cancelado') if hasattr(Appointment, 'status') else Appointment.objects.filter(professional=prof, data=date_obj)
-    for appt in apps:
-        dur = appt.service.duracao_minutos if appt.service else 30
-        a_dummy = datetime(2000, 1, 1, appt.hora_inicio.hour, appt.hora_inicio.minute)
-        a_end = (a_dummy + timedelta(minutes=dur)).time()
-        if slot_start < a_end and slot_end_dt.time() > appt.hora_inicio: return False
-            
-    return True
+    agenda = Agenda(salao, date_obj, date_obj, profissionais=[prof], holds=True)
+    return agenda.cabe(prof.id, date_obj, minutos(slot_time_obj), duration, svc, ignorar_hold=hold_token)
 
 # --- VIEWS PRINCIPAIS ---
 
 def pagina_agendamento(request, slug):
-    salao = get_object_or_404(Salon, slug=slug)
+    salao = salao_da_url(request, slug)
     servicos = list(Service.objects.filter(salon=salao).values())
     categorias = list(Category.objects.filter(salon=salao).values())
     
     feriados = [{'data': f.data.strftime('%Y-%m-%d')} for f in Holiday.objects.filter(salon=salao, hora_inicio__isnull=True)]
     folgas_globais = [{'data': f.data.strftime('%Y-%m-%d')} for f in SpecialSchedule.objects.filter(salon=salao, hora_inicio__isnull=True)]
     
-    dias_fechados = []
-    if salao.dias_fechados:
-        dias_fechados = [int(x) for x in salao.dias_fechados.split(',') if x.strip().isdigit()]
+    dias_fechados = [dia for dia, horario in enumerate(horarios_semana(salao)) if horario is None]
 
     endereco = {}
     try:
@@ -105,13 +56,15 @@ def pagina_agendamento(request, slug):
         profissionais_data.append({
             "id": p.id,
             "nome": p.nome,
-            "foto": p.foto.url if p.foto else None,
+            "foto": url_miniatura(p, 320),
+            "foto_jpg": url_miniatura(p, 320, 'jpg'),
             "servicos": list(p.services.values_list('id', flat=True)),
             "dias_trabalho": dias_trabalho, 
             "folgas": folgas_p
         })
     # -----------------------------------------------------
 
+    turnstile_site_key = getattr(settings, 'TURNSTILE_SITE_KEY', '')
     return render(request, "booking/agendar.html", {
         "salao": salao,
         "servicos": servicos,
@@ -120,69 +73,278 @@ def pagina_agendamento(request, slug):
         "folgas": folgas_globais,
         "dias_fechados": dias_fechados,
         "endereco": endereco,
-        "profissionais": profissionais_data
+        "profissionais": profissionais_data,
+        "turnstile_site_key": turnstile_site_key,
+        "config_js": {"slug": salao.slug, "turnstile_site_key": turnstile_site_key},
     })
 
 def api_profissionais_por_servico(request, slug, service_id):
-    salao = get_object_or_404(Salon, slug=slug)
+    salao = salao_da_url(request, slug)
     profs = Professional.objects.filter(salon=salao, services__id=service_id)
-    data = [{"id": p.id, "nome": p.nome, "foto_url": p.foto.url if p.foto else None} for p in profs]
+    data = [{"id": p.id, "nome": p.nome, "foto_url": url_miniatura(p, 320), "foto_url_jpg": url_miniatura(p, 320, 'jpg')} for p in profs]
     return JsonResponse(data, safe=False)
 
+@limitar('disponibilidade')
 def api_disponibilidade(request, slug, data_iso):
-    salao = get_object_or_404(Salon, slug=slug)
+    salao = salao_da_url(request, slug)
     try:
         service_id = int(request.GET.get('service_id', 0))
         prof_id = int(request.GET.get('professional_id', 0))
         date_obj = datetime.strptime(data_iso, "%Y-%m-%d").date()
     except: return JsonResponse([], safe=False)
 
-    svc = get_object_or_404(Service, id=service_id)
-    profs = Professional.objects.filter(id=prof_id, salon=salao)
-    resultado = []
-    
-    for prof in profs:
-        if Holiday.objects.filter(salon=salao, data=date_obj, hora_inicio__isnull=True).exists(): continue
-        if SpecialSchedule.objects.filter(salon=salao, professional=prof, data=date_obj, hora_inicio__isnull=True).exists(): continue
+    svc = get_object_or_404(Service, id=service_id, salon=salao)
+    # Salão com disponibilidade materializada: uma linha por profissional/dia.
+    # Sem ela (ou dia fora da janela), um único carregamento do dia pela Agenda.
+    lido = ler_materializada(salao, prof_id, date_obj, svc)
+    if lido is not None:
+        metricas.LEITURAS_MATERIALIZADAS.labels('hit').inc()
+        dias = [(prof_id, *lido)]
+    else:
+        if salao.disponibilidade_materializada:
+            metricas.LEITURAS_MATERIALIZADAS.labels('miss').inc()
+        agenda = Agenda(salao, date_obj, date_obj, profissionais=[prof_id], holds=True)
+        dias = []
+        for prof in agenda.profissionais:
+            wh = next((w for w in prof.working_hours.all() if w.day_of_week == date_obj.weekday()), None)
+            grade = (minutos(wh.start_time), minutos(wh.end_time)) if wh else None
+            dias.append((prof.id, prof.nome, grade, agenda.livres_para(prof.id, date_obj, svc)))
+            metricas.CALCULOS_DISPONIBILIDADE.inc()
 
-        weekday = date_obj.weekday()
-        wh = WorkingHour.objects.filter(professional=prof, day_of_week=weekday).first()
-        if not wh: continue
+    agora = datetime.now()
+    resultado = []
+    for id_prof, nome, grade, livres in dias:
+        if not grade: continue
 
         slots = []
-        current = datetime.combine(date_obj, wh.start_time)
-        end_work = datetime.combine(date_obj, wh.end_time)
+        current, end_work = grade
         step = salao.intervalo_minutos
+        avaliados = 0
         
-        while current + timedelta(minutes=svc.duracao_minutos) <= end_work:
-            t_obj = current.time()
-            if check_slot_availability(salao, prof, svc, date_obj, t_obj):
-                if date_obj > datetime.now().date() or (date_obj == datetime.now().date() and t_obj > datetime.now().time()):
-                    slots.append(t_obj.strftime("%H:%M"))
-            current += timedelta(minutes=step)
+        while livres and current + svc.duracao_minutos <= end_work:
+            avaliados += 1
+            if any(i <= current and current + svc.duracao_minutos <= f for i, f in livres):
+                t_obj = time(current // 60, current % 60)
+                if date_obj > agora.date() or (date_obj == agora.date() and t_obj > agora.time()):
+                    slots.append(hhmm(current))
+            current += step
+
+        metricas.SLOTS_AVALIADOS.inc(avaliados)
             
         if slots:
-            resultado.append({"professional_id": prof.id, "nome": prof.nome, "horarios": slots})
+            resultado.append({"professional_id": id_prof, "nome": nome, "horarios": slots})
 
     return JsonResponse(resultado, safe=False)
 
+def _ler_etapas(salao, servicos_ids, profissionais_ids):
+    """Etapas do combo: [(Service, [profissionais aceitos])]. Profissional 0/ausente = qualquer um que faça o serviço."""
+    servicos = {s.id: s for s in Service.objects.filter(salon=salao, id__in=servicos_ids)}
+    if len(servicos_ids) > 5 or any(i not in servicos for i in servicos_ids):
+        raise ValueError("serviços inválidos")
+    habilitados = {}
+    for prof_id, service_id in Professional.services.through.objects.filter(service_id__in=servicos_ids, professional__salon=salao).values_list('professional_id', 'service_id'):
+        habilitados.setdefault(service_id, []).append(prof_id)
+    etapas = []
+    for i, service_id in enumerate(servicos_ids):
+        pedido = profissionais_ids[i] if i < len(profissionais_ids) else 0
+        aceitos = sorted(habilitados.get(service_id, []))
+        if pedido:
+            aceitos = [pedido] if pedido in aceitos else []
+        etapas.append((servicos[service_id], aceitos))
+    return etapas
+
+@limitar('disponibilidade')
+def api_disponibilidade_combo(request, slug, data_iso):
+    """Horários em que vários serviços cabem em sequência (?servicos=1,2,3&profissionais=4,0,7)"""
+    salao = salao_da_url(request, slug)
+    try:
+        date_obj = datetime.strptime(data_iso, "%Y-%m-%d").date()
+        servicos_ids = [int(x) for x in request.GET.get('servicos', '').split(',') if x.strip()]
+        profissionais_ids = [int(x or 0) for x in request.GET.get('profissionais', '').split(',')] if request.GET.get('profissionais') else []
+        etapas = _ler_etapas(salao, servicos_ids, profissionais_ids)
+    except (ValueError, TypeError): return JsonResponse([], safe=False)
+    if not etapas or any(not aceitos for _, aceitos in etapas): return JsonResponse([], safe=False)
+
+    agenda = Agenda(salao, date_obj, date_obj, profissionais={p for _, aceitos in etapas for p in aceitos}, holds=True)
+    agora = timezone.localtime()
+    depois_de = None if date_obj > agora.date() else (minutos(agora.time()) if date_obj == agora.date() else 24 * 60)
+    opcoes = horarios_em_sequencia(agenda, date_obj, etapas, salao.intervalo_minutos, depois_de)
+    metricas.CALCULOS_DISPONIBILIDADE.inc()
+
+    nomes = {p.id: p.nome for p in agenda.profissionais}
+    return JsonResponse([
+        {"horario": hhmm(inicio), "etapas": [
+            {"servico_id": svc.id, "servico": svc.nome, "profissional_id": prof_id, "profissional": nomes[prof_id], "inicio": hhmm(ini), "fim": hhmm(fim)}
+            for (svc, _), (prof_id, ini, fim) in zip(etapas, escolha)
+        ]}
+        for inicio, escolha in opcoes
+    ], safe=False)
+
 @csrf_exempt
-def api_confirmar_agendamento(request, slug):
+@limitar('agendar')
+def api_confirmar_combo(request, slug):
+    """Reserva o combo inteiro ou nada: {"data", "horario", "etapas": [{"servico_id", "profissional_id"}], "nome_cliente", "whatsapp"}"""
     if request.method != "POST": return JsonResponse({"error": "Method not allowed"}, status=405)
-    salao = get_object_or_404(Salon, slug=slug)
+    salao = salao_da_url(request, slug)
     try:
         data = json.loads(request.body)
-        svc = Service.objects.get(id=data['servico_id'])
-        prof = Professional.objects.get(id=data['profissional_id'])
         date_obj = datetime.strptime(data['data'], "%Y-%m-%d").date()
-        hora_str = data['horario']
-        if len(hora_str) == 5: hora_str += ":00"
-        time_obj = datetime.strptime(hora_str, "%H:%M:%S").time()
+        time_obj = datetime.strptime(data['horario'][:5], "%H:%M").time()
+        pedido = data['etapas']
+        etapas = _ler_etapas(salao, [int(e['servico_id']) for e in pedido], [int(e['profissional_id']) for e in pedido])
+        if not etapas or any(not aceitos for _, aceitos in etapas): raise ValueError("profissional não atende o serviço")
+        profs = {p.id: p for p in Professional.objects.filter(salon=salao, id__in=[a[0] for _, a in etapas])}
+        etapas = [(svc, profs[aceitos[0]]) for svc, aceitos in etapas]
+        nome, whatsapp = data['nome_cliente'], data['whatsapp']
+    except Exception as e: return JsonResponse({"message": f"Dados inválidos: {str(e)}"}, status=400)
+
+    try:
+        criados = reservar_combo(salao, date_obj, time_obj, etapas, nome, whatsapp)
+    except HorarioIndisponivel:
+        metricas.CONFLITOS_AGENDAMENTO.labels('agendar_combo').inc()
+        return JsonResponse({"message": "Ops! Algum desses horários acabou de ser reservado."}, status=409)
+
+    metricas.AGENDAMENTOS_CONFIRMADOS.inc(len(criados))
+    enfileirar('booking.enviar_confirmacao', {'appointment_id': criados[0].id}, salon=salao)
+    return JsonResponse({"ok": True, "codigo": criados[0].codigo_validacao, "agendamentos": [a.id for a in criados]})
+
+def _ler_pedido_horario(salao, data):
+    """Valida o corpo comum às rotas de reserva. Levanta exceção se inválido."""
+    svc = Service.objects.get(id=data['servico_id'], salon=salao)
+    prof = Professional.objects.get(id=data['profissional_id'], salon=salao)
+    date_obj = datetime.strptime(data['data'], "%Y-%m-%d").date()
+    hora_str = data['horario']
+    if len(hora_str) == 5: hora_str += ":00"
+    time_obj = datetime.strptime(hora_str, "%H:%M:%S").time()
+    return svc, prof, date_obj, time_obj
+
+@csrf_exempt
+@limitar('reservar')
+def api_reservar_horario(request, slug):
+    """Pré-reserva (hold) do horário escolhido, válida por alguns minutos"""
+    if request.method != "POST": return JsonResponse({"error": "Method not allowed"}, status=405)
+    salao = salao_da_url(request, slug)
+    try:
+        svc, prof, date_obj, time_obj = _ler_pedido_horario(salao, json.loads(request.body))
+    except Exception as e: return JsonResponse({"message": f"Dados inválidos: {str(e)}"}, status=400)
+
+    try:
+        hold = criar_hold(salao, prof, svc, date_obj, time_obj)
+    except HorarioIndisponivel:
+        metricas.CONFLITOS_AGENDAMENTO.labels('reservar').inc()
+        return JsonResponse({"message": "Ops! Esse horário acabou de ser reservado."}, status=409)
+
+    enfileirar('booking.limpar_holds', executar_em=hold.expira_em, chave='limpar_holds')
+    return JsonResponse({"ok": True, "hold_token": str(hold.token), "expira_em": hold.expira_em.isoformat()})
+
+@csrf_exempt
+def api_liberar_reserva(request, slug, token):
+    if request.method != "DELETE": return JsonResponse({"error": "Method not allowed"}, status=405)
+    salao = salao_da_url(request, slug)
+    liberar_hold(salao, token)
+    return JsonResponse({"ok": True})
+
+@csrf_exempt
+@limitar('agendar')
+def api_confirmar_agendamento(request, slug):
+    if request.method != "POST": return JsonResponse({"error": "Method not allowed"}, status=405)
+    salao = salao_da_url(request, slug)
+    try:
+        data = json.loads(request.body)
+        svc, prof, date_obj, time_obj = _ler_pedido_horario(salao, data)
+        nome, whatsapp = data['nome_cliente'], data['whatsapp']
     except Exception as e: return JsonResponse({"message": f"Dados inválidos: {str(e)}"}, status=400)
 
-    if not check_slot_availability(salao, prof, svc, date_obj, time_obj):
+    try:
+        appt = reservar_horario(salao, prof, svc, date_obj, time_obj, nome, whatsapp, hold_token=data.get('hold_token'))
+    except HorarioIndisponivel:
+        metricas.CONFLITOS_AGENDAMENTO.labels('agendar').inc()
         return JsonResponse({"message": "Ops! Esse horário acabou de ser reservado."}, status=409)
 
-    codigo = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    Appointment.objects.create(salon=salao, professional=prof, service=svc, cliente_nome=data['nome_cliente'], cliente_whatsapp=data['whatsapp'], data=date_obj, hora_inicio=time_obj, codigo_validacao=codigo)
-    return JsonResponse({"ok": True, "codigo": codigo})
\ No newline at end of file
+    metricas.AGENDAMENTOS_CONFIRMADOS.inc()
+    # Efeitos colaterais fora do request (executados pelo `runworker`)
+    enfileirar('booking.enviar_confirmacao', {'appointment_id': appt.id}, salon=salao)
+    return JsonResponse({"ok": True, "codigo": appt.codigo_validacao})
+
+# --- LISTA DE ESPERA ---
+
+def _ler_hora_opcional(valor):
+    return datetime.strptime(valor[:5], "%H:%M").time() if valor else None
+
+@csrf_exempt
+@limitar('lista_espera')
+def api_entrar_lista_espera(request, slug):
+    """Entra na lista de espera: {"servico_id", "profissional_id" (0 = qualquer), "data_inicio", "data_fim", "hora_inicio", "hora_fim", "nome_cliente", "whatsapp"}"""
+    if request.method != "POST": return JsonResponse({"error": "Method not allowed"}, status=405)
+    salao = salao_da_url(request, slug)
+    try:
+        data = json.loads(request.body)
+        svc = Service.objects.get(id=data['servico_id'], salon=salao)
+        prof = Professional.objects.get(id=data['profissional_id'], salon=salao) if data.get('profissional_id') else None
+        data_inicio = datetime.strptime(data['data_inicio'], "%Y-%m-%d").date()
+        data_fim = datetime.strptime(data.get('data_fim') or data['data_inicio'], "%Y-%m-%d").date()
+        entrada = entrar(
+            salao, svc, prof, data['nome_cliente'], data['whatsapp'], data_inicio, data_fim,
+            _ler_hora_opcional(data.get('hora_inicio')), _ler_hora_opcional(data.get('hora_fim')),
+        )
+    except Exception as e: return JsonResponse({"message": f"Dados inválidos: {str(e)}"}, status=400)
+    return JsonResponse({"ok": True, "token": str(entrada.token)}, status=201)
+
+@csrf_exempt
+def api_lista_espera(request, slug, token):
+    """GET: situação da inscrição (com ?profissional=&data=&horario=, se a vaga oferecida ainda está livre). DELETE: sai da lista."""
+    salao = salao_da_url(request, slug)
+    entrada = get_object_or_404(WaitlistEntry.objects.select_related('service', 'professional'), salon=salao, token=token)
+    if request.method == "DELETE":
+        WaitlistEntry.objects.filter(pk=entrada.pk, status=WaitlistEntry.AGUARDANDO).update(status=WaitlistEntry.CANCELADO)
+        return JsonResponse({"ok": True})
+    if request.method != "GET": return JsonResponse({"error": "Method not allowed"}, status=405)
+
+    resposta = {
+        "status": entrada.status,
+        "servico": entrada.service.nome,
+        "profissional": entrada.professional.nome if entrada.professional else None,
+        "data_inicio": entrada.data_inicio.isoformat(), "data_fim": entrada.data_fim.isoformat(),
+        "hora_inicio": entrada.hora_inicio.strftime("%H:%M") if entrada.hora_inicio else None,
+        "hora_fim": entrada.hora_fim.strftime("%H:%M") if entrada.hora_fim else None,
+    }
+    if request.GET.get('profissional') and entrada.status == WaitlistEntry.AGUARDANDO:
+        try:
+            prof = Professional.objects.get(id=int(request.GET['profissional']), salon=salao)
+            date_obj = datetime.strptime(request.GET['data'], "%Y-%m-%d").date()
+            time_obj = datetime.strptime(request.GET['horario'][:5], "%H:%M").time()
+        except (KeyError, ValueError, Professional.DoesNotExist): return JsonResponse({"message": "Dados inválidos"}, status=400)
+        resposta["vaga"] = {
+            "profissional": prof.nome, "data": date_obj.isoformat(), "horario": time_obj.strftime("%H:%M"),
+            "disponivel": aceita(entrada, prof.id, date_obj, minutos(time_obj)) and check_slot_availability(salao, prof, entrada.service, date_obj, time_obj),
+        }
+    return JsonResponse(resposta)
+
+@csrf_exempt
+@limitar('agendar')
+def api_confirmar_lista_espera(request, slug, token):
+    """Fica com a vaga oferecida pela lista de espera: {"profissional_id", "data", "horario"}. O primeiro a confirmar leva (409 para os demais)."""
+    if request.method != "POST": return JsonResponse({"error": "Method not allowed"}, status=405)
+    salao = salao_da_url(request, slug)
+    try:
+        data = json.loads(request.body)
+        prof = Professional.objects.get(id=data['profissional_id'], salon=salao)
+        date_obj = datetime.strptime(data['data'], "%Y-%m-%d").date()
+        time_obj = datetime.strptime(data['horario'][:5], "%H:%M").time()
+    except Exception as e: return JsonResponse({"message": f"Dados inválidos: {str(e)}"}, status=400)
+
+    try:
+        appt = confirmar_vaga(salao, token, prof, date_obj, time_obj)
+    except EntradaIndisponivel as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    except HorarioIndisponivel:
+        metricas.CONFLITOS_AGENDAMENTO.labels('lista_espera').inc()
+        return JsonResponse({"message": "Ops! Outra pessoa da lista de espera confirmou esse horário primeiro."}, status=409)
+
+    metricas.AGENDAMENTOS_CONFIRMADOS.inc()
+    enfileirar('booking.enviar_confirmacao', {'appointment_id': appt.id}, salon=salao)
+    # Nome/WhatsApp/serviço para o voucher da página (o cliente só tem o token)
+    return JsonResponse({
+        "ok": True, "codigo": appt.codigo_validacao, "nome_cliente": appt.cliente_nome,
+        "whatsapp": appt.cliente_whatsapp, "servico": appt.service.nome if appt.service else None,
+    })
@@ -2,27 +2,140 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 from .models import Salon, User
-from scheduling.models import Service, Professional, Appointment, WorkingHour
+from scheduling.models import Service, Professional, Appointment, Customer, Resource, WorkingHour, ProfessionalBreak, OpeningHour
+
+
+# --- LISTAGENS GRANDES ---
+
+class ContagemEstimadaPaginator(Paginator):
+    """No Postgres, a listagem sem filtro usa a estimativa do planner (pg_class.reltuples) em vez de COUNT(*) na tabela inteira.
+
+    Com filtro, ou em tabela pequena, conta de verdade.
+    """
+    LIMIAR = 10000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if isinstance(qs, QuerySet) and not qs.query.where and connections[qs.db].vendor == 'postgresql':
+            with connections[qs.db].cursor() as cursor:
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [qs.model._meta.db_table])
+                linha = cursor.fetchone()
+            if linha and linha[0] >= self.LIMIAR:
+                return linha[0]
+        return super().count
+
+
+class FiltroSalao(admin.SimpleListFilter):
+    """Filtro lateral por salão que não vira uma lista gigante: acima de LIMITE salões, lista os LIMITE primeiros e o selecionado.
+
+    Os demais se acham pela busca (slug do salão nos search_fields) ou pelo
+    link ?salon=<id>. A lista nunca fica vazia: lookups vazio esconderia o filtro.
+    """
+    title = 'salão'
+    parameter_name = 'salon'
+    LIMITE = 30
+
+    def lookups(self, request, model_admin):
+        saloes = list(Salon.objects.order_by('nome').values_list('id', 'nome')[:self.LIMITE + 1])
+        if len(saloes) > self.LIMITE:
+            saloes = saloes[:self.LIMITE]
+            if (self.value() or '').isdigit() and int(self.value()) not in {pk for pk, _ in saloes}:
+                saloes += list(Salon.objects.filter(pk=self.value()).values_list('id', 'nome'))
+        return [(str(pk), nome) for pk, nome in saloes]
+
+    def queryset(self, request, queryset):
+        if (self.value() or '').isdigit():
+            return queryset.filter(salon_id=self.value())
+        return queryset
+
+
+class ListagemGrandeAdmin(admin.ModelAdmin):
+    """Base das tabelas que crescem com o uso: sem o segundo COUNT(*) do total e com contagem estimada."""
+    paginator = ContagemEstimadaPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+# --- CADASTROS ---
 
 # Inline permite editar horários DENTRO da tela do Profissional
 class WorkingHourInline(admin.TabularInline):
     model = WorkingHour
     extra = 1
+    ordering = ('day_of_week', 'start_time')
+
+class ProfessionalBreakInline(admin.TabularInline):
+    model = ProfessionalBreak
+    extra = 0
+    ordering = ('day_of_week', 'start_time')
+
+# Dia da semana sem linha: salão fechado
+class OpeningHourInline(admin.TabularInline):
+    model = OpeningHour
+    extra = 0
+    max_num = 7
 
 @admin.register(Salon)
 class SalonAdmin(admin.ModelAdmin):
     list_display = ('nome', 'slug', 'telefone', 'created_at')
-    search_fields = ('nome', 'slug')
+    list_filter = ('disponibilidade_materializada',)
+    search_fields = ('nome', 'slug')  # também alimenta o autocomplete de salão nos outros admins
+    ordering = ('nome',)
+    inlines = [OpeningHourInline]
+
+@admin.register(Service)
+class ServiceAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'salon', 'preco', 'duracao_minutos')
+    list_filter = (FiltroSalao,)
+    list_select_related = ('salon',)
+    search_fields = ('nome', 'salon__slug')
+    ordering = ('nome', 'id')
+    autocomplete_fields = ('salon', 'recursos')
+
+    def get_queryset(self, request):
+        # __str__ usa o nome do salão (listagem e resultados do autocomplete)
+        return super().get_queryset(request).select_related('salon')
 
 @admin.register(Professional)
 class ProfessionalAdmin(admin.ModelAdmin):
     list_display = ('nome', 'salon', 'especialidade')
-    list_filter = ('salon',) # Filtra por salão na lateral
-    inlines = [WorkingHourInline] # Edita horários aqui mesmo!
+    list_filter = (FiltroSalao,) # Filtra por salão na lateral
+    list_select_related = ('salon',)
+    search_fields = ('nome', 'salon__slug')
+    ordering = ('nome', 'id')
+    # Serviços por autocomplete: o select múltiplo carregava os serviços de todos os salões
+    autocomplete_fields = ('salon', 'services')
+    inlines = [WorkingHourInline, ProfessionalBreakInline] # Edita horários aqui mesmo!
 
 @admin.register(Appointment)
-class AppointmentAdmin(admin.ModelAdmin):
-    list_display = ('data', 'hora_inicio', 'cliente_nome', 'professional', 'salon')
-    list_filter = ('salon', 'data')
-    date_hierarchy = 'data'
\ No newline at end of file
+class AppointmentAdmin(ListagemGrandeAdmin):
+    list_display = ('data', 'hora_inicio', 'cliente_nome', 'professional', 'salon', 'status')
+    list_filter = (FiltroSalao, 'status', 'data')
+    list_select_related = ('professional', 'salon')
+    date_hierarchy = 'data'
+    search_fields = ('=codigo_validacao', 'cliente_nome', '=salon__slug')
+    autocomplete_fields = ('salon', 'professional', 'service', 'customer')
+@admin.register(Customer)
+class CustomerAdmin(ListagemGrandeAdmin):
+    list_display = ('nome', 'whatsapp', 'salon', 'visitas', 'ultima_visita', 'total_gasto')
+    list_filter = (FiltroSalao,)
+    list_select_related = ('salon',)
+    search_fields = ('nome', 'whatsapp', '=salon__slug')
+    ordering = ('nome', 'id')
+    readonly_fields = ('visitas', 'ultima_visita', 'total_gasto')
+    autocomplete_fields = ('salon',)
+
+@admin.register(Resource)
+class ResourceAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'capacidade', 'salon')
+    list_filter = (FiltroSalao,)
+    list_select_related = ('salon',)
+    search_fields = ('nome', 'salon__slug')
+    ordering = ('nome', 'id')
+    autocomplete_fields = ('salon',)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from .models import Salon
+        from .tenant import invalidar
+        post_save.connect(invalidar, sender=Salon, dispatch_uid='tenant_invalidar_save')
+        post_delete.connect(invalidar, sender=Salon, dispatch_uid='tenant_invalidar_delete')
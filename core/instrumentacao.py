@@ -0,0 +1,120 @@
+"""Medição por request: tempo de SQL, de template e acertos de cache.
+
+As medições ficam num ContextVar (uma `Medicao` por request, ver
+core.middleware.ServerTimingMiddleware). Fora de um request medido os
+ganchos abaixo não fazem nada além de ler o ContextVar.
+"""
+import contextvars
+import time
+
+_medicao_atual = contextvars.ContextVar('softskin_medicao', default=None)
+_instalado = False
+_AUSENTE = object()
+
+
+class Medicao:
+    __slots__ = ('inicio', 'detalhada', 'sql_ms', 'sql_n', 'queries', 'template_ms', 'cache_hits', 'cache_misses')
+
+    def __init__(self, detalhada):
+        self.inicio = time.perf_counter()
+        self.detalhada = detalhada  # amostrada: mede SQL query a query
+        self.sql_ms = 0.0
+        self.sql_n = 0
+        self.queries = []  # (ms, sql) — só em requests amostrados
+        self.template_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def total_ms(self):
+        return (time.perf_counter() - self.inicio) * 1000
+
+
+def medicao_atual():
+    return _medicao_atual.get()
+
+
+def iniciar(detalhada):
+    m = Medicao(detalhada)
+    return m, _medicao_atual.set(m)
+
+
+def encerrar(token):
+    _medicao_atual.reset(token)
+
+
+def wrapper_sql(execute, sql, params, many, context):
+    """Para connection.execute_wrapper()."""
+    m = _medicao_atual.get()
+    if m is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        m.sql_ms += ms
+        m.sql_n += 1
+        m.queries.append((ms, sql))
+
+
+def registrar_cache(acerto):
+    m = _medicao_atual.get()
+    if m is not None:
+        if acerto:
+            m.cache_hits += 1
+        else:
+            m.cache_misses += 1
+
+
+def _instrumentar_templates():
+    from django.template.backends.django import Template
+
+    original = Template.render
+
+    def render(self, context=None, request=None):
+        m = _medicao_atual.get()
+        if m is None:
+            return original(self, context, request)
+        t0 = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            m.template_ms += (time.perf_counter() - t0) * 1000
+
+    Template.render = render
+
+
+def _instrumentar_cache():
+    from django.core.cache import caches
+
+    classes = {type(caches[alias]) for alias in caches.settings}
+    for cls in classes:
+        get_original = cls.get
+        get_many_original = cls.get_many
+
+        def get(self, key, default=None, version=None, _original=get_original):
+            valor = _original(self, key, _AUSENTE, version=version)
+            registrar_cache(valor is not _AUSENTE)
+            return default if valor is _AUSENTE else valor
+
+        def get_many(self, keys, version=None, _original=get_many_original):
+            keys = list(keys)
+            valores = _original(self, keys, version=version)
+            m = _medicao_atual.get()
+            if m is not None:
+                m.cache_hits += len(valores)
+                m.cache_misses += len(keys) - len(valores)
+            return valores
+
+        cls.get = get
+        cls.get_many = get_many
+
+
+def instalar():
+    """Aplica os ganchos de template e cache (uma vez por processo)."""
+    global _instalado
+    if _instalado:
+        return
+    _instrumentar_templates()
+    _instrumentar_cache()
+    _instalado = True
@@ -0,0 +1,120 @@
+"""Limite de taxa (token bucket) das rotas públicas, guardado no cache.
+
+Cada (rota, salão, IP) tem um balde com `rajada` fichas que se repõe a
+`por_minuto` fichas por minuto; cada request gasta uma. Sem ficha, a view
+nem roda: responde 429 com Retry-After.
+
+    @limitar('disponibilidade')
+    def api_disponibilidade(request, slug, data_iso): ...
+
+Os orçamentos ficam em settings.LIMITES_REQUISICAO. Cada request faz uma
+única operação no cache:
+
+- Redis: um script Lua (EVAL) lê, repõe, gasta e grava o balde atomicamente,
+  usando o relógio do próprio Redis (os servidores de app não precisam estar
+  sincronizados);
+- outros backends: janela fixa com `cache.incr` (atômico no LocMem e no
+  Memcached) — `rajada` requests a cada intervalo de reposição do balde.
+
+Se o cache falhar, o request passa (o limite protege, mas não pode derrubar
+o agendamento).
+"""
+import logging
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+
+from core import metricas
+
+logger = logging.getLogger(__name__)
+
+_SCRIPT_BALDE = """
+local rajada = tonumber(ARGV[1])
+local por_ms = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local agora = t[1] * 1000 + math.floor(t[2] / 1000)
+local estado = redis.call('HMGET', KEYS[1], 'f', 't')
+local fichas = tonumber(estado[1])
+local ultimo = tonumber(estado[2])
+if fichas == nil or ultimo == nil then
+  fichas = rajada
+  ultimo = agora
+end
+fichas = math.min(rajada, fichas + math.max(0, agora - ultimo) * por_ms)
+local espera = 0
+if fichas >= 1 then
+  fichas = fichas - 1
+else
+  espera = math.ceil((1 - fichas) / por_ms)
+end
+redis.call('HSET', KEYS[1], 'f', tostring(fichas), 't', agora)
+redis.call('PEXPIRE', KEYS[1], math.ceil(rajada / por_ms) + 1000)
+return espera
+"""
+
+
+def ip_cliente(request):
+    """IP de quem fez o request. Atrás de proxy, use LIMITE_CONFIAR_X_FORWARDED_FOR (vale o último da lista, que o proxy acrescentou)."""
+    if getattr(settings, 'LIMITE_CONFIAR_X_FORWARDED_FOR', False):
+        encaminhado = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if encaminhado:
+            return encaminhado.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _consumir_redis(chave, rajada, por_minuto):
+    backend = cache._cache
+    chave = cache.make_and_validate_key(chave)
+    cliente = backend.get_client(chave, write=True)
+    return int(cliente.eval(_SCRIPT_BALDE, 1, chave, rajada, por_minuto / 60000.0)) / 1000.0
+
+
+def _consumir_contador(chave, rajada, por_minuto):
+    janela = max(1.0, rajada * 60.0 / por_minuto)  # tempo para o balde encher do zero
+    agora = time.time()
+    numero = int(agora // janela)
+    chave = f"{chave}:{numero}"
+    try:
+        usados = cache.incr(chave)
+    except ValueError:  # primeira ficha da janela
+        if cache.add(chave, 1, math.ceil(janela) + 1):
+            return 0
+        usados = cache.incr(chave)
+    return 0 if usados <= rajada else (numero + 1) * janela - agora
+
+
+def consumir(nome, salao, ip):
+    """Gasta uma ficha. Retorna 0 se liberado, ou quantos segundos esperar pela próxima ficha."""
+    orcamento = getattr(settings, 'LIMITES_REQUISICAO', {}).get(nome)
+    if not orcamento:
+        return 0
+    rajada, por_minuto = orcamento
+    chave = f"limite:{nome}:{salao}:{ip}"
+    try:
+        if hasattr(getattr(cache, '_cache', None), 'get_client'):  # django.core.cache.backends.redis.RedisCache
+            return _consumir_redis(chave, rajada, por_minuto)
+        return _consumir_contador(chave, rajada, por_minuto)
+    except Exception:
+        logger.warning("Limite de taxa indisponível (%s), request liberado", nome, exc_info=True)
+        return 0
+
+
+def limitar(nome):
+    """Aplica o orçamento LIMITES_REQUISICAO[nome] por (salão do slug, IP) à view."""
+    def decorator(view):
+        @wraps(view)
+        def _view(request, *args, **kwargs):
+            espera = consumir(nome, kwargs.get('slug', ''), ip_cliente(request))
+            if espera > 0:
+                metricas.REQUISICOES_LIMITADAS.labels(nome).inc()
+                segundos = max(1, math.ceil(espera))
+                response = JsonResponse({"message": f"Muitas tentativas. Tente de novo em {segundos} segundo(s)."}, status=429)
+                response['Retry-After'] = str(segundos)
+                return response
+            return view(request, *args, **kwargs)
+        return _view
+    return decorator
@@ -0,0 +1,73 @@
+"""Métricas no formato Prometheus, expostas em /metrics.
+
+Usa o prometheus_client. Com vários workers do gunicorn, defina a variável
+de ambiente PROMETHEUS_MULTIPROC_DIR (diretório vazio, gravável) antes de
+subir o servidor: cada processo grava seus valores em arquivos mmap e o
+/metrics de qualquer worker agrega todos. O gunicorn.conf.py da raiz limpa
+os arquivos dos workers que morrem.
+"""
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+MULTIPROCESSO = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+# --- HTTP ---
+LATENCIA_REQUEST = Histogram(
+    'softskin_http_request_duration_seconds',
+    'Latência dos requests por rota',
+    ['url_name', 'metodo', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+OPERACOES_CACHE = Counter('softskin_cache_operacoes_total', 'Leituras de cache durante requests', ['resultado'])
+RESOLUCOES_TENANT = Counter('softskin_tenant_resolucoes_total', 'Salões resolvidos por request, por camada (lru, cache, banco)', ['origem'])
+
+# --- Agendamento público ---
+CALCULOS_DISPONIBILIDADE = Counter('softskin_disponibilidade_calculos_total', 'Cálculos de disponibilidade (um por profissional/dia)')
+LEITURAS_MATERIALIZADAS = Counter('softskin_disponibilidade_materializada_total', 'Consultas à disponibilidade materializada', ['resultado'])
+SLOTS_AVALIADOS = Counter('softskin_disponibilidade_slots_avaliados_total', 'Horários candidatos avaliados')
+AGENDAMENTOS_CONFIRMADOS = Counter('softskin_agendamentos_confirmados_total', 'Agendamentos criados pela página pública')
+REQUISICOES_LIMITADAS = Counter('softskin_requisicoes_limitadas_total', 'Respostas 429 do limite de taxa', ['rota'])
+AVISOS_LISTA_ESPERA = Counter('softskin_lista_espera_avisos_total', 'Clientes da lista de espera avisados de um horário que vagou')
+CONFLITOS_AGENDAMENTO = Counter('softskin_agendamentos_conflitos_total', 'Respostas 409 (horário já ocupado)', ['rota'])
+ENTREGAS_WEBHOOK = Counter('softskin_webhooks_entregas_total', 'POSTs de webhook (lotes de eventos), por resultado', ['resultado'])
+
+# --- Painel ---
+CONEXOES_SSE = Gauge('softskin_sse_conexoes_abertas', 'Conexões SSE abertas', multiprocess_mode='livesum')
+
+
+class ColetorFilaJobs:
+    """Profundidade da fila de jobs, consultada no banco a cada scrape."""
+
+    def collect(self):
+        from django.db.models import Count
+        from jobs.models import Job
+
+        familia = GaugeMetricFamily('softskin_jobs_fila', 'Jobs na fila por status', labels=['status'])
+        contagens = dict(
+            Job.objects.filter(status__in=[Job.PENDENTE, Job.EXECUTANDO])
+            .values_list('status').annotate(n=Count('id')).values_list('status', 'n')
+        )
+        for status in (Job.PENDENTE, Job.EXECUTANDO):
+            familia.add_metric([status], contagens.get(status, 0))
+        yield familia
+
+
+def status_classe(codigo):
+    return f"{codigo // 100}xx"
+
+
+_REGISTRO_FILA = CollectorRegistry()
+_REGISTRO_FILA.register(ColetorFilaJobs())
+
+
+def gerar_metricas():
+    """Texto no formato de exposição do Prometheus."""
+    if MULTIPROCESSO:
+        from prometheus_client import multiprocess
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro) + generate_latest(_REGISTRO_FILA)
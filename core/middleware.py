@@ -0,0 +1,94 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import instrumentacao, metricas
+
+logger_lento = logging.getLogger('softskin.requisicao_lenta')
+
+
+class ServerTimingMiddleware:
+    """Mede cada request, expõe o resultado no header Server-Timing e alimenta
+    as métricas de latência por rota (core/metricas.py).
+
+    - total, tempo de template e acertos/erros de cache: em todo request;
+    - tempo e número de queries SQL: só nos requests amostrados
+      (SERVER_TIMING_AMOSTRAGEM), para o custo ficar desprezível;
+    - requests acima de REQUISICAO_LENTA_MS vão para o logger
+      'softskin.requisicao_lenta' em JSON, com as queries mais lentas
+      quando o request foi amostrado.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.amostragem = getattr(settings, 'SERVER_TIMING_AMOSTRAGEM', 1.0)
+        self.limite_lento_ms = getattr(settings, 'REQUISICAO_LENTA_MS', 500)
+        self.top_queries = getattr(settings, 'REQUISICAO_LENTA_TOP_QUERIES', 5)
+        self.emitir_header = getattr(settings, 'SERVER_TIMING_HEADER', True)
+        instrumentacao.instalar()
+
+    def __call__(self, request):
+        detalhada = self.amostragem >= 1 or random.random() < self.amostragem
+        medicao, token = instrumentacao.iniciar(detalhada)
+        try:
+            with ExitStack() as pilha:
+                if detalhada:
+                    for conexao in connections.all():
+                        pilha.enter_context(conexao.execute_wrapper(instrumentacao.wrapper_sql))
+                response = self.get_response(request)
+        finally:
+            instrumentacao.encerrar(token)
+
+        total_ms = medicao.total_ms()
+        request.medicao = medicao
+        self._registrar_metricas(request, response, medicao, total_ms)
+        if self.emitir_header:
+            response['Server-Timing'] = self._header(medicao, total_ms)
+        if total_ms >= self.limite_lento_ms:
+            self._registrar_lento(request, response, medicao, total_ms)
+        return response
+
+    def _registrar_metricas(self, request, response, m, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        url_name = (match.url_name or match.view_name) if match else 'nao_resolvida'
+        metricas.LATENCIA_REQUEST.labels(url_name, request.method, metricas.status_classe(response.status_code)).observe(total_ms / 1000)
+        if m.cache_hits:
+            metricas.OPERACOES_CACHE.labels('hit').inc(m.cache_hits)
+        if m.cache_misses:
+            metricas.OPERACOES_CACHE.labels('miss').inc(m.cache_misses)
+
+    def _header(self, m, total_ms):
+        partes = [f'total;dur={total_ms:.1f}']
+        if m.detalhada:
+            partes.append(f'sql;dur={m.sql_ms:.1f};desc="{m.sql_n} queries"')
+        if m.template_ms:
+            partes.append(f'tpl;dur={m.template_ms:.1f}')
+        if m.cache_hits or m.cache_misses:
+            partes.append(f'cache;desc="hit={m.cache_hits} miss={m.cache_misses}"')
+        return ', '.join(partes)
+
+    def _registrar_lento(self, request, response, m, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        registro = {
+            'metodo': request.method,
+            'path': request.path,
+            'url_name': match.url_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'template_ms': round(m.template_ms, 1),
+            'cache_hits': m.cache_hits,
+            'cache_misses': m.cache_misses,
+            'amostrado': m.detalhada,
+        }
+        if m.detalhada:
+            registro['sql_ms'] = round(m.sql_ms, 1)
+            registro['queries'] = m.sql_n
+            registro['top_queries'] = [
+                {'ms': round(ms, 2), 'sql': sql[:500]}
+                for ms, sql in sorted(m.queries, key=lambda q: q[0], reverse=True)[:self.top_queries]
+            ]
+        logger_lento.warning(json.dumps(registro, ensure_ascii=False))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_salon_horarios_customizados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salon',
+            name='disponibilidade_materializada',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_salon_disponibilidade_materializada'),
+        # Os horários já foram copiados para scheduling.OpeningHour
+        ('scheduling', '0021_horarios_tipados'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='salon',
+            name='dias_fechados',
+        ),
+        migrations.RemoveField(
+            model_name='salon',
+            name='horarios_customizados',
+        ),
+    ]
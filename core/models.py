@@ -11,12 +11,13 @@ class Salon(models.Model):
     
     # Configurações
     cor_do_tema = models.CharField(max_length=7, default="#8E44AD")
+    # Horário sugerido no painel e usado nos salões novos; o que vale é scheduling.OpeningHour
     hora_abertura_padrao = models.TimeField(default="09:00")
     hora_fechamento_padrao = models.TimeField(default="18:00")
     intervalo_minutos = models.IntegerField(default=30)
-    dias_fechados = models.CharField(max_length=50, default="0")
     ocultar_precos = models.BooleanField(default=False)
-    horarios_customizados = models.JSONField(default=dict, blank=True)
+    # Mantém os horários livres pré-calculados (scheduling/materializacao.py) para a página pública
+    disponibilidade_materializada = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -0,0 +1,192 @@
+"""Salão (tenant) de cada request, resolvido uma vez e servido de cache.
+
+O TenantMiddleware põe em `request.tenant` um Tenant imutável, achado pelo
+`slug` da URL (página pública) ou pelo salão do usuário logado (painel):
+
+    salao = salao_da_url(request, slug)    # views públicas: Salon ou 404
+    salao = salao_do_usuario(request)      # painel: Salon do usuário ou None
+    request.tenant.horarios[0]             # (abertura, fechamento) da segunda, em minutos
+
+Camadas: LRU do processo → cache compartilhado → banco. Toda resolução
+confere a versão do salão (core.versoes, namespace SALAO), trocada no
+save/delete do Salon; assim um acerto no LRU custa uma leitura do cache e
+nenhum processo continua servindo configuração antiga.
+
+`Tenant.modelo()` devolve um Salon montado a partir dos campos guardados, sem
+query, para as funções que recebem o model (Agenda, reservas, filtros do
+ORM). Para alterar o salão, carregue-o do banco.
+"""
+import copy
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+
+from . import metricas
+from .models import Salon
+from .versoes import SALAO, incrementar_versao, versao
+
+
+@dataclass(frozen=True)
+class Tenant:
+    id: int
+    slug: str
+    nome: str
+    versao: int
+    intervalo_minutos: int
+    ocultar_precos: bool
+    cor_do_tema: str
+    disponibilidade_materializada: bool
+    # Por dia da semana (0=segunda): (abertura, fechamento) em minutos, ou None se fecha (de OpeningHour)
+    horarios: Tuple[Optional[Tuple[int, int]], ...]
+    # Todos os campos concretos do Salon, na ordem de _meta.concrete_fields
+    campos: tuple
+
+    @classmethod
+    def do_salao(cls, salao, versao_atual):
+        from scheduling.agenda import horarios_semana
+        return cls(
+            id=salao.id, slug=salao.slug, nome=salao.nome, versao=versao_atual,
+            intervalo_minutos=salao.intervalo_minutos, ocultar_precos=salao.ocultar_precos,
+            cor_do_tema=salao.cor_do_tema, disponibilidade_materializada=salao.disponibilidade_materializada,
+            horarios=horarios_semana(salao),
+            campos=tuple(getattr(salao, f.attname) for f in Salon._meta.concrete_fields),
+        )
+
+    def modelo(self):
+        """Um Salon novo (sem query) com os campos deste tenant e os horários já interpretados."""
+        nomes = [f.attname for f in Salon._meta.concrete_fields]
+        salao = Salon.from_db('default', nomes, [copy.deepcopy(v) for v in self.campos])
+        salao.horarios_semana = self.horarios
+        return salao
+
+
+_LRU = OrderedDict()
+_TRAVA = threading.Lock()
+# Entra na chave do cache compartilhado: Tenants gravados antes de uma migração do Salon não servem mais
+_FORMATO = zlib.crc32(','.join(f.attname for f in Salon._meta.concrete_fields).encode())
+
+
+def _lru_ler(chave):
+    with _TRAVA:
+        tenant = _LRU.get(chave)
+        if tenant is not None:
+            _LRU.move_to_end(chave)
+        return tenant
+
+
+def _lru_gravar(chave, tenant):
+    with _TRAVA:
+        _LRU[chave] = tenant
+        _LRU.move_to_end(chave)
+        while len(_LRU) > getattr(settings, 'TENANT_LRU_TAMANHO', 1024):
+            _LRU.popitem(last=False)
+
+
+def _do_banco(salon_id):
+    # Versão lida antes do banco: se o salão mudar no meio, a próxima conferência já recarrega
+    atual = versao(SALAO, salon_id)
+    salao = Salon.objects.filter(pk=salon_id).first()
+    if salao is None:
+        return None
+    tenant = Tenant.do_salao(salao, atual)
+    cache.set(f"tenant:{_FORMATO}:id:{salao.id}", tenant, None)
+    cache.set(f"tenant:{_FORMATO}:slug:{salao.slug}", salao.id, None)
+    metricas.RESOLUCOES_TENANT.labels('banco').inc()
+    return tenant
+
+
+def por_id(salon_id):
+    if not salon_id:
+        return None
+    tenant = _lru_ler(('id', salon_id))
+    atual = versao(SALAO, salon_id)
+    if tenant is not None and tenant.versao == atual:
+        metricas.RESOLUCOES_TENANT.labels('lru').inc()
+        return tenant
+    tenant = cache.get(f"tenant:{_FORMATO}:id:{salon_id}")
+    if tenant is not None and tenant.versao == atual:
+        metricas.RESOLUCOES_TENANT.labels('cache').inc()
+    else:
+        tenant = _do_banco(salon_id)
+    if tenant is not None:
+        _lru_gravar(('id', salon_id), tenant)
+    return tenant
+
+
+def por_slug(slug):
+    if not slug:
+        return None
+    tenant = _lru_ler(('slug', slug))
+    if tenant is not None and tenant.versao == versao(SALAO, tenant.id):
+        metricas.RESOLUCOES_TENANT.labels('lru').inc()
+        return tenant
+    salon_id = cache.get(f"tenant:{_FORMATO}:slug:{slug}")
+    tenant = por_id(salon_id) if salon_id else None
+    if tenant is None or tenant.slug != slug:  # slug trocado: o mapeamento antigo não vale
+        salon_id = Salon.objects.filter(slug=slug).values_list('id', flat=True).first()
+        tenant = _do_banco(salon_id) if salon_id else None
+    if tenant is not None:
+        _lru_gravar(('slug', slug), tenant)
+    return tenant
+
+
+def invalidar_salao(salon_id):
+    """Descarta o Tenant do salão (também chamado quando muda o horário de funcionamento)."""
+    incrementar_versao(SALAO, salon_id)
+    # De novo depois do commit: quem recarregou do banco antes dele leu o dado antigo com a versão nova
+    transaction.on_commit(lambda: incrementar_versao(SALAO, salon_id))
+    with _TRAVA:
+        for chave in [k for k, t in _LRU.items() if t.id == salon_id]:
+            del _LRU[chave]
+
+
+def invalidar(sender, instance, **kwargs):
+    """Receiver do save/delete do Salon (ligado em core.apps)."""
+    invalidar_salao(instance.pk)
+
+
+def tenant_do_usuario(request):
+    """Tenant do salão do usuário autenticado (também para autenticação feita pelo DRF, depois do middleware)."""
+    tenant = getattr(request, 'tenant', None)
+    salon_id = getattr(request.user, 'salon_id', None)
+    if tenant is not None and tenant.id == salon_id:
+        return tenant
+    return por_id(salon_id)
+
+
+def salao_do_usuario(request):
+    tenant = tenant_do_usuario(request)
+    return tenant.modelo() if tenant else None
+
+
+def salao_da_url(request, slug):
+    tenant = getattr(request, 'tenant', None)
+    if tenant is None or tenant.slug != slug:
+        tenant = por_slug(slug)
+    if tenant is None:
+        raise Http404("Salão não encontrado")
+    return tenant.modelo()
+
+
+class TenantMiddleware:
+    """Resolve `request.tenant` (Tenant ou None). Precisa vir depois do AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = None
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if 'slug' in view_kwargs:
+            request.tenant = por_slug(view_kwargs['slug'])
+        elif request.user.is_authenticated:
+            request.tenant = por_id(getattr(request.user, 'salon_id', None))
@@ -0,0 +1,37 @@
+"""Versões por salão guardadas no cache, usadas para invalidar caches derivados.
+
+Em vez de apagar cada chave de cache que depende dos dados de um salão, as
+chaves incluem a versão atual (ex: `{% cache ... salao.id versao_catalogo %}`).
+Quando algo muda, basta trocar a versão: as entradas antigas simplesmente
+deixam de ser lidas e expiram sozinhas.
+"""
+import time
+
+from django.core.cache import cache
+
+# Namespaces em uso
+CATALOGO = "catalogo"  # serviços, categorias, profissionais, escalas, feriados, configurações
+AGENDA = "agenda"      # agendamentos (criados, alterados, cancelados, removidos)
+SALAO = "salao"        # o próprio Salon (core/tenant.py)
+
+
+def _chave(namespace, salon_id):
+    return f"versao:{namespace}:{salon_id}"
+
+
+def versao(namespace, salon_id):
+    """Versão atual; inicializa com o relógio se o cache foi limpo."""
+    chave = _chave(namespace, salon_id)
+    atual = cache.get(chave)
+    if atual is None:
+        # add() não sobrescreve se outro processo inicializou antes
+        cache.add(chave, time.time_ns(), None)
+        atual = cache.get(chave)
+    return atual
+
+
+def incrementar_versao(namespace, salon_id):
+    """Invalida tudo que depende de (namespace, salão)."""
+    if salon_id is None:
+        return
+    cache.set(_chave(namespace, salon_id), time.time_ns(), None)
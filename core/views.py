@@ -1,14 +1,18 @@
 from django.shortcuts import render
 
 # Create your views here.
+import hmac
 import json
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.text import slugify
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from prometheus_client import CONTENT_TYPE_LATEST
 from .models import Salon, User
+from .metricas import gerar_metricas
 
 def login_view(request):
     if request.method == "POST":
@@ -72,4 +76,17 @@ def signup_view(request):
         login(request, user)
         return redirect("dashboard")
 
-    return render(request, "auth/signup.html")
\ No newline at end of file
+    return render(request, "auth/signup.html")
+
+def metrics_view(request):
+    """Endpoint de scrape do Prometheus. Com METRICS_TOKEN definido, exige 'Authorization: Bearer <token>'.
+
+    Sem token só responde com DEBUG=True; em produção o endpoint some (404) até o token ser configurado.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseNotFound()
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    return HttpResponse(gerar_metricas(), content_type=CONTENT_TYPE_LATEST)
@@ -1,5 +1,13 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import reverse
 from rest_framework import serializers
-from scheduling.models import Service, Professional, Category, Holiday, SpecialSchedule, Appointment
+from core.tenant import salao_do_usuario, tenant_do_usuario
+from scheduling.models import Service, Professional, Category, Holiday, SpecialSchedule, Appointment, Customer, Resource, CalendarFeed, WaitlistEntry
+from scheduling.clientes import normalizar_telefone
+from scheduling.miniaturas import urls_miniaturas
+from jobs.models import Job
+from notifications.models import WebhookDelivery, WebhookEndpoint
+from notifications.webhooks import validar_url
 from datetime import datetime, timedelta
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -8,27 +16,92 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['salon']
 
+class ResourceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Resource
+        fields = '__all__'
+        read_only_fields = ['salon']
+
+    def validate_capacidade(self, valor):
+        if valor < 1:
+            raise serializers.ValidationError("A capacidade mínima é 1.")
+        return valor
+
 class ServiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Service
         fields = '__all__'
         read_only_fields = ['salon']
 
+    def validate_recursos(self, recursos):
+        salon = salao_do_usuario(self.context['request'])
+        if any(r.salon_id != salon.id for r in recursos):
+            raise serializers.ValidationError("Recurso de outro salão.")
+        return recursos
+
 class AppointmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Appointment
         fields = '__all__'
-        read_only_fields = ['salon', 'codigo_validacao']
+        # Status muda só pela action /agendamentos/<id>/status/ (com validação da transição)
+        read_only_fields = ['salon', 'codigo_validacao', 'customer', 'status', 'confirmado_em', 'cancelado_em', 'finalizado_em']
+
+class CustomerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Customer
+        fields = '__all__'
+        read_only_fields = ['salon', 'visitas', 'ultima_visita', 'total_gasto']
+        # A unicidade (salão, whatsapp) é checada em validate_whatsapp, já com o número normalizado
+        validators = []
+
+    def validate_whatsapp(self, valor):
+        numero = normalizar_telefone(valor)
+        if len(numero) < 10:
+            raise serializers.ValidationError("WhatsApp inválido.")
+        salon = salao_do_usuario(self.context['request'])
+        duplicados = Customer.objects.filter(salon=salon, whatsapp=numero)
+        if self.instance:
+            duplicados = duplicados.exclude(pk=self.instance.pk)
+        if duplicados.exists():
+            raise serializers.ValidationError("Já existe um cliente com este WhatsApp.")
+        return numero
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    servico_nome = serializers.CharField(source='service.nome', read_only=True)
+    profissional_nome = serializers.CharField(source='professional.nome', read_only=True, default=None)
+
+    class Meta:
+        model = WaitlistEntry
+        exclude = ['token']  # o token é o acesso do cliente à inscrição
+
+class CalendarFeedSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CalendarFeed
+        fields = ['id', 'professional', 'url', 'created_at']
+
+    def get_url(self, obj):
+        return self.context['request'].build_absolute_uri(reverse('feed_calendario', args=[obj.token]))
+
+    def validate_professional(self, professional):
+        if professional and professional.salon_id != tenant_do_usuario(self.context['request']).id:
+            raise serializers.ValidationError("Profissional de outro salão.")
+        return professional
 
 class ProfessionalSerializer(serializers.ModelSerializer):
     foto = serializers.ImageField(required=False, allow_null=True)
     services = serializers.PrimaryKeyRelatedField(many=True, read_only=True) 
+    miniaturas = serializers.SerializerMethodField()
     
     class Meta:
         model = Professional
         fields = '__all__'
         read_only_fields = ['salon', 'working_hours', 'breaks']
 
+    def get_miniaturas(self, obj):
+        return urls_miniaturas(obj)
+
 # --- SERIALIZER DE FOLGA INDIVIDUAL (CORRIGIDO) ---
 class SpecialScheduleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -43,7 +116,7 @@ class SpecialScheduleSerializer(serializers.ModelSerializer):
         fim = data.get('hora_fim')
 
         # Busca todos os agendamentos ATIVOS desse profissional para o dia
-        agendamentos = Appointment.objects.filter(professional=prof, data=dia).exclude(codigo_validacao__isnull=True) # Exemplo de filtro extra se necessario
+        agendamentos = Appointment.objects.ativos().filter(professional=prof, data=dia).select_related('service')
 
         for ag in agendamentos:
             duracao = ag.service.duracao_minutos if ag.service else 30 
@@ -84,7 +157,7 @@ class HolidaySerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         salon = None
         if hasattr(user, 'salon'): 
-            salon = user.salon
+            salon = salao_do_usuario(self.context['request'])
         elif hasattr(user, 'employees') and user.employees.exists():
             salon = user.employees.first().salon
         
@@ -94,12 +167,12 @@ class HolidaySerializer(serializers.ModelSerializer):
             
             # Se for feriado DIA TODO, não pode ter nenhum agendamento
             if not inicio:
-                if Appointment.objects.filter(salon=salon, data=data_feriado).exists():
+                if Appointment.objects.ativos().filter(salon=salon, data=data_feriado).exists():
                     raise serializers.ValidationError("Impossível bloquear o dia: Existem agendamentos marcados.")
             
             # Se for PARCIAL, verificamos colisão
             else:
-                agendamentos = Appointment.objects.filter(salon=salon, data=data_feriado)
+                agendamentos = Appointment.objects.ativos().filter(salon=salon, data=data_feriado).select_related('service')
                 f_ini = datetime.combine(data_feriado, inicio)
                 f_fim = datetime.combine(data_feriado, fim)
                 
@@ -111,4 +184,36 @@ class HolidaySerializer(serializers.ModelSerializer):
                     if f_ini < a_fim and f_fim > a_ini:
                         raise serializers.ValidationError(f"O bloqueio conflita com o agendamento de {ag.cliente_nome}.")
         
-        return data
\ No newline at end of file
+        return data
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'tarefa', 'status', 'tentativas', 'max_tentativas', 'executar_em', 'iniciado_em', 'concluido_em', 'resultado', 'ultimo_erro', 'created_at']
+        read_only_fields = fields
+
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WebhookEndpoint
+        fields = ['id', 'url', 'eventos', 'ativo', 'segredo', 'falhas_seguidas', 'proxima_tentativa_em', 'ultimo_erro', 'created_at']
+        read_only_fields = ['segredo', 'falhas_seguidas', 'proxima_tentativa_em', 'ultimo_erro', 'created_at']
+
+    def validate_url(self, valor):
+        try:
+            return validar_url(valor)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+
+    def validate_eventos(self, valor):
+        validos = {tipo for tipo, _ in WebhookEndpoint.EVENTOS_CHOICES}
+        if not isinstance(valor, list) or any(tipo not in validos for tipo in valor):
+            raise serializers.ValidationError(f"Use uma lista com: {', '.join(sorted(validos))} (vazia = todos).")
+        return sorted(set(valor))
+
+
+class WebhookDeliverySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WebhookDelivery
+        fields = ['id', 'eventos', 'primeiro_evento', 'ultimo_evento', 'sucesso', 'status_http', 'erro', 'duracao_ms', 'created_at']
+        read_only_fields = fields
@@ -7,10 +7,16 @@ from . import views
 router = DefaultRouter()
 router.register(r'categorias', views.CategoryViewSet)
 router.register(r'servicos', views.ServiceViewSet)
+router.register(r'recursos', views.ResourceViewSet)
 router.register(r'profissionais', views.ProfessionalViewSet)
 router.register(r'feriados', views.HolidayViewSet)
 router.register(r'folgas-individuais', views.SpecialScheduleViewSet)
 router.register(r'agendamentos', views.AppointmentViewSet)
+router.register(r'clientes', views.CustomerViewSet)
+router.register(r'feeds-calendario', views.CalendarFeedViewSet)
+router.register(r'lista-espera', views.WaitlistEntryViewSet)
+router.register(r'webhooks', views.WebhookEndpointViewSet)
+router.register(r'jobs', views.JobViewSet)
 
 urlpatterns = [
     # 1. Tela Principal (HTML)
@@ -23,6 +29,8 @@ urlpatterns = [
     # 3. API de Configuração (Mantida manual pois é específica)
     # Adicionamos a barra '/' logo após <int:salon_id>
     path('saloes/<int:salon_id>/', views.api_configuracoes, name='api_config'),
+    path('calendario/', views.api_calendario, name='api_calendario'),
+    path('ocupacao/', views.api_ocupacao, name='api_ocupacao'),
 
     # 4. Inclui todas as rotas mágicas do Router
     # Isso cobre URLs como: /servicos/, /profissionais/1/, etc.
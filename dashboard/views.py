@@ -1,37 +1,47 @@
 import json
 import time
+from datetime import datetime, timedelta
+
+import numpy as np
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import StreamingHttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.utils import timezone
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, Max
 
 # DRF Imports
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, serializers
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 
 # Models & Serializers
+from core import metricas
 from core.models import Salon
-from scheduling.models import Service, Professional, Appointment, Category, Holiday, SpecialSchedule, WorkingHour, ProfessionalBreak
-from .serializers import ServiceSerializer, ProfessionalSerializer, CategorySerializer, HolidaySerializer, SpecialScheduleSerializer, AppointmentSerializer
+from core.tenant import salao_do_usuario, tenant_do_usuario
+from core.versoes import CATALOGO, versao
+from scheduling.models import Service, Professional, Appointment, Customer, Resource, CalendarFeed, Category, Holiday, SpecialSchedule, WaitlistEntry
+from scheduling.agenda import Agenda, hhmm, horario_do_salao
+from scheduling.arquivo import historico_agendamentos
+from scheduling.busca import buscar_agendamentos
+from scheduling.clientes import normalizar_telefone
+from scheduling.horarios import grade_do_salao, gravar_escala, gravar_grade_do_salao, ler_escala, para_painel
+from scheduling.miniaturas import url_miniatura
+from scheduling.ocupacao import MapaOcupacao
+from jobs.models import Job
+from notifications.models import WebhookEndpoint
+from notifications.webhooks import reativar
+from .serializers import ServiceSerializer, ProfessionalSerializer, CategorySerializer, HolidaySerializer, SpecialScheduleSerializer, AppointmentSerializer, JobSerializer, CustomerSerializer, ResourceSerializer, CalendarFeedSerializer, WaitlistEntrySerializer, WebhookEndpointSerializer, WebhookDeliverySerializer
 
 # --- VIEWS DE RENDERIZAÇÃO (HTML) ---
 
-@login_required
-def dashboard_view(request):
-    salao = request.user.salon
-    
-    # Buscas otimizadas para o template
-    agendamentos = Appointment.objects.filter(salon=salao).order_by('-data', 'hora_inicio')
-    categorias = Category.objects.filter(salon=salao)
-    servicos = Service.objects.filter(salon=salao)
-    feriados = Holiday.objects.filter(salon=salao)
-    folgas = SpecialSchedule.objects.filter(salon=salao)
-
-    # Montagem da estrutura complexa de profissionais para o template
-    profs_db = Professional.objects.filter(salon=salao)
+def _montar_profissionais(salao):
+    """Estrutura de profissionais do painel, em 4 queries independente do tamanho da equipe."""
+    profs_db = Professional.objects.filter(salon=salao).prefetch_related('working_hours', 'breaks', 'services')
     profissionais_list = []
     for p in profs_db:
         whs = p.working_hours.all()
@@ -48,39 +58,62 @@ def dashboard_view(request):
             "servicos_ids": [s.id for s in p.services.all()],
             "escala": escala,
             "intervalos": intervalos,
-            "foto_url": p.foto.url if p.foto else None
+            "foto_url": url_miniatura(p, 320),
+            "foto_url_jpg": url_miniatura(p, 320, 'jpg')
         })
+    return profissionais_list
 
+@login_required
+def dashboard_view(request):
+    salao = salao_do_usuario(request)
+    
+    agendamentos = Appointment.objects.filter(salon=salao).select_related('service', 'professional', 'customer').order_by('-data', 'hora_inicio')
+
+    # Os blocos de catálogo/configuração do template ficam em {% cache %} com a
+    # versão do catálogo na chave. Por isso os dados são passados como callables:
+    # o template só os executa (e só vai ao banco) quando o fragmento não está em cache.
     context = {
         "salao": salao,
+        "versao_catalogo": versao(CATALOGO, salao.id),
         "agendamentos": agendamentos,
-        "categorias": list(categorias.values()),
-        "servicos": list(servicos.values()),
-        "profissionais": profissionais_list,
-        "feriados": list(feriados.values()),
-        "folgas": list(folgas.values('id', 'data', 'hora_inicio', 'hora_fim', 'professional_id')),
+        "categorias": lambda: list(Category.objects.filter(salon=salao).values()),
+        "servicos": lambda: list(Service.objects.filter(salon=salao).values()),
+        "profissionais": lambda: _montar_profissionais(salao),
+        "feriados": lambda: list(Holiday.objects.filter(salon=salao).values()),
+        "folgas": lambda: list(SpecialSchedule.objects.filter(salon=salao).values('id', 'data', 'hora_inicio', 'hora_fim', 'professional_id')),
+        "horarios_customizados": lambda: json.dumps(para_painel(salao)[1]),
+        "config_js": {"salon_id": salao.id, "salon_slug": salao.slug, "dias_fechados": para_painel(salao)[0]},
         "tab": request.GET.get("tab", "agenda")
     }
     return render(request, "dashboard/index.html", context)
 
 @login_required
 def htmx_agendamentos(request):
-    """Retorna o HTML parcial da tabela para atualização automática"""
-    salao = request.user.salon
-    agendamentos = Appointment.objects.filter(salon=salao).order_by('-data', 'hora_inicio')
+    """Retorna o HTML parcial da tabela para atualização automática (?q= filtra pela busca)"""
+    salao = salao_do_usuario(request)
+    agendamentos = Appointment.objects.filter(salon=salao).select_related('service', 'professional', 'customer').order_by('-data', 'hora_inicio')
+    if request.GET.get('q', '').strip():
+        agendamentos = buscar_agendamentos(salao, request.GET['q'], agendamentos)[:100]
     return render(request, "dashboard/partials/lista_agendamentos.html", {"agendamentos": agendamentos})
 
 @login_required
 def sse_updates(request):
     """Canal de SSE para notificar o frontend sobre mudanças"""
     def event_stream():
-        last_count = Appointment.objects.count()
-        while True:
-            current_count = Appointment.objects.count()
-            if current_count != last_count:
-                last_count = current_count
-                yield f"data: update\n\n"
-            time.sleep(1)
+        metricas.CONEXOES_SSE.inc()
+        try:
+            # Contagem + última alteração: pega agendamentos novos e mudanças de status
+            assinatura = lambda: tuple(Appointment.objects.aggregate(n=Count('id'), ultimo=Max('atualizado_em')).values())
+            ultima = assinatura()
+            while True:
+                atual = assinatura()
+                if atual != ultima:
+                    ultima = atual
+                    yield f"data: update\n\n"
+                time.sleep(1)
+        finally:
+            # Executado quando o cliente desconecta (o servidor fecha o gerador)
+            metricas.CONEXOES_SSE.dec()
 
     response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
     response['Cache-Control'] = 'no-cache'
@@ -94,10 +127,11 @@ class BaseSalonViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return self.queryset.filter(salon=self.request.user.salon)
+        tenant = tenant_do_usuario(self.request)
+        return self.queryset.filter(salon_id=tenant.id if tenant else None)
 
     def perform_create(self, serializer):
-        serializer.save(salon=self.request.user.salon)
+        serializer.save(salon=salao_do_usuario(self.request))
 
 class CategoryViewSet(BaseSalonViewSet):
     queryset = Category.objects.all()
@@ -107,6 +141,34 @@ class ServiceViewSet(BaseSalonViewSet):
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
 
+class ResourceViewSet(BaseSalonViewSet):
+    """Recursos compartilhados (lavatórios, salas) que os serviços exigem"""
+    queryset = Resource.objects.all()
+    serializer_class = ResourceSerializer
+
+class CalendarFeedViewSet(BaseSalonViewSet):
+    """Links .ics da agenda (do salão ou de um profissional). Para revogar, apague; para trocar o link, apague e crie outro."""
+    queryset = CalendarFeed.objects.select_related('professional').order_by('id')
+    serializer_class = CalendarFeedSerializer
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+
+class WaitlistEntryViewSet(BaseSalonViewSet):
+    """Lista de espera do salão (?status=aguardando). Só leitura; DELETE tira o cliente da lista."""
+    queryset = WaitlistEntry.objects.select_related('service', 'professional').order_by('created_at', 'id')
+    serializer_class = WaitlistEntrySerializer
+    http_method_names = ['get', 'delete', 'head', 'options']
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.request.query_params.get('status'):
+            qs = qs.filter(status=self.request.query_params['status'])
+        return qs
+
+    def perform_destroy(self, instance):
+        if instance.status == WaitlistEntry.AGUARDANDO:
+            instance.status = WaitlistEntry.CANCELADO
+            instance.save(update_fields=['status'])
+
 class HolidayViewSet(BaseSalonViewSet):
     queryset = Holiday.objects.all()
     serializer_class = HolidaySerializer
@@ -116,9 +178,103 @@ class SpecialScheduleViewSet(BaseSalonViewSet):
     serializer_class = SpecialScheduleSerializer
 
 class AppointmentViewSet(BaseSalonViewSet):
+    """DELETE não apaga: cancela o agendamento e mantém o histórico (?status= filtra a lista)"""
     queryset = Appointment.objects.all()
     serializer_class = AppointmentSerializer
 
+    def get_queryset(self):
+        qs = super().get_queryset().select_related('service', 'professional')
+        if self.request.query_params.get('status'):
+            qs = qs.filter(status=self.request.query_params['status'])
+        return qs
+
+    def perform_destroy(self, instance):
+        try:
+            instance.alterar_status(Appointment.CANCELADO)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+
+    @action(detail=True, methods=['post'])
+    def status(self, request, pk=None):
+        """Muda o status: {"status": "confirmado" | "cancelado" | "nao_compareceu" | "concluido"}"""
+        appt = self.get_object()
+        try:
+            appt.alterar_status(request.data.get('status'))
+        except DjangoValidationError as e:
+            return Response({"detail": " ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(appt).data)
+
+    @action(detail=False)
+    def busca(self, request):
+        """Busca por cliente, WhatsApp, código, serviço ou profissional (?q=, prefixo de cada palavra)"""
+        qs = buscar_agendamentos(salao_do_usuario(request), request.query_params.get('q', ''), self.get_queryset())
+        return Response(self.get_serializer(qs.order_by('-data', '-hora_inicio')[:50], many=True).data)
+
+    @action(detail=False)
+    def historico(self, request):
+        """Histórico completo, incluindo arquivados (?de=&ate=&whatsapp=&offset=&limite=)"""
+        filtros = {}
+        params = request.query_params
+        if params.get('de'): filtros['data__gte'] = params['de']
+        if params.get('ate'): filtros['data__lte'] = params['ate']
+        if params.get('whatsapp'): filtros['cliente_whatsapp'] = params['whatsapp']
+        try:
+            offset = max(0, int(params.get('offset', 0)))
+            limite = min(500, max(1, int(params.get('limite', 100))))
+        except ValueError:
+            return Response({"detail": "offset/limite inválidos"}, status=status.HTTP_400_BAD_REQUEST)
+        qs = historico_agendamentos(salao_do_usuario(request), **filtros).order_by('-data', '-hora_inicio')
+        return Response(list(qs[offset:offset + limite]))
+
+class CustomerViewSet(BaseSalonViewSet):
+    """Clientes do salão (?busca= por nome ou WhatsApp), com o histórico em /clientes/<id>/historico/"""
+    queryset = Customer.objects.all()
+    serializer_class = CustomerSerializer
+
+    def get_queryset(self):
+        qs = super().get_queryset().order_by('nome')
+        busca = self.request.query_params.get('busca', '').strip()
+        if busca:
+            numero = normalizar_telefone(busca)
+            # Número: prefixo no índice único (salon, whatsapp); texto: nome
+            qs = qs.filter(whatsapp__startswith=numero) if numero and len(numero) >= 4 else qs.filter(nome__icontains=busca)
+        return qs[:200] if self.action == 'list' else qs
+
+    @action(detail=True)
+    def historico(self, request, pk=None):
+        cliente = self.get_object()
+        qs = historico_agendamentos(salao_do_usuario(request), customer=cliente).order_by('-data', '-hora_inicio')
+        return Response(list(qs[:500]))
+
+class WebhookEndpointViewSet(BaseSalonViewSet):
+    """Webhooks de agendamento (criado/atualizado/cancelado). PATCH {"ativo": true} reativa e entrega o que ficou pendente; log em /webhooks/<id>/entregas/"""
+    queryset = WebhookEndpoint.objects.order_by('id')
+    serializer_class = WebhookEndpointSerializer
+
+    def perform_update(self, serializer):
+        estava_ativo = serializer.instance.ativo
+        endpoint = serializer.save()
+        if endpoint.ativo and not estava_ativo:
+            reativar(endpoint)
+
+    @action(detail=True)
+    def entregas(self, request, pk=None):
+        """Últimas 100 entregas (POSTs) do endpoint"""
+        entregas = self.get_object().entregas.order_by('-created_at')[:100]
+        return Response(WebhookDeliverySerializer(entregas, many=True).data)
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status dos jobs em segundo plano do salão (?status=pendente|executando|concluido|falhou)"""
+    permission_classes = [IsAuthenticated]
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        qs = self.queryset.filter(salon=salao_do_usuario(self.request)).order_by('-id')
+        if self.request.query_params.get('status'):
+            qs = qs.filter(status=self.request.query_params['status'])
+        return qs[:200] if self.action == 'list' else qs
+
 class ProfessionalViewSet(BaseSalonViewSet):
     queryset = Professional.objects.all()
     serializer_class = ProfessionalSerializer
@@ -130,15 +286,14 @@ class ProfessionalViewSet(BaseSalonViewSet):
         data = request.data.dict() if hasattr(request.data, 'dict') else request.data
         
         servicos_raw = data.get('servicos_ids')
-        escala_raw = data.get('escala')
-        intervalos_raw = data.get('intervalos')
+        escala = self._ler_escala(data)
 
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         professional = serializer.instance
 
-        self._process_nested_data(professional, servicos_raw, escala_raw, intervalos_raw)
+        self._process_nested_data(professional, servicos_raw, escala)
         
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
@@ -151,8 +306,7 @@ class ProfessionalViewSet(BaseSalonViewSet):
         data = request.data.dict() if hasattr(request.data, 'dict') else request.data
         
         servicos_raw = data.get('servicos_ids')
-        escala_raw = data.get('escala')
-        intervalos_raw = data.get('intervalos')
+        escala = self._ler_escala(data)
         remover_foto = data.get('remover_foto')
 
         if str(remover_foto).lower() == 'true':
@@ -163,11 +317,20 @@ class ProfessionalViewSet(BaseSalonViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         
-        self._process_nested_data(instance, servicos_raw, escala_raw, intervalos_raw)
+        self._process_nested_data(instance, servicos_raw, escala)
 
         return Response(serializer.data)
 
-    def _process_nested_data(self, professional, servicos_raw, escala_raw, intervalos_raw):
+    def _ler_escala(self, data):
+        """Valida escala/intervalos antes de gravar qualquer coisa (400 se inválidos)."""
+        if not data.get('escala'):
+            return None
+        try:
+            return ler_escala(data['escala'], data.get('intervalos'))
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'escala': e.messages})
+
+    def _process_nested_data(self, professional, servicos_raw, escala):
         """Processa os dados complexos (escalas, serviços) enviados pelo frontend"""
         # 1. Serviços (ManyToMany)
         if servicos_raw:
@@ -177,54 +340,130 @@ class ProfessionalViewSet(BaseSalonViewSet):
             except Exception as e:
                 print(f"Erro ao processar serviços: {e}")
 
-        # 2. Escala (WorkingHour)
-        if escala_raw:
-            try:
-                escala_data = json.loads(escala_raw) if isinstance(escala_raw, str) else escala_raw
-                
-                # Limpa e recria
-                professional.working_hours.all().delete()
-                professional.breaks.all().delete()
-                
-                dias = escala_data.get("dias", [])
-                inicio = escala_data.get("inicio")
-                fim = escala_data.get("fim")
-                
-                for dia in dias:
-                    if inicio and fim:
-                        WorkingHour.objects.create(
-                            professional=professional, 
-                            day_of_week=dia, 
-                            start_time=inicio, 
-                            end_time=fim
-                        )
-                
-                # 3. Intervalos (ProfessionalBreak) - depende da escala ser processada
-                if intervalos_raw:
-                    intervalos_list = json.loads(intervalos_raw) if isinstance(intervalos_raw, str) else intervalos_raw
-                    for i in intervalos_list:
-                        for dia in dias: # Aplica intervalos nos dias de trabalho
-                            ProfessionalBreak.objects.create(
-                                professional=professional, 
-                                day_of_week=dia, 
-                                start_time=i["start"], 
-                                end_time=i["end"]
-                            )
-            except Exception as e:
-                print(f"Erro ao processar escala: {e}")
+        # 2. Escala (WorkingHour) e intervalos (ProfessionalBreak) nos dias de trabalho, já validados
+        if escala is not None:
+            gravar_escala(professional, *escala)
 
 # --- API MANUAL (Configurações Específicas) ---
+# Grade do calendário (dia × profissional) em número fixo de queries
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_calendario(request):
+    """?inicio=AAAA-MM-DD (padrão: segunda desta semana) &dias=7 (1 a 31) &profissional=<id>"""
+    salao = salao_do_usuario(request)
+    try:
+        hoje = timezone.localdate()
+        inicio = datetime.strptime(request.GET['inicio'], "%Y-%m-%d").date() if request.GET.get('inicio') else hoje - timedelta(days=hoje.weekday())
+        dias = min(31, max(1, int(request.GET.get('dias', 7))))
+        profissionais = [int(request.GET['profissional'])] if request.GET.get('profissional') else None
+    except ValueError:
+        return Response({"error": "Parâmetros inválidos"}, status=400)
+
+    agenda = Agenda(salao, inicio, inicio + timedelta(days=dias - 1), profissionais=profissionais)
+    grade = []
+    for data in agenda.datas:
+        feriado_dia = next((f.descricao for f in agenda.feriados.get(data, []) if not f.hora_inicio), None)
+        horario = horario_do_salao(salao, data.weekday())
+        colunas = {}
+        for prof in agenda.profissionais:
+            d = agenda.dia(prof.id, data)
+            colunas[prof.id] = {
+                "expediente": [hhmm(d.expediente[0]), hhmm(d.expediente[1])] if d.expediente else None,
+                "bloqueado": d.bloqueado,
+                "bloqueios": [{"inicio": hhmm(i), "fim": hhmm(f), "tipo": t, "descricao": desc} for i, f, t, desc in d.bloqueios],
+                "agendamentos": [
+                    {"id": a.id, "inicio": hhmm(i), "fim": hhmm(f), "cliente": a.cliente_nome, "servico": a.service.nome if a.service else None,
+                     "status": a.status, "codigo": a.codigo_validacao}
+                    for i, f, a in d.agendamentos
+                ],
+            }
+        grade.append({
+            "data": data.isoformat(),
+            "fechado": horario is None,
+            "feriado": feriado_dia,
+            "abertura": hhmm(horario[0]) if horario else None,
+            "fechamento": hhmm(horario[1]) if horario else None,
+            "profissionais": colunas,
+        })
+    return Response({
+        "inicio": agenda.inicio.isoformat(),
+        "fim": agenda.fim.isoformat(),
+        "profissionais": [{"id": p.id, "nome": p.nome, "foto_url": url_miniatura(p, 64)} for p in agenda.profissionais],
+        "dias": grade,
+    })
+
+# Heatmap de ocupação (agendado / aberto) por profissional, dia e faixa de horário
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_ocupacao(request):
+    """?inicio=AAAA-MM-DD&fim=AAAA-MM-DD (padrão: 30 dias antes e depois de hoje, até 93 dias) &profissional=<id> &faixa=15"""
+    salao = salao_do_usuario(request)
+    try:
+        hoje = timezone.localdate()
+        inicio = datetime.strptime(request.GET['inicio'], "%Y-%m-%d").date() if request.GET.get('inicio') else hoje - timedelta(days=30)
+        fim = datetime.strptime(request.GET['fim'], "%Y-%m-%d").date() if request.GET.get('fim') else hoje + timedelta(days=30)
+        faixa = int(request.GET.get('faixa', 15))
+        profissionais = [int(request.GET['profissional'])] if request.GET.get('profissional') else None
+        if fim < inicio or (fim - inicio).days >= 93 or faixa not in (10, 15, 20, 30, 60):
+            raise ValueError
+    except ValueError:
+        return Response({"error": "Parâmetros inválidos"}, status=400)
+
+    mapa = MapaOcupacao(salao, inicio, fim, profissionais=profissionais, faixa=faixa)
+    primeira, ultima = mapa.faixas_com_expediente()
+
+    def resumo(aberto, agendado):
+        aberto, agendado = int(aberto), int(agendado)
+        return {"aberto_min": aberto, "agendado_min": agendado, "ocupacao": round(agendado / aberto, 3) if aberto else None}
+
+    ocupacao = np.round(mapa.ocupacao()[:, :, primeira:ultima], 3)
+    aberto_prof, agendado_prof = mapa.aberto.sum(axis=(1, 2)), mapa.agendado.sum(axis=(1, 2))
+    aberto_dia, agendado_dia = mapa.aberto.sum(axis=(0, 2)), mapa.agendado.sum(axis=(0, 2))
+    return Response({
+        "inicio": inicio.isoformat(),
+        "fim": fim.isoformat(),
+        "faixa_minutos": faixa,
+        "faixas": [hhmm(b * faixa) for b in range(primeira, ultima)],
+        "datas": [str(d) for d in mapa.datas],
+        "total": resumo(mapa.aberto.sum(), mapa.agendado.sum()),
+        "dias": [resumo(a, g) for a, g in zip(aberto_dia, agendado_dia)],
+        "profissionais": [
+            {
+                "id": prof.id, "nome": prof.nome, **resumo(aberto_prof[i], agendado_prof[i]),
+                # [dia][faixa]: fração agendada dos minutos abertos; null sem expediente
+                "heatmap": [[None if np.isnan(v) else float(v) for v in linha] for linha in ocupacao[i]],
+            }
+            for i, prof in enumerate(mapa.profissionais)
+        ],
+    })
+
 # Mantida separada pois lida com atualização parcial de campos específicos do Salon
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def api_configuracoes(request, salon_id):
-    salao = request.user.salon
-    if salao.id != int(salon_id):
+    tenant = tenant_do_usuario(request)
+    if tenant is None or tenant.id != int(salon_id):
         return Response({"error": "Forbidden"}, status=403)
+    salao = Salon.objects.get(pk=tenant.id)  # vai ser alterado: do banco, não do cache do tenant
     
     data = request.data
-    allowed = ["nome", "cnpj_cpf", "telefone", "hora_abertura_padrao", "hora_fechamento_padrao", "intervalo_minutos", "dias_fechados", "cor_do_tema", "ocultar_precos", "endereco", "horarios_customizados"]
+    allowed = ["nome", "cnpj_cpf", "telefone", "hora_abertura_padrao", "hora_fechamento_padrao", "intervalo_minutos", "cor_do_tema", "ocultar_precos", "endereco"]
+
+    # Horário de funcionamento: validado e gravado em OpeningHour (o que faltar no payload fica como está)
+    grade = None
+    campos_grade = ("hora_abertura_padrao", "hora_fechamento_padrao", "dias_fechados", "horarios_customizados")
+    if any(k in data for k in campos_grade):
+        dias_fechados, customizados = para_painel(salao)
+        try:
+            grade = grade_do_salao(
+                data.get("hora_abertura_padrao", salao.hora_abertura_padrao),
+                data.get("hora_fechamento_padrao", salao.hora_fechamento_padrao),
+                data.get("dias_fechados", dias_fechados),
+                data.get("horarios_customizados", customizados),
+            )
+        except DjangoValidationError as e:
+            return Response({"error": " ".join(e.messages)}, status=400)
     
     for k, v in data.items():
         if k in allowed:
@@ -235,5 +474,8 @@ def api_configuracoes(request, salon_id):
             else:
                 setattr(salao, k, v)
     
-    salao.save()
+    with transaction.atomic():
+        salao.save()
+        if grade is not None:
+            gravar_grade_do_salao(salao, grade)
     return Response({"ok": True})
\ No newline at end of file
@@ -0,0 +1,13 @@
+# Configuração do gunicorn (lida automaticamente quando executado na raiz do projeto)
+#
+# Métricas com vários workers: exporte PROMETHEUS_MULTIPROC_DIR apontando para
+# um diretório vazio antes de subir o gunicorn (ver core/metricas.py).
+
+
+import os
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,150 @@
+"""Fila de jobs local, persistida no banco (sem broker externo).
+
+Declaração de uma tarefa (em <app>/tasks.py, descoberto automaticamente):
+
+    from jobs.fila import tarefa
+
+    @tarefa('booking.enviar_confirmacao', max_tentativas=3)
+    def enviar_confirmacao(appointment_id):
+        ...
+
+Enfileiramento (o job só é gravado se a transação atual fizer commit):
+
+    enfileirar('booking.enviar_confirmacao', {'appointment_id': appt.id}, salon=salao)
+
+Os jobs são executados pelo comando `python manage.py runworker`.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_TAREFAS = {}
+
+
+class Tarefa:
+    def __init__(self, nome, funcao, max_tentativas, limite_por_salao):
+        self.nome = nome
+        self.funcao = funcao
+        self.max_tentativas = max_tentativas
+        self.limite_por_salao = limite_por_salao
+
+    def __call__(self, *args, **kwargs):
+        return self.funcao(*args, **kwargs)
+
+
+def tarefa(nome, max_tentativas=5, limite_por_salao=None):
+    """Registra a função como tarefa da fila.
+
+    `limite_por_salao` sobrescreve JOBS_LIMITE_POR_SALAO (jobs simultâneos do
+    mesmo salão) para esta tarefa.
+    """
+    def decorator(funcao):
+        if nome in _TAREFAS and _TAREFAS[nome].funcao is not funcao:
+            raise ValueError(f"Tarefa '{nome}' registrada duas vezes")
+        _TAREFAS[nome] = Tarefa(nome, funcao, max_tentativas, limite_por_salao)
+        return funcao
+    return decorator
+
+
+def obter_tarefa(nome):
+    try:
+        return _TAREFAS[nome]
+    except KeyError:
+        raise LookupError(f"Tarefa desconhecida: '{nome}'")
+
+
+def enfileirar(nome, payload=None, salon=None, executar_em=None, chave=None):
+    """Agenda a tarefa para depois do commit da transação atual.
+
+    Fora de um bloco atômico o job é criado imediatamente. Com `chave`, se já
+    houver um job pendente com a mesma chave, nada é criado.
+    """
+    tarefa_obj = obter_tarefa(nome)  # falha cedo se o nome estiver errado
+    salon_id = getattr(salon, 'pk', salon)
+
+    def _criar():
+        from .models import Job
+        job = Job(
+            salon_id=salon_id,
+            tarefa=nome,
+            payload=payload or {},
+            chave=chave,
+            max_tentativas=tarefa_obj.max_tentativas,
+            executar_em=executar_em or timezone.now(),
+        )
+        try:
+            with transaction.atomic():
+                job.save()
+        except IntegrityError:
+            if not chave:
+                raise
+            return  # já existe um pendente com essa chave
+
+        if getattr(settings, 'JOBS_EXECUTAR_NA_HORA', False):
+            executar_job(job)
+
+    transaction.on_commit(_criar)
+
+
+def calcular_backoff(tentativas, base=None, maximo=None):
+    """Exponencial com jitter: base * 2^(n-1), limitado a `maximo` (padrão: JOBS_BACKOFF_*)."""
+    base = base or getattr(settings, 'JOBS_BACKOFF_BASE_SEGUNDOS', 10)
+    maximo = maximo or getattr(settings, 'JOBS_BACKOFF_MAXIMO_SEGUNDOS', 3600)
+    atraso = min(maximo, base * (2 ** max(0, tentativas - 1)))
+    return timedelta(seconds=atraso * random.uniform(0.8, 1.2))
+
+
+def executar_job(job):
+    """Executa um job já reservado (status EXECUTANDO) e grava o desfecho."""
+    from .models import Job
+
+    agora = timezone.now()
+    if job.status == Job.PENDENTE:
+        # Execução direta (JOBS_EXECUTAR_NA_HORA): conta a tentativa aqui
+        job.tentativas += 1
+        job.status = Job.EXECUTANDO
+        job.iniciado_em = agora
+
+    try:
+        resultado = obter_tarefa(job.tarefa).funcao(**job.payload)
+    except Exception as exc:
+        job.ultimo_erro = ''.join(traceback.format_exception(exc))[-4000:]
+        if job.tentativas >= job.max_tentativas:
+            job.status = Job.FALHOU
+            job.concluido_em = timezone.now()
+            logger.error("Job %s (%s) falhou definitivamente: %s", job.pk, job.tarefa, exc)
+        else:
+            job.status = Job.PENDENTE
+            job.executar_em = timezone.now() + calcular_backoff(job.tentativas)
+            logger.warning("Job %s (%s) falhou (tentativa %s), nova tentativa às %s", job.pk, job.tarefa, job.tentativas, job.executar_em)
+    else:
+        job.status = Job.CONCLUIDO
+        job.concluido_em = timezone.now()
+        job.resultado = resultado if _serializavel(resultado) else repr(resultado)
+        job.ultimo_erro = ''
+
+    try:
+        job.save()
+    except IntegrityError:
+        # Voltou para PENDENTE mas já existe outro pendente com a mesma chave:
+        # o outro cobre este trabalho.
+        job.status = Job.CONCLUIDO
+        job.concluido_em = timezone.now()
+        job.save()
+    return job
+
+
+def _serializavel(valor):
+    import json
+    try:
+        json.dumps(valor)
+        return True
+    except (TypeError, ValueError):
+        return False
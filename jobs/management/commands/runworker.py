@@ -0,0 +1,51 @@
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.worker import identificador_worker, processar_lote, recuperar_travados
+
+
+class Command(BaseCommand):
+    help = "Executa os jobs da fila local (tabela jobs_job)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=1, help="Jobs executados em paralelo neste processo")
+        parser.add_argument("--intervalo", type=float, default=1.0, help="Segundos de espera quando a fila está vazia")
+        parser.add_argument("--uma-vez", action="store_true", help="Processa o que estiver vencido e sai")
+
+    def handle(self, *args, **options):
+        threads = max(1, options["threads"])
+        worker_id = identificador_worker()
+        self._parar = False
+        signal.signal(signal.SIGTERM, self._sinal_parada)
+        signal.signal(signal.SIGINT, self._sinal_parada)
+
+        self.stdout.write(f"Worker {worker_id} iniciado ({threads} threads)")
+        recuperar_travados()
+        ultimo_resgate = time.monotonic()
+
+        def rodada(_):
+            close_old_connections()
+            try:
+                return processar_lote(worker_id, quantidade=1)
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            while not self._parar:
+                executados = sum(pool.map(rodada, range(threads)))
+                if time.monotonic() - ultimo_resgate > 60:
+                    recuperar_travados()
+                    ultimo_resgate = time.monotonic()
+                if not executados:
+                    if options["uma_vez"]:
+                        break
+                    time.sleep(options["intervalo"])
+
+        self.stdout.write(f"Worker {worker_id} encerrado")
+
+    def _sinal_parada(self, signum, frame):
+        self._parar = True
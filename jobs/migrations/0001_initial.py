@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0002_salon_horarios_customizados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarefa', models.CharField(max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluido', 'Concluído'), ('falhou', 'Falhou')], default='pendente', max_length=20)),
+                ('chave', models.CharField(blank=True, max_length=200, null=True)),
+                ('tentativas', models.IntegerField(default=0)),
+                ('max_tentativas', models.IntegerField(default=5)),
+                ('executar_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('ultimo_erro', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('salon', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='core.salon')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'pendente')), fields=['executar_em', 'id'], name='job_fila_pendente_idx'), models.Index(fields=['salon', 'status'], name='job_salon_status_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pendente')), fields=('chave',), name='job_chave_pendente_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from core.models import Salon
+
+
+class Job(models.Model):
+    PENDENTE = 'pendente'
+    EXECUTANDO = 'executando'
+    CONCLUIDO = 'concluido'
+    FALHOU = 'falhou'
+    STATUS_CHOICES = [
+        (PENDENTE, 'Pendente'),
+        (EXECUTANDO, 'Executando'),
+        (CONCLUIDO, 'Concluído'),
+        (FALHOU, 'Falhou'),
+    ]
+
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='jobs', null=True, blank=True)
+    tarefa = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDENTE)
+
+    # Deduplicação: só pode existir um job PENDENTE com a mesma chave
+    chave = models.CharField(max_length=200, null=True, blank=True)
+
+    tentativas = models.IntegerField(default=0)
+    max_tentativas = models.IntegerField(default=5)
+    executar_em = models.DateTimeField(default=timezone.now)
+
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    resultado = models.JSONField(null=True, blank=True)
+    ultimo_erro = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Busca da fila: só os pendentes, pelo horário
+            models.Index(fields=['executar_em', 'id'], condition=Q(status='pendente'), name='job_fila_pendente_idx'),
+            models.Index(fields=['salon', 'status'], name='job_salon_status_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['chave'], condition=Q(status='pendente'), name='job_chave_pendente_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.tarefa} #{self.pk} ({self.status})"
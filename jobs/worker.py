@@ -0,0 +1,125 @@
+import logging
+import os
+import socket
+from collections import Counter
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import LessThan
+from django.utils import timezone
+
+from core.models import Salon
+
+from .fila import executar_job, obter_tarefa
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def identificador_worker():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _limite_salao(job):
+    try:
+        limite = obter_tarefa(job.tarefa).limite_por_salao
+    except LookupError:
+        limite = None
+    return limite or getattr(settings, 'JOBS_LIMITE_POR_SALAO', 2)
+
+
+def _executando_no_salao():
+    """Subconsulta: jobs EXECUTANDO do mesmo salão do job sendo reservado."""
+    executando = (
+        Job.objects.filter(salon_id=OuterRef('salon_id'), status=Job.EXECUTANDO)
+        .order_by().values('salon_id').annotate(n=Count('id')).values('n')
+    )
+    return Coalesce(Subquery(executando, output_field=IntegerField()), Value(0))
+
+
+def reservar_jobs(worker_id, quantidade):
+    """Marca até `quantidade` jobs vencidos como EXECUTANDO e os devolve.
+
+    Respeita o limite de jobs simultâneos por salão. No Postgres os candidatos
+    são lidos com FOR UPDATE SKIP LOCKED; nos demais bancos cada job é
+    reservado com um UPDATE condicional (só um worker consegue mudar o status).
+
+    O limite é conferido no próprio UPDATE (contagem de EXECUTANDO no WHERE),
+    não na leitura anterior. No Postgres as linhas dos salões envolvidos ficam
+    travadas até o fim da reserva: sem isso dois workers enxergariam a mesma
+    contagem antes de qualquer um confirmar.
+    """
+    agora = timezone.now()
+    reservados = []
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    # Sem SKIP LOCKED (SQLite) não abrimos transação: um SELECT seguido de
+    # UPDATE na mesma transação falha com "database is locked" quando outro
+    # worker está gravando, e o UPDATE condicional já é atômico sozinho.
+    with transaction.atomic() if skip_locked else nullcontext():
+        candidatos = Job.objects.filter(status=Job.PENDENTE, executar_em__lte=agora).order_by('executar_em', 'id')
+        if skip_locked:
+            candidatos = candidatos.select_for_update(skip_locked=True)
+        candidatos = list(candidatos[:quantidade * 5])
+        if not candidatos:
+            return []
+
+        salon_ids = {j.salon_id for j in candidatos if j.salon_id}
+        if skip_locked and salon_ids:
+            # Ordenado para dois workers nunca travarem em ordens opostas;
+            # NO KEY não bloqueia inserts que referenciam o salão.
+            list(Salon.objects.select_for_update(no_key=True).filter(id__in=salon_ids).order_by('id').values_list('id'))
+        em_execucao = Counter(dict(
+            Job.objects.filter(status=Job.EXECUTANDO, salon_id__in=salon_ids)
+            .values_list('salon_id').annotate(n=Count('id')).values_list('salon_id', 'n')
+        ))
+
+        for job in candidatos:
+            reserva = Job.objects.filter(pk=job.pk, status=Job.PENDENTE)
+            if job.salon_id:
+                limite = _limite_salao(job)
+                if em_execucao[job.salon_id] >= limite:
+                    continue
+                reserva = reserva.filter(LessThan(_executando_no_salao(), limite))
+            atualizados = reserva.update(
+                status=Job.EXECUTANDO, iniciado_em=agora, worker=worker_id, tentativas=job.tentativas + 1,
+            )
+            if not atualizados:
+                continue
+            job.status, job.iniciado_em, job.worker = Job.EXECUTANDO, agora, worker_id
+            job.tentativas += 1
+            em_execucao[job.salon_id] += 1
+            reservados.append(job)
+            if len(reservados) >= quantidade:
+                break
+    return reservados
+
+
+def recuperar_travados():
+    """Devolve para a fila jobs EXECUTANDO há mais que JOBS_TIMEOUT_SEGUNDOS (worker morreu)."""
+    limite = timezone.now() - timedelta(seconds=getattr(settings, 'JOBS_TIMEOUT_SEGUNDOS', 600))
+    travados = Job.objects.filter(status=Job.EXECUTANDO, iniciado_em__lt=limite)
+    n = 0
+    for job in travados:
+        job.status = Job.PENDENTE if job.tentativas < job.max_tentativas else Job.FALHOU
+        job.ultimo_erro = f"Tempo esgotado no worker {job.worker}"
+        try:
+            job.save(update_fields=['status', 'ultimo_erro'])
+        except IntegrityError:
+            # Há outro pendente com a mesma chave: este pode ser encerrado
+            Job.objects.filter(pk=job.pk).update(status=Job.CONCLUIDO, concluido_em=timezone.now())
+        n += 1
+    if n:
+        logger.warning("%s jobs travados devolvidos para a fila", n)
+    return n
+
+
+def processar_lote(worker_id, quantidade=10):
+    """Reserva e executa um lote. Retorna quantos jobs foram executados."""
+    jobs = reservar_jobs(worker_id, quantidade)
+    for job in jobs:
+        executar_job(job)
+    return len(jobs)
@@ -0,0 +1,113 @@
+"""Despacho em lote dos lembretes vencidos.
+
+Cada rodada reserva um lote de lembretes PENDENTES com lembrar_em <= agora,
+marcando-os com um UUID de lote (no Postgres os ids são lidos com
+FOR UPDATE SKIP LOCKED, então vários dispatchers não disputam as mesmas
+linhas). Depois envia pelo sender configurado, respeitando um limite de
+mensagens por minuto por salão, e grava o resultado de cada envio.
+"""
+import logging
+import uuid
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from notifications.senders import FalhaEnvio, get_sender
+from .lembretes import mensagem_lembrete
+from .models import Reminder
+
+logger = logging.getLogger(__name__)
+
+
+def reservar_lote(tamanho):
+    agora = timezone.now()
+    lote = uuid.uuid4()
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    with transaction.atomic() if skip_locked else nullcontext():
+        vencidos = Reminder.objects.filter(status=Reminder.PENDENTE, lembrar_em__lte=agora).order_by('lembrar_em')
+        if skip_locked:
+            vencidos = vencidos.select_for_update(skip_locked=True)
+        ids = list(vencidos.values_list('id', flat=True)[:tamanho])
+        if not ids:
+            return []
+        # O filtro por status garante que só ficamos com o que ninguém reservou antes
+        Reminder.objects.filter(id__in=ids, status=Reminder.PENDENTE).update(status=Reminder.ENVIANDO, lote=lote, reservado_em=agora)
+    return list(
+        Reminder.objects.filter(lote=lote, status=Reminder.ENVIANDO)
+        .select_related('appointment__salon', 'appointment__service', 'appointment__professional')  # tudo que mensagem_lembrete lê
+        .order_by('lembrar_em')
+    )
+
+
+def _dentro_do_limite(salon_id):
+    """Contador por salão na janela do minuto atual (cache.incr é atômico)."""
+    limite = getattr(settings, 'LEMBRETES_LIMITE_POR_MINUTO', 30)
+    if not limite:
+        return True
+    chave = f"lembretes:taxa:{salon_id}:{int(timezone.now().timestamp() // 60)}"
+    cache.add(chave, 0, 120)
+    try:
+        return cache.incr(chave) <= limite
+    except ValueError:  # expirou entre o add e o incr
+        cache.set(chave, 1, 120)
+        return True
+
+
+def _devolver(reminder, quando, erro=''):
+    reminder.status = Reminder.PENDENTE
+    reminder.lembrar_em = quando
+    reminder.lote = None
+    reminder.erro = erro
+    reminder.save(update_fields=['status', 'lembrar_em', 'lote', 'erro', 'tentativas'])
+
+
+def despachar(tamanho_lote=100, sender=None):
+    """Uma rodada do dispatcher. Retorna {'enviados', 'falhas', 'adiados', 'cancelados'}."""
+    sender = sender or get_sender()
+    max_tentativas = getattr(settings, 'LEMBRETES_MAX_TENTATIVAS', 3)
+    totais = {'enviados': 0, 'falhas': 0, 'adiados': 0, 'cancelados': 0}
+    agora = timezone.now()
+
+    for r in reservar_lote(tamanho_lote):
+        if not r.appointment.ativo:
+            # Cancelado (ou finalizado) depois que o lembrete foi criado
+            r.status = Reminder.CANCELADO
+            r.save(update_fields=['status'])
+            totais['cancelados'] += 1
+            continue
+        if not _dentro_do_limite(r.salon_id):
+            _devolver(r, agora + timedelta(seconds=60 - agora.second))
+            totais['adiados'] += 1
+            continue
+
+        r.tentativas += 1
+        try:
+            r.id_externo = sender.enviar(r.appointment.cliente_whatsapp, mensagem_lembrete(r.appointment), salon_id=r.salon_id, appointment_id=r.appointment_id, reminder_id=r.id) or ''
+        except Exception as exc:
+            definitiva = isinstance(exc, FalhaEnvio) and exc.definitiva
+            if definitiva or r.tentativas >= max_tentativas:
+                r.status = Reminder.FALHOU
+                r.erro = str(exc)[:1000]
+                r.save(update_fields=['status', 'tentativas', 'erro'])
+                totais['falhas'] += 1
+            else:
+                _devolver(r, timezone.now() + timedelta(minutes=2 ** r.tentativas), erro=str(exc)[:1000])
+                totais['adiados'] += 1
+            logger.warning("Lembrete %s não enviado: %s", r.id, exc)
+        else:
+            r.status = Reminder.ENVIADO
+            r.enviado_em = timezone.now()
+            r.erro = ''
+            r.save(update_fields=['status', 'tentativas', 'enviado_em', 'id_externo', 'erro'])
+            totais['enviados'] += 1
+    return totais
+
+
+def recuperar_travados(minutos=10):
+    """Lembretes que ficaram ENVIANDO (dispatcher morreu no meio) voltam para a fila."""
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return Reminder.objects.filter(status=Reminder.ENVIANDO, reservado_em__lt=limite).update(status=Reminder.PENDENTE, lote=None)
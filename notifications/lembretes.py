@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Reminder
+
+
+def horas_lembrete():
+    return getattr(settings, 'LEMBRETES_HORAS_ANTES', (24,))
+
+
+def inicio_agendamento(appt):
+    """Data/hora do agendamento como datetime aware (fuso do projeto)."""
+    # to_python: o instance pode ter sido criado com strings ('2026-01-15', '10:00')
+    data = type(appt)._meta.get_field('data').to_python(appt.data)
+    hora = type(appt)._meta.get_field('hora_inicio').to_python(appt.hora_inicio)
+    return timezone.make_aware(datetime.combine(data, hora))
+
+
+def agendar_lembretes(appt):
+    """Cria (ou reprograma) os lembretes pendentes do agendamento.
+
+    Chamado ao gravar o Appointment: o dispatcher nunca precisa varrer a tabela
+    de agendamentos, só o índice de lembretes pendentes.
+    """
+    if appt.grupo and type(appt).objects.filter(grupo=appt.grupo, hora_inicio__lt=appt.hora_inicio).exists():
+        return  # combo: só a primeira etapa gera lembrete
+    inicio = inicio_agendamento(appt)
+    agora = timezone.now()
+    existentes = {(r.horas_antes, r.canal): r for r in Reminder.objects.filter(appointment=appt)}
+
+    novos = []
+    for horas in horas_lembrete():
+        lembrar_em = inicio - timedelta(hours=horas)
+        r = existentes.get((horas, 'whatsapp'))
+        if r is None:
+            if lembrar_em > agora:
+                novos.append(Reminder(salon_id=appt.salon_id, appointment=appt, horas_antes=horas, lembrar_em=lembrar_em))
+        elif r.status == Reminder.PENDENTE and r.lembrar_em != lembrar_em:
+            # Agendamento remarcado
+            r.lembrar_em = lembrar_em
+            r.status = Reminder.PENDENTE if lembrar_em > agora else Reminder.CANCELADO
+            r.save(update_fields=['lembrar_em', 'status'])
+    if novos:
+        Reminder.objects.bulk_create(novos, ignore_conflicts=True)
+
+
+def cancelar_lembretes(appt):
+    Reminder.objects.filter(appointment=appt, status=Reminder.PENDENTE).update(status=Reminder.CANCELADO)
+
+
+def mensagem_lembrete(appt):
+    servico = appt.service.nome if appt.service else 'atendimento'
+    return (
+        f"Olá, {appt.cliente_nome}! Lembrete do seu horário de {servico} no {appt.salon.nome} "
+        f"com {appt.professional.nome} em {appt.data.strftime('%d/%m/%Y')} às {appt.hora_inicio.strftime('%H:%M')}. "
+        f"Código: {appt.codigo_validacao or '-'}"
+    )
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.dispatcher import despachar, recuperar_travados
+
+
+class Command(BaseCommand):
+    help = "Envia os lembretes de agendamento vencidos (em lotes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=100, help="Lembretes reservados por rodada")
+        parser.add_argument("--continuo", action="store_true", help="Fica rodando em loop")
+        parser.add_argument("--intervalo", type=float, default=30.0, help="Segundos entre rodadas sem trabalho (--continuo)")
+
+    def handle(self, *args, **options):
+        recuperar_travados()
+        while True:
+            totais = despachar(tamanho_lote=options["lote"])
+            if any(totais.values()):
+                self.stdout.write(f"enviados={totais['enviados']} falhas={totais['falhas']} adiados={totais['adiados']} cancelados={totais['cancelados']}")
+            if not options["continuo"]:
+                break
+            # Lote cheio: provavelmente há mais vencidos, segue sem esperar
+            if totais['enviados'] + totais['falhas'] + totais['cancelados'] < options["lote"]:
+                time.sleep(options["intervalo"])
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from notifications.webhooks import limpar_antigos, reenfileirar_pendentes
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga eventos entregues e o log de entregas de webhook mais antigos que WEBHOOKS_RETENCAO_DIAS e "
+        "reagenda a entrega dos endpoints ativos com eventos pendentes. Pensado para rodar no cron de madrugada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, help="Retenção em dias (padrão: WEBHOOKS_RETENCAO_DIAS)")
+
+    def handle(self, *args, **options):
+        eventos, entregas = limpar_antigos(options["dias"])
+        self.stdout.write(f"{eventos} evento(s) e {entregas} entrega(s) apagados.")
+        self.stdout.write(f"{reenfileirar_pendentes()} endpoint(s) com entrega reagendada.")
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0002_salon_horarios_customizados'),
+        ('scheduling', '0007_professional_miniaturas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horas_antes', models.IntegerField()),
+                ('canal', models.CharField(default='whatsapp', max_length=20)),
+                ('lembrar_em', models.DateTimeField()),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviando', 'Enviando'), ('enviado', 'Enviado'), ('falhou', 'Falhou'), ('cancelado', 'Cancelado')], default='pendente', max_length=20)),
+                ('lote', models.UUIDField(blank=True, null=True)),
+                ('reservado_em', models.DateTimeField(blank=True, null=True)),
+                ('tentativas', models.IntegerField(default=0)),
+                ('enviado_em', models.DateTimeField(blank=True, null=True)),
+                ('id_externo', models.CharField(blank=True, max_length=100)),
+                ('erro', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='scheduling.appointment')),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='core.salon')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'pendente')), fields=['lembrar_em'], name='reminder_pendente_idx'), models.Index(fields=['lote'], name='reminder_lote_idx')],
+                'constraints': [models.UniqueConstraint(fields=('appointment', 'horas_antes', 'canal'), name='reminder_unico_por_agendamento')],
+            },
+        ),
+    ]
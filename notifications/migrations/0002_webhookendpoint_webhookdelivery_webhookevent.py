@@ -0,0 +1,68 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:41
+
+import django.db.models.deletion
+import notifications.models
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_remove_salon_dias_fechados_and_more'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500)),
+                ('segredo', models.CharField(default=notifications.models.gerar_segredo_webhook, max_length=64)),
+                ('eventos', models.JSONField(blank=True, default=list)),
+                ('ativo', models.BooleanField(default=True)),
+                ('falhas_seguidas', models.IntegerField(default=0)),
+                ('proxima_tentativa_em', models.DateTimeField(blank=True, null=True)),
+                ('ultimo_erro', models.TextField(blank=True)),
+                ('entregando_desde', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='webhooks', to='core.salon')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('eventos', models.IntegerField()),
+                ('primeiro_evento', models.BigIntegerField()),
+                ('ultimo_evento', models.BigIntegerField()),
+                ('sucesso', models.BooleanField()),
+                ('status_http', models.IntegerField(blank=True, null=True)),
+                ('erro', models.TextField(blank=True)),
+                ('duracao_ms', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entregas', to='notifications.webhookendpoint')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['endpoint', '-created_at'], name='webhook_entrega_endpoint_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('evento_id', models.UUIDField(default=uuid.uuid4)),
+                ('tipo', models.CharField(choices=[('agendamento.criado', 'Agendamento criado'), ('agendamento.atualizado', 'Agendamento alterado'), ('agendamento.cancelado', 'Agendamento cancelado')], max_length=50)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('entregue', 'Entregue')], default='pendente', max_length=20)),
+                ('tentativas', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('entregue_em', models.DateTimeField(blank=True, null=True)),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox', to='notifications.webhookendpoint')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'pendente')), fields=['endpoint', 'id'], name='webhook_evento_pendente_idx'), models.Index(fields=['created_at'], name='webhook_evento_criado_idx')],
+            },
+        ),
+    ]
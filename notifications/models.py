@@ -0,0 +1,147 @@
+import secrets
+import uuid
+
+from django.db import models
+from django.db.models import Q
+from core.models import Salon
+from scheduling.models import Appointment
+
+
+class Reminder(models.Model):
+    PENDENTE = 'pendente'
+    ENVIANDO = 'enviando'
+    ENVIADO = 'enviado'
+    FALHOU = 'falhou'
+    CANCELADO = 'cancelado'
+    STATUS_CHOICES = [
+        (PENDENTE, 'Pendente'),
+        (ENVIANDO, 'Enviando'),
+        (ENVIADO, 'Enviado'),
+        (FALHOU, 'Falhou'),
+        (CANCELADO, 'Cancelado'),
+    ]
+
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='reminders')
+    appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name='reminders')
+    horas_antes = models.IntegerField()
+    canal = models.CharField(max_length=20, default='whatsapp')
+
+    lembrar_em = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDENTE)
+
+    # Preenchido quando um dispatcher reserva o lembrete (ver dispatcher.py)
+    lote = models.UUIDField(null=True, blank=True)
+    reservado_em = models.DateTimeField(null=True, blank=True)
+
+    tentativas = models.IntegerField(default=0)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+    id_externo = models.CharField(max_length=100, blank=True)
+    erro = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # O dispatcher só lê lembretes pendentes vencidos
+            models.Index(fields=['lembrar_em'], condition=Q(status='pendente'), name='reminder_pendente_idx'),
+            models.Index(fields=['lote'], name='reminder_lote_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['appointment', 'horas_antes', 'canal'], name='reminder_unico_por_agendamento'),
+        ]
+
+    def __str__(self):
+        return f"Lembrete {self.appointment_id} -{self.horas_antes}h ({self.status})"
+
+
+# --- WEBHOOKS (ver notifications/webhooks.py) ---
+
+def gerar_segredo_webhook():
+    return secrets.token_hex(32)
+
+
+class WebhookEndpoint(models.Model):
+    CRIADO = 'agendamento.criado'
+    ATUALIZADO = 'agendamento.atualizado'
+    CANCELADO = 'agendamento.cancelado'
+    EVENTOS_CHOICES = [
+        (CRIADO, 'Agendamento criado'),
+        (ATUALIZADO, 'Agendamento alterado'),
+        (CANCELADO, 'Agendamento cancelado'),
+    ]
+
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='webhooks')
+    url = models.URLField(max_length=500)
+    # Chave do HMAC das entregas (cabeçalho X-Softskin-Assinatura)
+    segredo = models.CharField(max_length=64, default=gerar_segredo_webhook)
+    # Tipos assinados; vazio = todos
+    eventos = models.JSONField(default=list, blank=True)
+    ativo = models.BooleanField(default=True)
+
+    # Backoff: falhas consecutivas e quando tentar de novo
+    falhas_seguidas = models.IntegerField(default=0)
+    proxima_tentativa_em = models.DateTimeField(null=True, blank=True)
+    ultimo_erro = models.TextField(blank=True)
+    # Preenchido enquanto um worker entrega para o endpoint (um por vez, para manter a ordem)
+    entregando_desde = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.url} ({'ativo' if self.ativo else 'inativo'})"
+
+    def assina(self, tipo):
+        return not self.eventos or tipo in self.eventos
+
+
+class WebhookEvent(models.Model):
+    """Outbox: gravado na mesma transação que a mudança no agendamento, uma linha por endpoint."""
+    PENDENTE = 'pendente'
+    ENTREGUE = 'entregue'
+    STATUS_CHOICES = [
+        (PENDENTE, 'Pendente'),
+        (ENTREGUE, 'Entregue'),
+    ]
+
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='outbox')
+    # Igual em todos os endpoints que receberam o mesmo evento; o destino usa para deduplicar
+    evento_id = models.UUIDField(default=uuid.uuid4)
+    tipo = models.CharField(max_length=50, choices=WebhookEndpoint.EVENTOS_CHOICES)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDENTE)
+    tentativas = models.IntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    entregue_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # O worker lê os pendentes de um endpoint em ordem de criação
+            models.Index(fields=['endpoint', 'id'], condition=Q(status='pendente'), name='webhook_evento_pendente_idx'),
+            models.Index(fields=['created_at'], name='webhook_evento_criado_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.evento_id} ({self.status})"
+
+
+class WebhookDelivery(models.Model):
+    """Log das entregas: uma linha por POST (um lote de eventos)."""
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='entregas')
+    eventos = models.IntegerField()
+    primeiro_evento = models.BigIntegerField()
+    ultimo_evento = models.BigIntegerField()
+    sucesso = models.BooleanField()
+    status_http = models.IntegerField(null=True, blank=True)
+    erro = models.TextField(blank=True)
+    duracao_ms = models.IntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['endpoint', '-created_at'], name='webhook_entrega_endpoint_idx'),
+        ]
+
+    def __str__(self):
+        return f"Entrega {self.endpoint_id} ({self.eventos} eventos, {'ok' if self.sucesso else 'falhou'})"
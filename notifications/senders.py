@@ -0,0 +1,54 @@
+"""Envio de mensagens (WhatsApp/SMS) para os clientes.
+
+O backend é escolhido em settings.MENSAGENS_SENDER (caminho da classe).
+Para um gateway real, crie uma subclasse de BaseSender e aponte o setting
+para ela.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class FalhaEnvio(Exception):
+    """Erro ao entregar a mensagem. `definitiva=True` indica que repetir não adianta."""
+
+    def __init__(self, mensagem, definitiva=False):
+        super().__init__(mensagem)
+        self.definitiva = definitiva
+
+
+class BaseSender:
+    canal = 'whatsapp'
+
+    def enviar(self, telefone, mensagem, **meta):
+        """Envia e retorna o id da mensagem no provedor (ou '')."""
+        raise NotImplementedError
+
+
+class ConsoleSender(BaseSender):
+    """Padrão em desenvolvimento: só registra no log."""
+
+    def enviar(self, telefone, mensagem, **meta):
+        logger.info("[%s] para %s: %s", self.canal, telefone, mensagem)
+        return ''
+
+
+class LocMemSender(BaseSender):
+    """Guarda as mensagens em memória (`LocMemSender.caixa`), para testes."""
+
+    caixa = []
+    _lock = threading.Lock()
+
+    def enviar(self, telefone, mensagem, **meta):
+        with self._lock:
+            self.caixa.append({'telefone': telefone, 'mensagem': mensagem, **meta})
+            return f"locmem-{len(self.caixa)}"
+
+
+def get_sender():
+    caminho = getattr(settings, 'MENSAGENS_SENDER', 'notifications.senders.ConsoleSender')
+    return import_string(caminho)()
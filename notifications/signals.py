@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from scheduling.models import Appointment
+from .lembretes import agendar_lembretes, cancelar_lembretes
+from .webhooks import registrar_evento
+
+
+@receiver(post_save, sender=Appointment)
+def _agendamento_gravado(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.ativo:
+        agendar_lembretes(instance)
+    else:
+        cancelar_lembretes(instance)
+
+
+@receiver(post_save, sender=Appointment)
+def _webhook_agendamento(sender, instance, created, raw=False, **kwargs):
+    # Dentro da transação do Appointment.save(): o evento só existe se a mudança existir
+    if not raw:
+        registrar_evento(instance, created)
@@ -0,0 +1,8 @@
+from jobs.fila import tarefa
+
+
+@tarefa('notifications.entregar_webhooks', max_tentativas=3)
+def entregar_webhooks(endpoint_id):
+    """Entrega o outbox de um endpoint. Falhas HTTP têm backoff próprio (ver webhooks.py), não contam aqui."""
+    from .webhooks import entregar
+    return entregar(endpoint_id)
@@ -0,0 +1,397 @@
+"""Webhooks de agendamento para os sistemas dos salões (CRM, planilhas, ERPs).
+
+1. Cada gravação de Appointment escreve o evento no outbox (WebhookEvent), na
+   mesma transação da mudança — uma linha por endpoint ativo do salão que
+   assina o tipo — e enfileira `notifications.entregar_webhooks` para o
+   endpoint depois do commit (a chave do job deduplica: um pendente por
+   endpoint, não um por evento).
+2. O job entrega os pendentes do endpoint em ordem, em lotes de WEBHOOKS_LOTE
+   por POST, numa conexão reaproveitada. Um worker por endpoint de cada vez
+   (`entregando_desde`, reservado com UPDATE condicional). O host é resolvido
+   na entrega e só endereços públicos são aceitos; a conexão vai para o IP
+   conferido (resolver_destino / cliente_http).
+3. Resposta 2xx marca o lote como entregue. Qualquer outra coisa registra a
+   falha e agenda nova tentativa com backoff exponencial; depois de
+   WEBHOOKS_MAX_FALHAS falhas seguidas o endpoint é desativado (os eventos
+   ficam pendentes até ele ser reativado no painel).
+4. Cada POST fica no log (WebhookDelivery).
+
+Corpo do POST:
+
+    {"eventos": [{"id": "<uuid>", "tipo": "agendamento.criado", "criado_em": "...", "agendamento": {...}}]}
+
+Cabeçalhos: X-Softskin-Timestamp (unix) e X-Softskin-Assinatura
+("sha256=" + HMAC-SHA256 hex de "<timestamp>.<corpo>" com o segredo do
+endpoint). O destino deve conferir a assinatura e deduplicar pelo id do
+evento: um lote que falhou no meio é reenviado inteiro.
+"""
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core import metricas
+from jobs.fila import calcular_backoff, enfileirar
+from scheduling.models import Appointment
+from .models import WebhookDelivery, WebhookEndpoint, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+# Lotes por execução do job; se sobrar, ele se reenfileira
+LOTES_POR_EXECUCAO = 20
+# Um worker que morreu no meio da entrega libera o endpoint depois disso
+PRAZO_ENTREGA = timedelta(minutes=5)
+# Endpoint ocupado com outro worker: tenta de novo daqui a pouco
+ESPERA_OCUPADO = timedelta(seconds=5)
+
+
+def validar_url(url):
+    """Checagem do cadastro: https (http só com WEBHOOKS_PERMITIR_HTTP), sem localhost nem IP interno literal.
+
+    Nomes só são resolvidos na entrega (resolver_destino), que é o que vale.
+    """
+    partes = urlsplit(url)
+    esquemas = ('https', 'http') if getattr(settings, 'WEBHOOKS_PERMITIR_HTTP', False) else ('https',)
+    if partes.scheme not in esquemas:
+        raise ValidationError("A URL do webhook precisa ser https.")
+    host = (partes.hostname or '').lower()
+    if not host or host == 'localhost' or host.endswith('.localhost') or host.endswith('.local'):
+        raise ValidationError("Host inválido para webhook.")
+    try:
+        ip = ipaddress.ip_address(host)
+    except ValueError:
+        return url
+    if not ip.is_global:
+        raise ValidationError("O webhook não pode apontar para um IP interno.")
+    return url
+
+
+# --- EVENTOS (outbox) ---
+
+def tipo_do_evento(appt, criado):
+    if criado:
+        return WebhookEndpoint.CRIADO
+    if appt.status == Appointment.CANCELADO and appt._status_original != Appointment.CANCELADO:
+        return WebhookEndpoint.CANCELADO
+    return WebhookEndpoint.ATUALIZADO
+
+
+def dados_agendamento(appt):
+    return {
+        'id': appt.id,
+        'status': appt.status,
+        # str(): data/hora podem ter vindo como objetos ou como texto ('2026-01-15', '10:00')
+        'data': str(appt.data),
+        'hora_inicio': str(appt.hora_inicio)[:5],
+        'servico': {'id': appt.service_id, 'nome': appt.service.nome} if appt.service_id else None,
+        'profissional': {'id': appt.professional_id, 'nome': appt.professional.nome},
+        'cliente': {'nome': appt.cliente_nome, 'whatsapp': appt.cliente_whatsapp, 'id': appt.customer_id},
+        'codigo': appt.codigo_validacao,
+        'grupo': str(appt.grupo) if appt.grupo else None,
+        'criado_em': appt.created_at.isoformat() if appt.created_at else None,
+        'atualizado_em': appt.atualizado_em.isoformat() if appt.atualizado_em else None,
+    }
+
+
+def registrar_evento(appt, criado):
+    """Grava o evento no outbox de cada endpoint que o assina. Chamado no post_save do Appointment."""
+    tipo = tipo_do_evento(appt, criado)
+    endpoints = [e for e in WebhookEndpoint.objects.filter(salon_id=appt.salon_id, ativo=True) if e.assina(tipo)]
+    if not endpoints:
+        return
+    evento_id = uuid.uuid4()
+    payload = dados_agendamento(appt)
+    WebhookEvent.objects.bulk_create([
+        WebhookEvent(endpoint=e, evento_id=evento_id, tipo=tipo, payload=payload) for e in endpoints
+    ])
+    for e in endpoints:
+        agendar_entrega(e)
+
+
+def agendar_entrega(endpoint, quando=None):
+    enfileirar(
+        'notifications.entregar_webhooks', {'endpoint_id': endpoint.pk},
+        salon=endpoint.salon_id, chave=f"webhook:{endpoint.pk}", executar_em=quando,
+    )
+
+
+# --- ENTREGA ---
+
+def assinar(segredo, timestamp, corpo):
+    mensagem = f"{timestamp}.".encode() + corpo
+    return "sha256=" + hmac.new(segredo.encode(), mensagem, hashlib.sha256).hexdigest()
+
+
+class EnderecoRecusado(Exception):
+    """O host do webhook não resolve ou resolve para um endereço que não é público."""
+
+
+def resolver_destino(url):
+    """IP público do host da URL, conferido na hora da entrega (o cadastro só barra IPs literais).
+
+    Todos os endereços do nome precisam ser públicos: um registro interno no
+    meio dos externos (ou um nome tipo 10.0.0.1.nip.io) é recusado.
+    """
+    partes = urlsplit(url)
+    try:
+        enderecos = socket.getaddrinfo(partes.hostname, partes.port or 443, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        raise EnderecoRecusado("Não foi possível resolver o host do webhook.")
+    ips = [ipaddress.ip_address(endereco[4][0].split('%')[0]) for endereco in enderecos]
+    if not ips or not all(ip.is_global for ip in ips):
+        raise EnderecoRecusado("O host do webhook aponta para um endereço não permitido.")
+    return str(ips[0])
+
+
+class _ConexaoFixa(httpcore.SyncBackend):
+    """Conecta sempre no IP já conferido; SNI e certificado continuam pelo nome da URL."""
+
+    def __init__(self, ip):
+        self.ip = ip
+
+    def connect_tcp(self, host, port, *args, **kwargs):
+        return super().connect_tcp(self.ip, port, *args, **kwargs)
+
+
+# httpcore -> httpx, na ordem: o primeiro que casar vence (ConnectError é um NetworkError)
+_ERROS_HTTPCORE = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+    (httpcore.ConnectionNotAvailable, httpx.TransportError),
+)
+
+
+@contextmanager
+def _erros_como_httpx(request):
+    try:
+        yield
+    except tuple(origem for origem, _ in _ERROS_HTTPCORE) as exc:
+        destino = next(d for origem, d in _ERROS_HTTPCORE if isinstance(exc, origem))
+        raise destino(str(exc), request=request) from exc
+
+
+class _CorpoResposta(httpx.SyncByteStream):
+    def __init__(self, resposta, request):
+        self.resposta = resposta
+        self.request = request
+
+    def __iter__(self):
+        with _erros_como_httpx(self.request):
+            yield from self.resposta.iter_stream()
+
+    def close(self):
+        self.resposta.close()
+
+
+class _TransporteFixo(httpx.BaseTransport):
+    """Transporte httpx sobre um ConnectionPool do httpcore que só conecta em `ip`."""
+
+    def __init__(self, ip):
+        self.pool = httpcore.ConnectionPool(ssl_context=httpx.create_ssl_context(), network_backend=_ConexaoFixa(ip))
+
+    def handle_request(self, request):
+        url = httpcore.URL(
+            scheme=request.url.raw_scheme, host=request.url.raw_host,
+            port=request.url.port, target=request.url.raw_path,
+        )
+        with _erros_como_httpx(request):
+            resposta = self.pool.handle_request(httpcore.Request(
+                method=request.method, url=url, headers=request.headers.raw,
+                content=request.stream, extensions=request.extensions,
+            ))
+        return httpx.Response(
+            status_code=resposta.status, headers=resposta.headers,
+            stream=_CorpoResposta(resposta, request), extensions=resposta.extensions,
+        )
+
+    def close(self):
+        self.pool.close()
+
+
+def cliente_http(ip):
+    """Cliente que só fala com `ip` (um DNS rebind entre a checagem e a conexão não muda o destino)."""
+    # trust_env=False: proxy do ambiente trocaria o transporte e o destino conferido
+    return httpx.Client(
+        transport=_TransporteFixo(ip), trust_env=False, follow_redirects=False,
+        timeout=getattr(settings, 'WEBHOOKS_TIMEOUT_SEGUNDOS', 10),
+    )
+
+
+def corpo_do_lote(lote):
+    eventos = [
+        {'id': str(e.evento_id), 'tipo': e.tipo, 'criado_em': e.created_at.isoformat(), 'agendamento': e.payload}
+        for e in lote
+    ]
+    return json.dumps({'eventos': eventos}, separators=(',', ':')).encode()
+
+
+def _registrar_entrega(endpoint, lote, status_http, erro, inicio):
+    sucesso = not erro
+    WebhookDelivery.objects.create(
+        endpoint=endpoint, eventos=len(lote), primeiro_evento=lote[0].id, ultimo_evento=lote[-1].id,
+        sucesso=sucesso, status_http=status_http, erro=erro, duracao_ms=int((time.monotonic() - inicio) * 1000),
+    )
+    metricas.ENTREGAS_WEBHOOK.labels('sucesso' if sucesso else 'falha').inc()
+    return sucesso, erro
+
+
+def enviar_lote(cliente, endpoint, lote):
+    """POST de um lote. Grava o log e devolve (sucesso, erro).
+
+    O erro gravado é só o status ou o tipo da falha: o log volta para o salão
+    pelo painel e não deve repetir o que o servidor de destino respondeu.
+    """
+    corpo = corpo_do_lote(lote)
+    timestamp = str(int(time.time()))
+    cabecalhos = {
+        'Content-Type': 'application/json',
+        'User-Agent': 'Softskin-Webhooks/1',
+        'X-Softskin-Timestamp': timestamp,
+        'X-Softskin-Assinatura': assinar(endpoint.segredo, timestamp, corpo),
+    }
+    inicio = time.monotonic()
+    status_http, erro = None, ''
+    try:
+        resposta = cliente.post(endpoint.url, content=corpo, headers=cabecalhos)
+        status_http = resposta.status_code
+        if not resposta.is_success:
+            erro = f"O destino respondeu HTTP {status_http}."
+    except httpx.TimeoutException:
+        erro = "Tempo esgotado esperando o destino."
+    except httpx.HTTPError as exc:
+        erro = f"Falha de conexão com o destino ({type(exc).__name__})."
+    return _registrar_entrega(endpoint, lote, status_http, erro, inicio)
+
+
+def _reservar(endpoint_id, agora):
+    livre = Q(entregando_desde__isnull=True) | Q(entregando_desde__lt=agora - PRAZO_ENTREGA)
+    return WebhookEndpoint.objects.filter(livre, pk=endpoint_id, ativo=True).update(entregando_desde=agora)
+
+
+def entregar(endpoint_id):
+    """Entrega os eventos pendentes do endpoint. Retorna {'entregues', 'lotes', 'falhou'}."""
+    totais = {'entregues': 0, 'lotes': 0, 'falhou': False}
+    endpoint = WebhookEndpoint.objects.filter(pk=endpoint_id, ativo=True).first()
+    if endpoint is None:
+        return totais
+    agora = timezone.now()
+    if endpoint.proxima_tentativa_em and endpoint.proxima_tentativa_em > agora:
+        agendar_entrega(endpoint, endpoint.proxima_tentativa_em)  # em backoff
+        return totais
+    if not _reservar(endpoint_id, agora):
+        agendar_entrega(endpoint, agora + ESPERA_OCUPADO)
+        return totais
+
+    tamanho = getattr(settings, 'WEBHOOKS_LOTE', 50)
+    pendentes = endpoint.outbox.filter(status=WebhookEvent.PENDENTE).order_by('id')
+    try:
+        lote = list(pendentes[:tamanho])
+        if not lote:
+            return totais
+        try:
+            ip = resolver_destino(endpoint.url)
+        except EnderecoRecusado as exc:
+            _registrar_entrega(endpoint, lote, None, str(exc), time.monotonic())
+            WebhookEvent.objects.filter(id__in=[e.id for e in lote]).update(tentativas=F('tentativas') + 1)
+            _registrar_falha(endpoint, str(exc))
+            totais['falhou'] = True
+            return totais
+        with cliente_http(ip) as cliente:
+            for _ in range(LOTES_POR_EXECUCAO):
+                if not lote:
+                    break
+                ids = [e.id for e in lote]
+                sucesso, erro = enviar_lote(cliente, endpoint, lote)
+                totais['lotes'] += 1
+                if not sucesso:
+                    WebhookEvent.objects.filter(id__in=ids).update(tentativas=F('tentativas') + 1)
+                    _registrar_falha(endpoint, erro)
+                    totais['falhou'] = True
+                    return totais
+                WebhookEvent.objects.filter(id__in=ids).update(
+                    status=WebhookEvent.ENTREGUE, entregue_em=timezone.now(), tentativas=F('tentativas') + 1,
+                )
+                totais['entregues'] += len(lote)
+                lote = list(pendentes[:tamanho])
+            else:
+                if lote:
+                    agendar_entrega(endpoint)  # sobrou: continua em outra execução
+        if endpoint.falhas_seguidas:
+            endpoint.falhas_seguidas, endpoint.proxima_tentativa_em, endpoint.ultimo_erro = 0, None, ''
+            endpoint.save(update_fields=['falhas_seguidas', 'proxima_tentativa_em', 'ultimo_erro'])
+    finally:
+        WebhookEndpoint.objects.filter(pk=endpoint_id).update(entregando_desde=None)
+    return totais
+
+
+def _registrar_falha(endpoint, erro):
+    endpoint.falhas_seguidas += 1
+    endpoint.ultimo_erro = erro
+    campos = ['falhas_seguidas', 'ultimo_erro', 'proxima_tentativa_em']
+    if endpoint.falhas_seguidas >= getattr(settings, 'WEBHOOKS_MAX_FALHAS', 12):
+        endpoint.ativo, endpoint.proxima_tentativa_em = False, None
+        campos.append('ativo')
+        logger.error("Webhook %s desativado depois de %s falhas seguidas: %s", endpoint.pk, endpoint.falhas_seguidas, erro)
+    else:
+        atraso = calcular_backoff(
+            endpoint.falhas_seguidas,
+            base=getattr(settings, 'WEBHOOKS_BACKOFF_BASE_SEGUNDOS', 30),
+            maximo=getattr(settings, 'WEBHOOKS_BACKOFF_MAXIMO_SEGUNDOS', 6 * 3600),
+        )
+        endpoint.proxima_tentativa_em = timezone.now() + atraso
+        agendar_entrega(endpoint, endpoint.proxima_tentativa_em)
+        logger.warning("Webhook %s falhou (%s seguidas), nova tentativa às %s: %s", endpoint.pk, endpoint.falhas_seguidas, endpoint.proxima_tentativa_em, erro)
+    endpoint.save(update_fields=campos)
+
+
+def reativar(endpoint):
+    """Liga o endpoint de novo, zera o backoff e entrega o que ficou pendente."""
+    endpoint.ativo, endpoint.falhas_seguidas, endpoint.proxima_tentativa_em = True, 0, None
+    endpoint.save(update_fields=['ativo', 'falhas_seguidas', 'proxima_tentativa_em'])
+    if endpoint.outbox.filter(status=WebhookEvent.PENDENTE).exists():
+        agendar_entrega(endpoint)
+
+
+# --- MANUTENÇÃO ---
+
+def reenfileirar_pendentes():
+    """Rede de segurança: agenda a entrega de todo endpoint ativo com eventos pendentes. Retorna quantos."""
+    endpoints = WebhookEndpoint.objects.filter(ativo=True, outbox__status=WebhookEvent.PENDENTE).distinct()
+    n = 0
+    for endpoint in endpoints:
+        agendar_entrega(endpoint, endpoint.proxima_tentativa_em)
+        n += 1
+    return n
+
+
+def limpar_antigos(dias=None):
+    """Apaga o log e os eventos mais antigos que WEBHOOKS_RETENCAO_DIAS (entregues ou de endpoint desativado). Retorna (eventos, entregas)."""
+    dias = getattr(settings, 'WEBHOOKS_RETENCAO_DIAS', 30) if dias is None else dias
+    limite = timezone.now() - timedelta(days=dias)
+    eventos, _ = (
+        WebhookEvent.objects.filter(created_at__lt=limite)
+        .filter(Q(status=WebhookEvent.ENTREGUE) | Q(endpoint__ativo=False))
+        .delete()
+    )
+    entregas, _ = WebhookDelivery.objects.filter(created_at__lt=limite).delete()
+    return eventos, entregas
@@ -0,0 +1,329 @@
+"""Agenda pré-carregada de um período (salão × profissionais × dias).
+
+Carrega tudo o que define a agenda — expediente (WorkingHour + horário do
+salão), intervalos, feriados, folgas, agendamentos ativos e uso dos recursos
+compartilhados — em um número fixo de queries, não importa quantos dias ou
+profissionais, e responde o resto em memória. Os horários são minutos desde a
+meia-noite.
+
+    agenda = Agenda(salao, date(2026, 1, 12), date(2026, 1, 18))
+    dia = agenda.dia(prof.id, date(2026, 1, 13))
+    dia.expediente   # (540, 1080) ou None se não trabalha
+    dia.livres()     # [(540, 600), (660, 720), ...]
+    agenda.livres_para(prof.id, date(2026, 1, 13), servico)  # descontando recursos lotados
+"""
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from .models import Appointment, Holiday, OpeningHour, Professional, Resource, Service, SlotHold, SpecialSchedule
+
+DURACAO_PADRAO = 30  # agendamento sem serviço (serviço removido)
+
+
+def minutos(t):
+    if isinstance(t, str):  # instância ainda não recarregada do banco ('09:00')
+        t = datetime.strptime(t[:5], "%H:%M").time()
+    return t.hour * 60 + t.minute
+
+
+def hhmm(m):
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+
+def unir(intervalos):
+    """Ordena e junta intervalos que se sobrepõem ou encostam."""
+    resultado = []
+    for ini, fim in sorted(intervalos):
+        if resultado and ini <= resultado[-1][1]:
+            if fim > resultado[-1][1]:
+                resultado[-1] = (resultado[-1][0], fim)
+        else:
+            resultado.append((ini, fim))
+    return resultado
+
+
+def subtrair(base, remover):
+    """base − remover, com as duas listas já unidas/ordenadas (varredura linear)."""
+    resultado = []
+    j = 0
+    for ini, fim in base:
+        atual = ini
+        while j < len(remover) and remover[j][1] <= atual:
+            j += 1
+        k = j
+        while k < len(remover) and remover[k][0] < fim:
+            r_ini, r_fim = remover[k]
+            if r_ini > atual:
+                resultado.append((atual, r_ini))
+            atual = max(atual, r_fim)
+            k += 1
+        if atual < fim:
+            resultado.append((atual, fim))
+    return resultado
+
+
+def saturados(usos, capacidade):
+    """Trechos em que o uso simultâneo atinge a capacidade (sweep-line sobre início/fim)."""
+    # Em empate, o fim (-1) vem antes do início (+1): intervalos são [ini, fim)
+    eventos = sorted([(ini, 1) for ini, _ in usos] + [(fim, -1) for _, fim in usos])
+    resultado = []
+    uso = 0
+    lotado_desde = None
+    for t, delta in eventos:
+        uso += delta
+        if uso >= capacidade and lotado_desde is None:
+            lotado_desde = t
+        elif uso < capacidade and lotado_desde is not None:
+            if t > lotado_desde:
+                resultado.append((lotado_desde, t))
+            lotado_desde = None
+    return resultado
+
+
+def horarios_semana(salao):
+    """(abertura, fechamento) em minutos por dia da semana (0=segunda), None nos dias em que o salão fecha.
+
+    Vem das linhas de OpeningHour (uma query) e fica guardado no objeto; o
+    Salon do core.tenant já chega com ele preenchido.
+    """
+    semana = getattr(salao, 'horarios_semana', None)
+    if semana is None:
+        dias = [None] * 7
+        for dia, inicio, fim in OpeningHour.objects.filter(salon=salao).values_list('day_of_week', 'start_time', 'end_time'):
+            dias[dia] = (minutos(inicio), minutos(fim))
+        semana = salao.horarios_semana = tuple(dias)
+    return semana
+
+
+def horario_do_salao(salao, weekday):
+    """(abertura, fechamento) do salão no dia da semana, ou None se fecha."""
+    return horarios_semana(salao)[weekday]
+
+
+def intervalos_fixos(prof, weekday):
+    """Pausas do profissional no dia (ProfessionalBreak; use prefetch_related('breaks'))."""
+    return unir([(minutos(b.start_time), minutos(b.end_time)) for b in prof.breaks.all() if b.day_of_week == weekday])
+
+
+class DiaProfissional:
+    """Agenda de um profissional em um dia."""
+
+    def __init__(self, data, expediente):
+        self.data = data
+        self.expediente = expediente      # (ini, fim) ou None
+        self.bloqueado = None             # descrição do feriado/folga de dia inteiro
+        self.bloqueios = []               # (ini, fim, tipo, descricao)
+        self.agendamentos = []            # (ini, fim, Appointment)
+        self.holds = []                   # (ini, fim, token)
+        self._livres = None
+
+    def ocupados(self, ignorar_hold=None):
+        ocupado = [(i, f) for i, f, *_ in self.bloqueios]
+        ocupado += [(i, f) for i, f, _ in self.agendamentos]
+        ocupado += [(i, f) for i, f, token in self.holds if token != ignorar_hold]
+        return unir(ocupado)
+
+    def livres(self, ignorar_hold=None):
+        """Intervalos livres dentro do expediente."""
+        if ignorar_hold is None and self._livres is not None:
+            return self._livres
+        if self.expediente is None or self.bloqueado:
+            livres = []
+        else:
+            livres = subtrair([self.expediente], self.ocupados(ignorar_hold))
+        if ignorar_hold is None:
+            self._livres = livres
+        return livres
+
+    def cabe(self, inicio, duracao, ignorar_hold=None):
+        fim = inicio + duracao
+        return any(i <= inicio and fim <= f for i, f in self.livres(ignorar_hold))
+
+
+class Agenda:
+    """Agenda pré-carregada de [inicio, fim] (datas inclusivas).
+
+    Queries: profissionais (+2 prefetch), horário do salão (nenhuma se o Salon
+    veio do core.tenant), feriados, folgas, agendamentos do salão, recursos
+    (+1 se houver algum) e, com `holds=True`, as pré-reservas ativas.
+    Agendamentos e holds são carregados do salão inteiro, mesmo com
+    `profissionais` filtrado, porque os recursos são compartilhados.
+    """
+
+    def __init__(self, salao, inicio, fim, profissionais=None, holds=False):
+        self.salao = salao
+        self.inicio = inicio
+        self.fim = fim
+        self.datas = [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+
+        profs = Professional.objects.filter(salon=salao).prefetch_related('working_hours', 'breaks').order_by('nome', 'id')
+        if profissionais is not None:
+            profs = profs.filter(id__in=[getattr(p, 'id', p) for p in profissionais])
+        self.profissionais = list(profs)
+        ids = [p.id for p in self.profissionais]
+
+        self._dias = {}
+        for prof in self.profissionais:
+            jornadas = {wh.day_of_week: wh for wh in prof.working_hours.all()}
+            for data in self.datas:
+                self._dias[(prof.id, data)] = self._montar_dia(prof, data, jornadas.get(data.weekday()))
+
+        self.feriados = {}
+        for f in Holiday.objects.filter(salon=salao, data__range=(inicio, fim)):
+            self.feriados.setdefault(f.data, []).append(f)
+            for prof_id in ids:
+                self._bloquear(self._dias[(prof_id, f.data)], f.hora_inicio, f.hora_fim, 'feriado', f.descricao)
+
+        for s in SpecialSchedule.objects.filter(salon=salao, professional_id__in=ids, data__range=(inicio, fim)):
+            self._bloquear(self._dias[(s.professional_id, s.data)], s.hora_inicio, s.hora_fim, 'folga', 'Folga')
+
+        # Recursos: capacidade e quais serviços usam cada um
+        self.capacidades = {r.id: r.capacidade for r in Resource.objects.filter(salon=salao)}
+        self.recursos_servico = {}
+        if self.capacidades:
+            for service_id, resource_id in Service.recursos.through.objects.filter(resource_id__in=self.capacidades).values_list('service_id', 'resource_id'):
+                self.recursos_servico.setdefault(service_id, []).append(resource_id)
+        self._usos = {}       # (resource_id, data) -> [(ini, fim, token do hold ou None)]
+        self._saturados = {}  # cache de saturados() por (resource_id, data)
+
+        agendamentos = (
+            Appointment.objects.ativos()
+            .filter(salon=salao, data__range=(inicio, fim))
+            .select_related('service')
+            .order_by('hora_inicio')
+        )
+        for a in agendamentos:
+            ini = minutos(a.hora_inicio)
+            dur = a.service.duracao_minutos if a.service else DURACAO_PADRAO
+            dia = self._dias.get((a.professional_id, a.data))
+            if dia is not None:
+                dia.agendamentos.append((ini, ini + dur, a))
+            self._usar_recursos(a.service_id, a.data, ini, ini + dur, None)
+
+        if holds:
+            ativos = SlotHold.objects.filter(salon=salao, data__range=(inicio, fim), expira_em__gt=timezone.now())
+            for h in ativos:
+                ini = minutos(h.hora_inicio)
+                dia = self._dias.get((h.professional_id, h.data))
+                if dia is not None:
+                    dia.holds.append((ini, ini + h.duracao_minutos, h.token))
+                self._usar_recursos(h.service_id, h.data, ini, ini + h.duracao_minutos, h.token)
+
+    def _usar_recursos(self, service_id, data, ini, fim, token):
+        for resource_id in self.recursos_servico.get(service_id, ()):
+            self._usos.setdefault((resource_id, data), []).append((ini, fim, token))
+
+    def _montar_dia(self, prof, data, jornada):
+        salao = horario_do_salao(self.salao, data.weekday())
+        expediente = None
+        if jornada and salao:
+            ini = max(minutos(jornada.start_time), salao[0])
+            fim = min(minutos(jornada.end_time), salao[1])
+            if ini < fim:
+                expediente = (ini, fim)
+        dia = DiaProfissional(data, expediente)
+        if expediente:
+            dia.bloqueios = [(i, f, 'intervalo', 'Intervalo') for i, f in intervalos_fixos(prof, data.weekday())]
+        return dia
+
+    @staticmethod
+    def _bloquear(dia, hora_inicio, hora_fim, tipo, descricao):
+        if not hora_inicio:
+            dia.bloqueado = descricao or tipo
+        elif hora_fim:
+            dia.bloqueios.append((minutos(hora_inicio), minutos(hora_fim), tipo, descricao))
+
+    def dia(self, prof_id, data):
+        return self._dias[(getattr(prof_id, 'id', prof_id), data)]
+
+    def recursos_lotados(self, data, service_id, ignorar_hold=None):
+        """Trechos do dia em que algum recurso exigido pelo serviço está sem unidade livre."""
+        lotados = []
+        for resource_id in self.recursos_servico.get(service_id, ()):
+            chave = (resource_id, data)
+            if ignorar_hold is None:
+                if chave not in self._saturados:
+                    self._saturados[chave] = saturados([(i, f) for i, f, _ in self._usos.get(chave, ())], self.capacidades[resource_id])
+                lotados += self._saturados[chave]
+            else:
+                usos = [(i, f) for i, f, token in self._usos.get(chave, ()) if token != ignorar_hold]
+                lotados += saturados(usos, self.capacidades[resource_id])
+        return unir(lotados)
+
+    def livres_para(self, prof_id, data, service=None, ignorar_hold=None):
+        """Livres do profissional no dia, descontando os recursos lotados que o serviço exige."""
+        livres = self.dia(prof_id, data).livres(ignorar_hold)
+        lotados = self.recursos_lotados(data, getattr(service, 'id', service), ignorar_hold) if service else []
+        return subtrair(livres, lotados) if lotados else livres
+
+    def cabe(self, prof_id, data, inicio, duracao, service=None, ignorar_hold=None):
+        fim = inicio + duracao
+        return any(i <= inicio and fim <= f for i, f in self.livres_para(prof_id, data, service, ignorar_hold))
+
+
+def intersectar(a, b):
+    """Interseção de duas listas ordenadas de intervalos [ini, fim)."""
+    resultado = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        ini = max(a[i][0], b[j][0])
+        fim = min(a[i][1], b[j][1])
+        if ini < fim:
+            resultado.append((ini, fim))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return resultado
+
+
+def horarios_em_sequencia(agenda, data, etapas, passo, depois_de=None):
+    """Inícios em que os serviços cabem um depois do outro, sem buraco.
+
+    `etapas`: lista de (Service, [ids dos profissionais aceitos, em ordem de
+    preferência]). Para cada etapa k, com deslocamento o_k (soma das durações
+    anteriores), os inícios possíveis da sequência são os livres dos
+    profissionais (já sem os recursos lotados) deslocados de -o_k e encurtados
+    de d_k; a resposta é a interseção desses conjuntos entre as etapas,
+    amostrada na grade do salão.
+
+    Retorna [(inicio, [(prof_id, ini, fim), ...]), ...].
+    """
+    possiveis = None
+    deslocamento = 0
+    for service, profs in etapas:
+        duracao = service.duracao_minutos
+        inicios = unir([
+            (ini - deslocamento, fim - deslocamento - duracao + 1)
+            for prof_id in profs
+            for ini, fim in agenda.livres_para(prof_id, data, service)
+            if fim - ini >= duracao
+        ])
+        possiveis = inicios if possiveis is None else intersectar(possiveis, inicios)
+        if not possiveis:
+            return []
+        deslocamento += duracao
+
+    horario = horario_do_salao(agenda.salao, data.weekday())
+    base = horario[0] if horario else 0
+    resultado = []
+    for ini, fim in possiveis:
+        # Primeiro ponto da grade (base + n*passo) dentro do intervalo
+        t = ini if (ini - base) % passo == 0 else ini + passo - (ini - base) % passo
+        while t < fim:
+            if depois_de is None or t > depois_de:
+                resultado.append((t, _escolher_profissionais(agenda, data, etapas, t)))
+            t += passo
+    return resultado
+
+
+def _escolher_profissionais(agenda, data, etapas, inicio):
+    escolha = []
+    cursor = inicio
+    for service, profs in etapas:
+        duracao = service.duracao_minutos
+        prof_id = next(p for p in profs if agenda.cabe(p, data, cursor, duracao, service))
+        escolha.append((prof_id, cursor, cursor + duracao))
+        cursor += duracao
+    return escolha
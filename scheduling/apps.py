@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class SchedulingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scheduling'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import signals  # noqa: F401
+        from .busca import garantir_fts
+        post_migrate.connect(garantir_fts, sender=self)
@@ -0,0 +1,92 @@
+"""Arquivamento de agendamentos antigos (divisão tabela quente / fria).
+
+Agendamentos com data anterior ao horizonte (ARQUIVO_AGENDAMENTOS_DIAS) saem
+de Appointment e vão para AppointmentArquivado, em lotes pequenos, cada um na
+própria transação. Assim as consultas do dia a dia (disponibilidade,
+validações, painel) só enxergam a parte recente da tabela.
+
+Histórico, exportações e relatórios devem ler por `historico_agendamentos()`,
+que junta as duas tabelas com UNION ALL.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, F, Value
+from django.utils import timezone
+
+from .models import Appointment, AppointmentArquivado
+
+# Colunas comuns às duas tabelas, na mesma ordem dos dois lados do UNION
+_CAMPOS = ('salon', 'professional', 'service', 'customer', 'cliente_nome', 'cliente_whatsapp', 'codigo_validacao',
+           'data', 'hora_inicio', 'status', 'created_at', 'cancelado_em')
+
+
+def data_limite_arquivo(hoje=None):
+    """Agendamentos com data anterior a esta são arquivados."""
+    dias = getattr(settings, 'ARQUIVO_AGENDAMENTOS_DIAS', 180)
+    return (hoje or timezone.localdate()) - timedelta(days=dias)
+
+
+def arquivar_lote(limite, tamanho=500, salon_id=None):
+    """Move um lote de agendamentos anteriores a `limite`. Retorna quantos foram movidos."""
+    with transaction.atomic():
+        qs = Appointment.objects.filter(data__lt=limite)
+        if salon_id:
+            qs = qs.filter(salon_id=salon_id)
+        lote = list(qs.select_related('service', 'professional').order_by('id')[:tamanho])
+        if not lote:
+            return 0
+        AppointmentArquivado.objects.bulk_create([
+            AppointmentArquivado(
+                id_original=a.id, salon_id=a.salon_id, professional_id=a.professional_id, service_id=a.service_id,
+                nome_profissional=a.professional.nome if a.professional else '',
+                nome_servico=a.service.nome if a.service else '',
+                preco_servico=a.service.preco if a.service else None,
+                customer_id=a.customer_id, cliente_nome=a.cliente_nome, cliente_whatsapp=a.cliente_whatsapp, codigo_validacao=a.codigo_validacao,
+                data=a.data, hora_inicio=a.hora_inicio, status=a.status, created_at=a.created_at,
+                confirmado_em=a.confirmado_em, cancelado_em=a.cancelado_em, finalizado_em=a.finalizado_em,
+            )
+            for a in lote
+        ], ignore_conflicts=True)  # id_original já arquivado (rodada anterior interrompida)
+        Appointment.objects.filter(id__in=[a.id for a in lote]).delete()
+    return len(lote)
+
+
+def arquivar_agendamentos(tamanho_lote=500, max_lotes=None, salon_id=None, hoje=None):
+    """Arquiva tudo que passou do horizonte, lote a lote. Retorna (movidos, terminou)."""
+    limite = data_limite_arquivo(hoje)
+    movidos = lotes = 0
+    while max_lotes is None or lotes < max_lotes:
+        n = arquivar_lote(limite, tamanho_lote, salon_id)
+        movidos += n
+        lotes += 1
+        if n < tamanho_lote:
+            return movidos, True
+    return movidos, False
+
+
+def historico_agendamentos(salon, **filtros):
+    """Agendamentos do salão, recentes e arquivados, como dicionários.
+
+    `filtros` vale para os dois lados (ex: data__gte=..., cliente_whatsapp=...).
+    O resultado é um UNION ALL: pode ser ordenado pelas colunas e fatiado, mas
+    não filtrado depois.
+    """
+    quentes = (
+        Appointment.objects.filter(salon=salon, **filtros)
+        .values(*_CAMPOS)
+        .annotate(
+            agendamento_id=F('id'), profissional_nome=F('professional__nome'), servico_nome=F('service__nome'),
+            servico_preco=F('service__preco'), arquivado=Value(False, output_field=BooleanField()),
+        )
+    )
+    frios = (
+        AppointmentArquivado.objects.filter(salon=salon, **filtros)
+        .values(*_CAMPOS)
+        .annotate(
+            agendamento_id=F('id_original'), profissional_nome=F('nome_profissional'), servico_nome=F('nome_servico'),
+            servico_preco=F('preco_servico'), arquivado=Value(True, output_field=BooleanField()),
+        )
+    )
+    return quentes.union(frios, all=True)
@@ -0,0 +1,150 @@
+"""Busca de agendamentos por cliente, WhatsApp, código, serviço e profissional.
+
+Cada Appointment guarda em `busca` um documento já normalizado (minúsculas,
+sem acentos), montado em Appointment.save(). A busca usa o índice do banco:
+
+- PostgreSQL: índice GIN trigram (pg_trgm) em `busca`, consultado com LIKE
+  '%termo%' por palavra — cobre prefixo e trecho no meio;
+- SQLite: tabela FTS5 `scheduling_appointment_fts`, mantida por triggers,
+  consultada com "termo"* (prefixo);
+- outros bancos: LIKE sem índice.
+
+O preenchimento inicial e o índice do PostgreSQL estão na migração 0014. A
+tabela FTS5 e os triggers do SQLite são (re)criados por garantir_fts() a cada
+migrate: o SQLite recria a tabela de agendamentos em qualquer AlterField, e os
+triggers somem junto com a tabela antiga.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Appointment
+
+TABELA_FTS = 'scheduling_appointment_fts'
+
+
+def normalizar_busca(texto):
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w]+', ' ', texto.lower())).strip()
+
+
+def documento_busca(appt):
+    """Texto indexado do agendamento. O WhatsApp entra também sem DDD e pelos 4 últimos dígitos."""
+    from .clientes import normalizar_telefone
+
+    numero = normalizar_telefone(appt.cliente_whatsapp)
+    partes = [
+        appt.cliente_nome,
+        numero, numero[2:], numero[-4:],
+        appt.codigo_validacao or '',
+        appt.service.nome if appt.service_id else '',
+        appt.professional.nome if appt.professional_id else '',
+    ]
+    return normalizar_busca(' '.join(partes))
+
+
+def _termos(consulta):
+    return normalizar_busca(consulta).split()[:8]
+
+
+def buscar_agendamentos(salon, consulta, queryset=None):
+    """QuerySet dos agendamentos do salão que casam com todas as palavras (por prefixo/trecho)."""
+    qs = (queryset if queryset is not None else Appointment.objects.all()).filter(salon=salon)
+    termos = _termos(consulta)
+    if not termos:
+        return qs.none()
+
+    if connection.vendor == 'sqlite' and _fts_disponivel():
+        expressao = ' AND '.join(f'"{t}"*' for t in termos)
+        return qs.filter(id__in=RawSQL(f"SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s", (expressao,)))
+
+    for t in termos:
+        qs = qs.filter(busca__contains=t)
+    return qs
+
+
+_fts = None
+
+_TRIGGERS_FTS = {
+    'scheduling_appointment_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS scheduling_appointment_fts_ai AFTER INSERT ON scheduling_appointment BEGIN
+            INSERT INTO {TABELA_FTS}(rowid, busca) VALUES (new.id, new.busca);
+        END""",
+    'scheduling_appointment_fts_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS scheduling_appointment_fts_ad AFTER DELETE ON scheduling_appointment BEGIN
+            INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, busca) VALUES ('delete', old.id, old.busca);
+        END""",
+    'scheduling_appointment_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS scheduling_appointment_fts_au AFTER UPDATE OF busca ON scheduling_appointment BEGIN
+            INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, busca) VALUES ('delete', old.id, old.busca);
+            INSERT INTO {TABELA_FTS}(rowid, busca) VALUES (new.id, new.busca);
+        END""",
+}
+
+
+def garantir_fts(using='default', **kwargs):
+    """Cria a tabela FTS5 e os triggers que faltarem (SQLite). Reconstrói o índice se algo foi recriado."""
+    global _fts
+    from django.db import connections
+    conexao = connections[using]
+    if conexao.vendor != 'sqlite':
+        return
+    with conexao.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE name LIKE 'scheduling_appointment%'")
+        existentes = {nome for _, nome in cursor.fetchall()}
+        if 'scheduling_appointment' not in existentes:
+            return
+        cursor.execute("PRAGMA table_info(scheduling_appointment)")
+        if 'busca' not in {linha[1] for linha in cursor.fetchall()}:
+            return  # migrado para antes da coluna `busca`
+        faltando = [nome for nome in (TABELA_FTS, *_TRIGGERS_FTS) if nome not in existentes]
+        if not faltando:
+            return
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5("
+                "busca, content='scheduling_appointment', content_rowid='id', tokenize='unicode61', prefix='2 3')"
+            )
+        except Exception:
+            return  # SQLite sem FTS5: busca cai no LIKE
+        for sql in _TRIGGERS_FTS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')")
+    _fts = True
+
+
+def _fts_disponivel():
+    # SQLite compilado sem FTS5: a migração não cria a tabela e caímos no LIKE
+    global _fts
+    if _fts is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABELA_FTS])
+            _fts = cursor.fetchone() is not None
+    return _fts
+
+
+def reindexar(professional_id=None, service_id=None, tamanho_lote=500):
+    """Regrava `busca` dos agendamentos do profissional/serviço (ex: depois de renomeado)."""
+    qs = Appointment.objects.select_related('service', 'professional').order_by('id')
+    if professional_id:
+        qs = qs.filter(professional_id=professional_id)
+    if service_id:
+        qs = qs.filter(service_id=service_id)
+    alterados = 0
+    ultimo = 0
+    while True:
+        lote = list(qs.filter(id__gt=ultimo)[:tamanho_lote])
+        if not lote:
+            return alterados
+        mudaram = []
+        for a in lote:
+            doc = documento_busca(a)
+            if doc != a.busca:
+                a.busca = doc
+                mudaram.append(a)
+        Appointment.objects.bulk_update(mudaram, ['busca'])
+        alterados += len(mudaram)
+        ultimo = lote[-1].id
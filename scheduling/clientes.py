@@ -0,0 +1,60 @@
+"""Cadastro de clientes (Customer) a partir dos agendamentos.
+
+O WhatsApp é a chave do cliente dentro do salão. Ele é gravado normalizado
+(só dígitos, sem DDI 55 e sem zero de operadora), de modo que "(11) 98888-7777",
+"+55 11 98888-7777" e "011988887777" caiam no mesmo cliente.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q, Sum
+
+from .models import Appointment, AppointmentArquivado, Customer
+
+# Agendamentos que contam como visita (cancelados e faltas não contam)
+STATUS_VISITA = (Appointment.AGENDADO, Appointment.CONFIRMADO, Appointment.CONCLUIDO)
+
+
+def normalizar_telefone(valor):
+    digitos = re.sub(r'\D', '', valor or '')
+    if len(digitos) in (12, 13) and digitos.startswith('55'):
+        digitos = digitos[2:]
+    if len(digitos) in (11, 12) and digitos.startswith('0'):
+        digitos = digitos[1:]
+    return digitos[:20]
+
+
+def registrar_cliente(salon_id, nome, whatsapp):
+    """Upsert do cliente pelo WhatsApp normalizado. Atualiza o nome se mudou."""
+    numero = normalizar_telefone(whatsapp)
+    if not numero:
+        return None
+    cliente = Customer.objects.filter(salon_id=salon_id, whatsapp=numero).first()
+    if cliente is None:
+        try:
+            with transaction.atomic():
+                return Customer.objects.create(salon_id=salon_id, nome=nome, whatsapp=numero)
+        except IntegrityError:
+            # Outro request criou o mesmo cliente ao mesmo tempo
+            cliente = Customer.objects.get(salon_id=salon_id, whatsapp=numero)
+    if nome and cliente.nome != nome:
+        cliente.nome = nome
+        cliente.save(update_fields=['nome'])
+    return cliente
+
+
+def atualizar_estatisticas(customer_id):
+    """Recalcula visitas/última visita/total gasto (agendamentos recentes + arquivados)."""
+    visita = Q(status__in=STATUS_VISITA)
+    quentes = Appointment.objects.filter(customer_id=customer_id).aggregate(
+        visitas=Count('id', filter=visita), ultima=Max('data', filter=visita), gasto=Sum('service__preco', filter=visita),
+    )
+    frios = AppointmentArquivado.objects.filter(customer_id=customer_id).aggregate(
+        visitas=Count('id', filter=visita), ultima=Max('data', filter=visita), gasto=Sum('preco_servico', filter=visita),
+    )
+    datas = [d for d in (quentes['ultima'], frios['ultima']) if d]
+    Customer.objects.filter(pk=customer_id).update(
+        visitas=quentes['visitas'] + frios['visitas'],
+        ultima_visita=max(datas) if datas else None,
+        total_gasto=(quentes['gasto'] or 0) + (frios['gasto'] or 0),
+    )
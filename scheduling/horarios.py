@@ -0,0 +1,152 @@
+"""Horário de funcionamento do salão e escala dos profissionais: validação e gravação.
+
+O painel continua mandando o mesmo formato — horário padrão, dias fechados
+("0,6") e exceções por dia ({"2": {"inicio": "10:00", "fim": "16:00"}}) para
+o salão; {"dias", "inicio", "fim"} e [{"start", "end"}] para o profissional —
+mas tudo é validado aqui, na escrita, e gravado em linhas tipadas
+(OpeningHour, WorkingHour, ProfessionalBreak; um dia da semana por linha, com
+TimeField). A agenda só lê esses horários prontos do banco.
+
+    grade = grade_do_salao("09:00", "18:00", "0,6", {"5": {"inicio": "08:00", "fim": "14:00"}})
+    gravar_grade_do_salao(salao, grade)   # grade: {0: None, 1: (time(9), time(18)), ...}
+
+Entrada inválida levanta django.core.exceptions.ValidationError.
+"""
+import json
+from datetime import datetime, time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .agenda import hhmm, horarios_semana, minutos
+from .models import DIAS_DA_SEMANA, OpeningHour, ProfessionalBreak, WorkingHour
+
+NOMES_DIAS = dict(DIAS_DA_SEMANA)
+DIAS_FECHADOS_PADRAO = {0}  # salão novo fecha na segunda (era o padrão de Salon.dias_fechados)
+
+
+def ler_hora(valor, campo):
+    """'09:00' (ou time) -> time."""
+    if isinstance(valor, time):
+        return valor
+    try:
+        return datetime.strptime(str(valor).strip()[:5], "%H:%M").time()
+    except (TypeError, ValueError):
+        raise ValidationError(f"{campo}: hora inválida ({valor!r}), use HH:MM.")
+
+
+def ler_dias(valor, campo):
+    """'0,6' ou [0, 6] -> {0, 6}."""
+    itens = valor.split(',') if isinstance(valor, str) else (valor or [])
+    dias = set()
+    for item in itens:
+        texto = str(item).strip()
+        if not texto:
+            continue
+        if not texto.isdigit() or int(texto) > 6:
+            raise ValidationError(f"{campo}: dia da semana inválido ({item!r}), use 0 (segunda) a 6 (domingo).")
+        dias.add(int(texto))
+    return dias
+
+
+def ler_faixa(inicio, fim, campo):
+    inicio, fim = ler_hora(inicio, campo), ler_hora(fim, campo)
+    if inicio >= fim:
+        raise ValidationError(f"{campo}: o início ({inicio:%H:%M}) precisa ser antes do fim ({fim:%H:%M}).")
+    return inicio, fim
+
+
+def _ler_json(valor, campo, tipo):
+    if isinstance(valor, str):
+        try:
+            valor = json.loads(valor) if valor.strip() else tipo()
+        except ValueError:
+            raise ValidationError(f"{campo}: JSON inválido.")
+    if not isinstance(valor, tipo):
+        raise ValidationError(f"{campo}: formato inválido.")
+    return valor
+
+
+# --- SALÃO ---
+
+def grade_do_salao(abertura, fechamento, dias_fechados=(), customizados=None):
+    """Formato do painel -> {dia: (inicio, fim) ou None se fecha}, para os 7 dias."""
+    padrao = ler_faixa(abertura, fechamento, "Horário padrão")
+    fechados = ler_dias(dias_fechados, "dias_fechados")
+    excecoes = {}
+    for chave, faixa in _ler_json(customizados or {}, "horarios_customizados", dict).items():
+        dia = ler_dias([chave], "horarios_customizados")
+        if not dia or not isinstance(faixa, dict):
+            raise ValidationError(f"horarios_customizados: esperado {{dia: {{inicio, fim}}}}, veio {chave!r}.")
+        excecoes[dia.pop()] = faixa
+    grade = {}
+    for dia, nome in DIAS_DA_SEMANA:
+        if dia in fechados:
+            grade[dia] = None
+        else:
+            excecao = excecoes.get(dia, {})
+            grade[dia] = ler_faixa(excecao.get('inicio') or padrao[0], excecao.get('fim') or padrao[1], nome)
+    return grade
+
+
+def grade_padrao(salao):
+    return grade_do_salao(salao.hora_abertura_padrao, salao.hora_fechamento_padrao, DIAS_FECHADOS_PADRAO)
+
+
+def gravar_grade_do_salao(salao, grade):
+    """Grava a grade, tocando só nos dias que mudaram (cada linha gravada dispara os signals de invalidação)."""
+    with transaction.atomic():
+        atuais = {h.day_of_week: h for h in OpeningHour.objects.select_for_update().filter(salon=salao)}
+        for dia, faixa in sorted(grade.items()):
+            linha = atuais.get(dia)
+            if faixa is None:
+                if linha is not None:
+                    linha.delete()
+            elif linha is None:
+                OpeningHour.objects.create(salon=salao, day_of_week=dia, start_time=faixa[0], end_time=faixa[1])
+            elif (linha.start_time, linha.end_time) != tuple(faixa):
+                linha.start_time, linha.end_time = faixa
+                linha.save(update_fields=['start_time', 'end_time'])
+    salao.__dict__.pop('horarios_semana', None)
+
+
+def para_painel(salao):
+    """(dias_fechados '0,6', exceções {dia: {inicio, fim}}) no formato que o painel edita."""
+    padrao = (minutos(salao.hora_abertura_padrao), minutos(salao.hora_fechamento_padrao))
+    semana = horarios_semana(salao)
+    fechados = ','.join(str(dia) for dia, faixa in enumerate(semana) if faixa is None)
+    excecoes = {
+        str(dia): {'inicio': hhmm(faixa[0]), 'fim': hhmm(faixa[1])}
+        for dia, faixa in enumerate(semana) if faixa is not None and faixa != padrao
+    }
+    return fechados, excecoes
+
+
+# --- PROFISSIONAL ---
+
+def ler_escala(escala, intervalos=None):
+    """Escala do painel -> (dias, (inicio, fim) ou None, [(inicio, fim) das pausas])."""
+    escala = _ler_json(escala, "escala", dict)
+    dias = ler_dias(escala.get('dias') or [], "escala.dias")
+    expediente = None
+    if escala.get('inicio') and escala.get('fim'):
+        expediente = ler_faixa(escala['inicio'], escala['fim'], "Expediente")
+    pausas = []
+    for item in _ler_json(intervalos or [], "intervalos", list):
+        if not isinstance(item, dict):
+            raise ValidationError("intervalos: esperado [{start, end}].")
+        pausas.append(ler_faixa(item.get('start') or item.get('inicio'), item.get('end') or item.get('fim'), "Intervalo"))
+    return dias, expediente, pausas
+
+
+def gravar_escala(professional, dias, expediente, pausas):
+    """Troca a escala semanal do profissional; as pausas valem nos dias de trabalho."""
+    with transaction.atomic():
+        professional.working_hours.all().delete()
+        professional.breaks.all().delete()
+        if expediente is None:
+            return
+        for dia in sorted(dias):
+            WorkingHour.objects.create(professional=professional, day_of_week=dia, start_time=expediente[0], end_time=expediente[1])
+            for inicio, fim in pausas:
+                ProfessionalBreak.objects.create(professional=professional, day_of_week=dia, start_time=inicio, end_time=fim)
@@ -0,0 +1,119 @@
+"""Feed iCalendar (RFC 5545) com os agendamentos de um CalendarFeed, gerado em streaming.
+
+Os clientes de calendário (Google, Apple, Outlook) assinam a URL secreta e
+buscam o feed de novo a cada poucos minutos. Por isso:
+
+- o ETag vem só das versões do salão no cache (`etag_feed`), e um feed sem
+  mudanças responde 304 sem consultar os agendamentos;
+- o corpo é gerado evento a evento, com `.iterator()`, sem montar o
+  calendário inteiro na memória;
+- a janela é limitada (CALENDARIO_FEED_DIAS_ANTES/_DEPOIS em torno de hoje).
+
+Cancelados não entram: o feed é sempre a foto completa, e o cliente de
+calendário apaga os eventos que somem dele.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.versoes import AGENDA, CATALOGO, versao
+from .agenda import DURACAO_PADRAO
+from .models import Appointment
+
+STATUS_ICS = {
+    Appointment.AGENDADO: 'TENTATIVE',
+    Appointment.CONFIRMADO: 'CONFIRMED',
+    Appointment.CONCLUIDO: 'CONFIRMED',
+    Appointment.NAO_COMPARECEU: 'CONFIRMED',
+}
+
+
+def janela_feed(hoje=None):
+    hoje = hoje or timezone.localdate()
+    return (
+        hoje - timedelta(days=getattr(settings, 'CALENDARIO_FEED_DIAS_ANTES', 30)),
+        hoje + timedelta(days=getattr(settings, 'CALENDARIO_FEED_DIAS_DEPOIS', 90)),
+    )
+
+
+def etag_feed(feed, hoje=None):
+    """Muda quando algum agendamento do salão muda, quando o catálogo (nomes, durações) muda ou quando a janela anda."""
+    hoje = hoje or timezone.localdate()
+    return f'"{versao(AGENDA, feed.salon_id)}-{versao(CATALOGO, feed.salon_id)}-{hoje:%Y%m%d}"'
+
+
+def escapar(texto):
+    return (texto or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def dobrar(linha):
+    """Quebra a linha em pedaços de até 75 octetos (UTF-8), continuando com espaço, como pede a RFC."""
+    bruto = linha.encode('utf-8')
+    if len(bruto) <= 75:
+        return linha + '\r\n'
+    partes = []
+    limite = 75
+    while bruto:
+        corte = min(limite, len(bruto))
+        # Não corta no meio de um caractere multibyte
+        while corte < len(bruto) and (bruto[corte] & 0xC0) == 0x80:
+            corte -= 1
+        partes.append(bruto[:corte].decode('utf-8'))
+        bruto = bruto[corte:]
+        limite = 74  # o espaço da continuação conta
+    return '\r\n '.join(partes) + '\r\n'
+
+
+def _utc(momento):
+    return momento.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def gerar_feed(feed, hoje=None):
+    """Gera o .ics em pedaços (str), para um StreamingHttpResponse."""
+    inicio, fim = janela_feed(hoje)
+    salao = feed.salon
+    nome = f"{salao.nome} - {feed.professional.nome}" if feed.professional_id else salao.nome
+    yield ''.join(dobrar(l) for l in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//SoftSkin//Agenda//PT-BR',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escapar(nome)}',
+        f'X-WR-TIMEZONE:{settings.TIME_ZONE}',
+        'REFRESH-INTERVAL;VALUE=DURATION:PT15M',
+        'X-PUBLISHED-TTL:PT15M',
+    ))
+
+    agendamentos = Appointment.objects.filter(salon_id=feed.salon_id, data__range=(inicio, fim), status__in=list(STATUS_ICS))
+    if feed.professional_id:
+        agendamentos = agendamentos.filter(professional_id=feed.professional_id)
+    colunas = agendamentos.order_by('data', 'hora_inicio', 'id').values_list(
+        'id', 'data', 'hora_inicio', 'status', 'cliente_nome', 'cliente_whatsapp', 'codigo_validacao', 'atualizado_em',
+        'service__nome', 'service__duracao_minutos', 'professional__nome',
+    )
+    fuso = timezone.get_default_timezone()
+    for (id_, data, hora, status, cliente, whatsapp, codigo, atualizado_em,
+         servico, duracao, profissional) in colunas.iterator(chunk_size=500):
+        comeca = timezone.make_aware(datetime.combine(data, hora), fuso)
+        termina = comeca + timedelta(minutes=duracao or DURACAO_PADRAO)
+        titulo = f"{servico or 'Atendimento'} - {cliente}"
+        if not feed.professional_id:
+            titulo += f" ({profissional})"
+        descricao = f"Cliente: {cliente}\nWhatsApp: {whatsapp}"
+        if codigo:
+            descricao += f"\nCódigo: {codigo}"
+        yield ''.join(dobrar(l) for l in (
+            'BEGIN:VEVENT',
+            f'UID:agendamento-{id_}@{salao.slug}.softskin',
+            f'DTSTAMP:{_utc(atualizado_em)}',
+            f'LAST-MODIFIED:{_utc(atualizado_em)}',
+            f'DTSTART:{_utc(comeca)}',
+            f'DTEND:{_utc(termina)}',
+            f'SUMMARY:{escapar(titulo)}',
+            f'DESCRIPTION:{escapar(descricao)}',
+            f'STATUS:{STATUS_ICS[status]}',
+            'END:VEVENT',
+        ))
+    yield 'END:VCALENDAR\r\n'
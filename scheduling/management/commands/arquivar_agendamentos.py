@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from jobs.fila import enfileirar
+from scheduling.arquivo import arquivar_agendamentos, data_limite_arquivo
+
+
+class Command(BaseCommand):
+    help = (
+        "Move agendamentos anteriores ao horizonte (ARQUIVO_AGENDAMENTOS_DIAS) para a tabela de arquivo, "
+        "em lotes. Pensado para rodar no cron (ex: diariamente de madrugada)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=500, help="Agendamentos por transação")
+        parser.add_argument("--max-lotes", type=int, help="Para depois de N lotes (padrão: até acabar)")
+        parser.add_argument("--enfileirar", action="store_true", help="Só agenda o job para o runworker executar")
+
+    def handle(self, *args, **options):
+        if options["enfileirar"]:
+            enfileirar("scheduling.arquivar_agendamentos", {"tamanho_lote": options["lote"]}, chave="arquivar_agendamentos")
+            self.stdout.write("Job de arquivamento enfileirado.")
+            return
+
+        movidos, terminou = arquivar_agendamentos(tamanho_lote=options["lote"], max_lotes=options["max_lotes"])
+        situacao = "concluído" if terminou else "interrompido (--max-lotes), ainda há o que arquivar"
+        self.stdout.write(self.style.SUCCESS(f"{movidos} agendamentos anteriores a {data_limite_arquivo():%d/%m/%Y} arquivados; {situacao}."))
@@ -0,0 +1,79 @@
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import Salon
+from scheduling.agenda import Agenda
+from scheduling.models import Appointment
+from scheduling.ocupacao import MINUTOS_DIA, MapaOcupacao
+
+
+def ocupacao_escalar(salao, inicio, fim, faixa=15):
+    """Caminho de referência: a Agenda do período e checagem minuto a minuto em Python.
+
+    Só conta agendamentos ativos (é o que a Agenda carrega). Retorna
+    (aberto, agendado) no mesmo formato do MapaOcupacao.
+    """
+    agenda = Agenda(salao, inicio, fim)
+    forma = (len(agenda.profissionais), len(agenda.datas), MINUTOS_DIA // faixa)
+    aberto = np.zeros(forma, dtype=np.int16)
+    agendado = np.zeros(forma, dtype=np.int16)
+    for p, prof in enumerate(agenda.profissionais):
+        for d, data in enumerate(agenda.datas):
+            dia = agenda.dia(prof.id, data)
+            if dia.expediente is None or dia.bloqueado:
+                continue
+            for minuto in range(dia.expediente[0], dia.expediente[1]):
+                if any(i <= minuto < f for i, f, *_ in dia.bloqueios):
+                    continue
+                aberto[p, d, minuto // faixa] += 1
+                if any(i <= minuto < f for i, f, _ in dia.agendamentos):
+                    agendado[p, d, minuto // faixa] += 1
+    return aberto, agendado
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o mapa de ocupação vetorizado (scheduling/ocupacao.py) com o cálculo escalar pela Agenda "
+        "em um salão real: tempo de cada um e se os resultados batem."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("salao", help="Slug do salão")
+        parser.add_argument("--dias-antes", type=int, default=30)
+        parser.add_argument("--dias-depois", type=int, default=30)
+        parser.add_argument("--faixa", type=int, default=15, help="Minutos por faixa do heatmap")
+        parser.add_argument("--repeticoes", type=int, default=3, help="Rodadas do vetorizado (vale a melhor)")
+
+    def handle(self, *args, **options):
+        salao = Salon.objects.filter(slug=options["salao"]).first()
+        if salao is None:
+            raise CommandError(f"Salão '{options['salao']}' não encontrado.")
+        hoje = timezone.localdate()
+        inicio, fim = hoje - timedelta(days=options["dias_antes"]), hoje + timedelta(days=options["dias_depois"])
+        faixa = options["faixa"]
+
+        t0 = time.perf_counter()
+        aberto, agendado = ocupacao_escalar(salao, inicio, fim, faixa)
+        escalar = time.perf_counter() - t0
+
+        vetorizado = float("inf")
+        for _ in range(max(1, options["repeticoes"])):
+            t0 = time.perf_counter()
+            mapa = MapaOcupacao(salao, inicio, fim, faixa=faixa, status=Appointment.STATUS_ATIVOS)
+            vetorizado = min(vetorizado, time.perf_counter() - t0)
+
+        celulas = aberto.size
+        self.stdout.write(f"{len(mapa.profissionais)} profissionais × {len(mapa.datas)} dias × {MINUTOS_DIA // faixa} faixas = {celulas} células")
+        self.stdout.write(f"escalar:    {escalar * 1000:9.1f} ms")
+        self.stdout.write(f"vetorizado: {vetorizado * 1000:9.1f} ms  ({escalar / vetorizado:.1f}x)")
+
+        divergentes = int(np.count_nonzero((aberto != mapa.aberto) | (agendado != mapa.agendado)))
+        if divergentes:
+            raise CommandError(f"{divergentes} célula(s) divergem entre os dois cálculos.")
+        total = int(mapa.aberto.sum())
+        ocupacao = int(mapa.agendado.sum()) / total if total else 0
+        self.stdout.write(self.style.SUCCESS(f"Resultados iguais. {total} minutos abertos, ocupação {ocupacao:.1%}."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from scheduling.miniaturas import gerar_miniaturas
+from scheduling.models import Professional
+
+
+class Command(BaseCommand):
+    help = "Gera (ou regenera) as miniaturas WebP/JPEG das fotos dos profissionais já cadastrados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--salao", help="Slug do salão (padrão: todos)")
+        parser.add_argument("--forcar", action="store_true", help="Regrava mesmo as miniaturas já existentes")
+
+    def handle(self, *args, **options):
+        profs = Professional.objects.exclude(foto="").exclude(foto__isnull=True).order_by("id")
+        if options["salao"]:
+            profs = profs.filter(salon__slug=options["salao"])
+
+        total = falhas = 0
+        for prof in profs.iterator():
+            mapa = gerar_miniaturas(prof, forcar=options["forcar"])
+            total += 1
+            if len(mapa) <= 1:
+                falhas += 1
+                self.stderr.write(f"  ! {prof.id} {prof.nome}: não foi possível ler {prof.foto.name}")
+            else:
+                self.stdout.write(f"  {prof.id} {prof.nome}: {len(mapa) - 1} tamanhos")
+
+        self.stdout.write(self.style.SUCCESS(f"{total} profissionais processados, {falhas} falhas."))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Salon
+from scheduling.agenda import hhmm
+from scheduling.materializacao import janela, recalcular, rolar_janela, verificar
+
+
+def _intervalos(lista):
+    return ', '.join(f"{hhmm(i)}-{hhmm(f)}" for i, f in lista) or '-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mantém a disponibilidade materializada dos salões que a usam: apaga os dias que passaram e calcula "
+        "os que entraram na janela (DISPONIBILIDADE_MATERIALIZADA_DIAS). Pensado para rodar no cron de madrugada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--salao", help="Slug de um salão (padrão: todos com a opção ligada)")
+        parser.add_argument("--completo", action="store_true", help="Recalcula a janela inteira, não só os dias que faltam")
+        parser.add_argument("--verificar", action="store_true", help="Compara a tabela com um cálculo novo e lista as divergências")
+        parser.add_argument("--corrigir", action="store_true", help="Com --verificar, regrava os dias divergentes")
+
+    def handle(self, *args, **options):
+        saloes = Salon.objects.filter(disponibilidade_materializada=True).order_by("id")
+        if options["salao"]:
+            saloes = saloes.filter(slug=options["salao"])
+            if not saloes.exists():
+                raise CommandError(f"Salão '{options['salao']}' não encontrado ou sem disponibilidade materializada.")
+
+        primeiro, ultimo = janela()
+        divergentes = 0
+        for salao in saloes:
+            if options["verificar"]:
+                divergencias = verificar(salao)
+                divergentes += len(divergencias)
+                for prof_id, data, gravado, esperado in divergencias:
+                    atual = "ausente" if gravado is None else _intervalos(gravado[1])
+                    self.stdout.write(f"{salao.slug} prof={prof_id} {data:%d/%m/%Y}: tabela {atual} | calculado {_intervalos(esperado[1])}")
+                if divergencias and options["corrigir"]:
+                    for prof_id, data, _, _ in divergencias:
+                        recalcular(salao, [data], professional_id=prof_id)
+                self.stdout.write(f"{salao.slug}: {len(divergencias)} dia(s) divergente(s).")
+            elif options["completo"]:
+                self.stdout.write(f"{salao.slug}: {recalcular(salao)} linha(s) recalculada(s).")
+            else:
+                apagados, calculados = rolar_janela(salao)
+                self.stdout.write(f"{salao.slug}: {apagados} linha(s) antiga(s) apagada(s), {calculados} calculada(s).")
+
+        if options["verificar"] and divergentes and not options["corrigir"]:
+            raise CommandError(f"{divergentes} dia(s) divergente(s) entre {primeiro:%d/%m/%Y} e {ultimo:%d/%m/%Y}.")
+        self.stdout.write(self.style.SUCCESS(f"Janela {primeiro:%d/%m/%Y} a {ultimo:%d/%m/%Y} em dia."))
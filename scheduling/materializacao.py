@@ -0,0 +1,159 @@
+"""Disponibilidade materializada: livres por (profissional, dia) gravados em tabela.
+
+Para salões com `Salon.disponibilidade_materializada`, a página pública lê
+os horários livres de DisponibilidadeMaterializada (uma linha indexada por
+profissional/dia) em vez de montar a Agenda a cada request.
+
+- A janela vai de hoje até DISPONIBILIDADE_MATERIALIZADA_DIAS à frente.
+- Mudanças em agendamentos, feriados, folgas, escalas e configuração do salão
+  enfileiram o recálculo só dos profissionais/dias afetados (signals.py →
+  job `scheduling.materializar_disponibilidade`).
+- `manage.py materializar_disponibilidade`, no cron de madrugada, apaga os
+  dias que passaram e calcula os que entraram na janela.
+- `manage.py materializar_disponibilidade --verificar` compara a tabela com
+  um cálculo novo da Agenda.
+
+A tabela é só para exibir horários: as reservas (booking/reservas.py)
+continuam conferindo tudo na Agenda, dentro da transação.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Salon
+from .agenda import Agenda, minutos, subtrair, unir
+from .models import DisponibilidadeMaterializada, Service, SlotHold
+
+
+def janela(hoje=None):
+    """(primeiro, último) dia materializado."""
+    hoje = hoje or timezone.localdate()
+    dias = getattr(settings, 'DISPONIBILIDADE_MATERIALIZADA_DIAS', 30)
+    return hoje, hoje + timedelta(days=dias - 1)
+
+
+def calcular_linhas(salao, datas, professional_id=None):
+    """Linhas (não gravadas) dos profissionais do salão nos dias pedidos, a partir da Agenda."""
+    datas = sorted(set(datas))
+    if not datas:
+        return []
+    agenda = Agenda(salao, datas[0], datas[-1], profissionais=[professional_id] if professional_id else None)
+    linhas = []
+    for prof in agenda.profissionais:
+        jornadas = {wh.day_of_week: wh for wh in prof.working_hours.all()}
+        for data in datas:
+            wh = jornadas.get(data.weekday())
+            lotados = {}
+            for service_id in agenda.recursos_servico:
+                trechos = agenda.recursos_lotados(data, service_id)
+                if trechos:
+                    lotados[str(service_id)] = [list(t) for t in trechos]
+            linhas.append(DisponibilidadeMaterializada(
+                salon_id=salao.id, professional_id=prof.id, data=data,
+                grade=[minutos(wh.start_time), minutos(wh.end_time)] if wh else None,
+                livres=[list(t) for t in agenda.dia(prof.id, data).livres()],
+                lotados=lotados,
+            ))
+    return linhas
+
+
+def recalcular(salao, datas=None, professional_id=None, hoje=None):
+    """Regrava as linhas dos dias pedidos (padrão: a janela toda). Retorna quantas gravou."""
+    primeiro, ultimo = janela(hoje)
+    if datas is None:
+        datas = [primeiro + timedelta(days=i) for i in range((ultimo - primeiro).days + 1)]
+    linhas = calcular_linhas(salao, [d for d in datas if primeiro <= d <= ultimo], professional_id)
+    agora = timezone.now()
+    for linha in linhas:
+        linha.atualizado_em = agora  # bulk_create com update_conflicts não passa pelo auto_now no UPDATE
+    with transaction.atomic():
+        DisponibilidadeMaterializada.objects.bulk_create(
+            linhas, batch_size=500, update_conflicts=True,
+            unique_fields=['professional', 'data'], update_fields=['salon', 'grade', 'livres', 'lotados', 'atualizado_em'],
+        )
+    return len(linhas)
+
+
+def rolar_janela(salao, hoje=None):
+    """Apaga os dias que ficaram para trás e calcula os que faltam na janela. Retorna (apagados, calculados)."""
+    primeiro, ultimo = janela(hoje)
+    apagados, _ = DisponibilidadeMaterializada.objects.filter(salon=salao, data__lt=primeiro).delete()
+    existentes = set(
+        DisponibilidadeMaterializada.objects.filter(salon=salao, data__range=(primeiro, ultimo))
+        .values_list('data', flat=True).distinct()
+    )
+    faltando = [primeiro + timedelta(days=i) for i in range((ultimo - primeiro).days + 1)]
+    faltando = [d for d in faltando if d not in existentes]
+    return apagados, recalcular(salao, faltando, hoje=hoje) if faltando else 0
+
+
+def verificar(salao, hoje=None):
+    """Compara a tabela com um cálculo novo. Retorna [(professional_id, data, gravado, esperado)] das divergências.
+
+    Linha ausente aparece com gravado=None; `esperado` é (grade, livres, lotados).
+    """
+    primeiro, ultimo = janela(hoje)
+    gravadas = {
+        (l.professional_id, l.data): (l.grade, l.livres, l.lotados)
+        for l in DisponibilidadeMaterializada.objects.filter(salon=salao, data__range=(primeiro, ultimo))
+    }
+    datas = [primeiro + timedelta(days=i) for i in range((ultimo - primeiro).days + 1)]
+    divergencias = []
+    for linha in calcular_linhas(salao, datas):
+        esperado = (linha.grade, linha.livres, linha.lotados)
+        gravado = gravadas.get((linha.professional_id, linha.data))
+        if gravado != esperado:
+            divergencias.append((linha.professional_id, linha.data, gravado, esperado))
+    return divergencias
+
+
+def agendar_recalculo(salon_id, datas=None, professional_id=None, service_id=None):
+    """Enfileira o recálculo (após o commit). `datas=None`: a janela toda; `professional_id=None`: todos.
+
+    Não faz nada para dias fora da janela ou salão sem materialização; um job
+    pendente com a mesma chave já cobre a mudança. Se `service_id` usa algum
+    recurso compartilhado, recalcula o dia de todos os profissionais.
+    """
+    from jobs.fila import enfileirar
+    if datas is not None:
+        primeiro, ultimo = janela()
+        datas = sorted({d for d in datas if d and primeiro <= d <= ultimo})
+        if not datas:
+            return
+    if not salon_id or not Salon.objects.filter(pk=salon_id, disponibilidade_materializada=True).exists():
+        return
+    if service_id and Service.recursos.through.objects.filter(service_id=service_id).exists():
+        professional_id = None
+    prof = professional_id or '*'
+    for data in datas or [None]:
+        enfileirar(
+            'scheduling.materializar_disponibilidade',
+            {'salon_id': salon_id, 'professional_id': professional_id, 'datas': [data.isoformat()] if data else None},
+            salon=salon_id, chave=f"disponibilidade:{salon_id}:{prof}:{data.isoformat() if data else '*'}",
+        )
+
+
+def ler(salao, professional_id, data, service, hoje=None):
+    """Livres do profissional no dia para o serviço, lidos da tabela (menos os holds ativos dele).
+
+    Retorna (nome do profissional, grade, livres) — grade None se não
+    trabalha — ou None se o dia não está materializado (quem chama cai no cálculo pela Agenda).
+    """
+    primeiro, ultimo = janela(hoje)
+    if not salao.disponibilidade_materializada or not primeiro <= data <= ultimo:
+        return None
+    linha = (
+        DisponibilidadeMaterializada.objects.filter(professional_id=professional_id, data=data, salon=salao)
+        .values_list('professional__nome', 'grade', 'livres', 'lotados').first()
+    )
+    if linha is None:
+        return None
+    nome, grade, livres, lotados = linha
+    livres = [tuple(t) for t in livres]
+    ocupados = [tuple(t) for t in lotados.get(str(service.id), ())]
+    holds = SlotHold.objects.filter(professional_id=professional_id, data=data, expira_em__gt=timezone.now())
+    for hora_inicio, duracao in holds.values_list('hora_inicio', 'duracao_minutos'):
+        ocupados.append((minutos(hora_inicio), minutos(hora_inicio) + duracao))
+    return nome, grade, subtrair(livres, unir(ocupados)) if ocupados else livres
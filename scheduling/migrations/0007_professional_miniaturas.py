@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0006_professional_intervalos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='professional',
+            name='miniaturas',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
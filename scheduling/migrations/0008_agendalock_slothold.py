@@ -0,0 +1,46 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:51
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_salon_horarios_customizados'),
+        ('scheduling', '0007_professional_miniaturas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgendaLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('versao', models.IntegerField(default=0)),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='scheduling.professional')),
+            ],
+            options={
+                'unique_together': {('professional', 'data')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('data', models.DateField()),
+                ('hora_inicio', models.TimeField()),
+                ('duracao_minutos', models.IntegerField()),
+                ('expira_em', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='scheduling.professional')),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.salon')),
+                ('service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='scheduling.service')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['professional', 'data', 'expira_em'], name='hold_prof_data_idx')],
+            },
+        ),
+    ]
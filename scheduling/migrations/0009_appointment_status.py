@@ -0,0 +1,58 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_salon_horarios_customizados'),
+        ('scheduling', '0008_agendalock_slothold'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='cancelado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='confirmado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='finalizado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='status',
+            field=models.CharField(choices=[('agendado', 'Agendado'), ('confirmado', 'Confirmado'), ('cancelado', 'Cancelado'), ('nao_compareceu', 'Não compareceu'), ('concluido', 'Concluído')], default='agendado', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status__in', ['agendado', 'confirmado'])), fields=['salon', 'data'], name='agend_salao_data_ativo_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['agendado', 'confirmado'])), fields=('professional', 'data', 'hora_inicio'), name='agendamento_horario_ativo_unico'),
+        ),
+    ]
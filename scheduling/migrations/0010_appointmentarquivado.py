@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_salon_horarios_customizados'),
+        ('scheduling', '0009_appointment_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentArquivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_original', models.IntegerField(unique=True)),
+                ('nome_profissional', models.CharField(blank=True, max_length=100)),
+                ('nome_servico', models.CharField(blank=True, max_length=100)),
+                ('preco_servico', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('cliente_nome', models.CharField(max_length=255)),
+                ('cliente_whatsapp', models.CharField(max_length=20)),
+                ('codigo_validacao', models.CharField(blank=True, max_length=10, null=True)),
+                ('data', models.DateField()),
+                ('hora_inicio', models.TimeField()),
+                ('status', models.CharField(choices=[('agendado', 'Agendado'), ('confirmado', 'Confirmado'), ('cancelado', 'Cancelado'), ('nao_compareceu', 'Não compareceu'), ('concluido', 'Concluído')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('confirmado_em', models.DateTimeField(blank=True, null=True)),
+                ('cancelado_em', models.DateTimeField(blank=True, null=True)),
+                ('finalizado_em', models.DateTimeField(blank=True, null=True)),
+                ('arquivado_em', models.DateTimeField(auto_now_add=True)),
+                ('professional', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='scheduling.professional')),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.salon')),
+                ('service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='scheduling.service')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['salon', 'data'], name='arquivo_salao_data_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_salon_horarios_customizados'),
+        ('scheduling', '0010_appointmentarquivado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Customer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=255)),
+                ('whatsapp', models.CharField(max_length=20)),
+                ('visitas', models.IntegerField(default=0)),
+                ('ultima_visita', models.DateField(blank=True, null=True)),
+                ('total_gasto', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customers', to='core.salon')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='customer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='agendamentos', to='scheduling.customer'),
+        ),
+        migrations.AddField(
+            model_name='appointmentarquivado',
+            name='customer',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='scheduling.customer'),
+        ),
+        migrations.AddConstraint(
+            model_name='customer',
+            constraint=models.UniqueConstraint(fields=('salon', 'whatsapp'), name='cliente_whatsapp_unico'),
+        ),
+    ]
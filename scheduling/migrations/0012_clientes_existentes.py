@@ -0,0 +1,72 @@
+import re
+from collections import defaultdict
+
+from django.db import migrations
+
+# Cópia de scheduling.clientes (migrações não devem depender do código atual do app)
+STATUS_VISITA = ('agendado', 'confirmado', 'concluido')
+
+
+def normalizar_telefone(valor):
+    digitos = re.sub(r'\D', '', valor or '')
+    if len(digitos) in (12, 13) and digitos.startswith('55'):
+        digitos = digitos[2:]
+    if len(digitos) in (11, 12) and digitos.startswith('0'):
+        digitos = digitos[1:]
+    return digitos[:20]
+
+
+def criar_clientes(apps, schema_editor):
+    """Agrupa os agendamentos existentes por (salão, WhatsApp normalizado) em Customers."""
+    Appointment = apps.get_model('scheduling', 'Appointment')
+    AppointmentArquivado = apps.get_model('scheduling', 'AppointmentArquivado')
+    Customer = apps.get_model('scheduling', 'Customer')
+
+    # (salon_id, numero) -> {'nome', 'data_nome', 'quentes', 'frios', 'visitas', 'ultima', 'gasto'}
+    grupos = defaultdict(lambda: {'nome': '', 'data_nome': None, 'quentes': [], 'frios': [], 'visitas': 0, 'ultima': None, 'gasto': 0})
+
+    def acumular(linhas, lista, campo_preco):
+        for row in linhas:
+            numero = normalizar_telefone(row['cliente_whatsapp'])
+            if not numero:
+                continue
+            g = grupos[(row['salon_id'], numero)]
+            g[lista].append(row['id'])
+            # O nome mais recente vence
+            if g['data_nome'] is None or row['data'] >= g['data_nome']:
+                g['nome'], g['data_nome'] = row['cliente_nome'], row['data']
+            if row['status'] in STATUS_VISITA:
+                g['visitas'] += 1
+                g['ultima'] = max(g['ultima'], row['data']) if g['ultima'] else row['data']
+                g['gasto'] += row[campo_preco] or 0
+
+    acumular(Appointment.objects.values('id', 'salon_id', 'cliente_nome', 'cliente_whatsapp', 'data', 'status', 'service__preco').iterator(),
+             'quentes', 'service__preco')
+    acumular(AppointmentArquivado.objects.values('id', 'salon_id', 'cliente_nome', 'cliente_whatsapp', 'data', 'status', 'preco_servico').iterator(),
+             'frios', 'preco_servico')
+
+    for (salon_id, numero), g in grupos.items():
+        cliente, _ = Customer.objects.get_or_create(salon_id=salon_id, whatsapp=numero, defaults={'nome': g['nome']})
+        cliente.visitas, cliente.ultima_visita, cliente.total_gasto = g['visitas'], g['ultima'], g['gasto']
+        cliente.save(update_fields=['visitas', 'ultima_visita', 'total_gasto'])
+        for i in range(0, len(g['quentes']), 500):
+            Appointment.objects.filter(id__in=g['quentes'][i:i + 500]).update(customer=cliente)
+        for i in range(0, len(g['frios']), 500):
+            AppointmentArquivado.objects.filter(id__in=g['frios'][i:i + 500]).update(customer=cliente)
+
+
+def desvincular_clientes(apps, schema_editor):
+    apps.get_model('scheduling', 'Appointment').objects.update(customer=None)
+    apps.get_model('scheduling', 'AppointmentArquivado').objects.update(customer=None)
+    apps.get_model('scheduling', 'Customer').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0011_customer'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_clientes, desvincular_clientes),
+    ]
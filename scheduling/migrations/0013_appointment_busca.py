@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0012_clientes_existentes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='busca',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
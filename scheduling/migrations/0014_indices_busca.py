@@ -0,0 +1,65 @@
+import re
+import unicodedata
+
+from django.db import migrations
+
+# Cópias de scheduling.busca/clientes (migrações não devem depender do código atual do app)
+
+
+def normalizar_busca(texto):
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w]+', ' ', texto.lower())).strip()
+
+
+def normalizar_telefone(valor):
+    digitos = re.sub(r'\D', '', valor or '')
+    if len(digitos) in (12, 13) and digitos.startswith('55'):
+        digitos = digitos[2:]
+    if len(digitos) in (11, 12) and digitos.startswith('0'):
+        digitos = digitos[1:]
+    return digitos[:20]
+
+
+def preencher_busca(apps, schema_editor):
+    Appointment = apps.get_model('scheduling', 'Appointment')
+    ultimo = 0
+    while True:
+        lote = list(Appointment.objects.filter(id__gt=ultimo).select_related('service', 'professional').order_by('id')[:1000])
+        if not lote:
+            break
+        for a in lote:
+            numero = normalizar_telefone(a.cliente_whatsapp)
+            a.busca = normalizar_busca(' '.join([
+                a.cliente_nome, numero, numero[2:], numero[-4:], a.codigo_validacao or '',
+                a.service.nome if a.service else '', a.professional.nome if a.professional else '',
+            ]))
+        Appointment.objects.bulk_update(lote, ['busca'])
+        ultimo = lote[-1].id
+
+
+def criar_indice_trigram(apps, schema_editor):
+    # No SQLite o índice é a tabela FTS5, criada por scheduling.busca.garantir_fts (post_migrate)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS agend_busca_trgm_idx ON scheduling_appointment USING gin (busca gin_trgm_ops)"
+    )
+
+
+def remover_indice_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS agend_busca_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0013_appointment_busca'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice_trigram, remover_indice_trigram),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0014_indices_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='grupo',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
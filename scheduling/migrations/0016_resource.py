@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_salon_horarios_customizados'),
+        ('scheduling', '0015_appointment_grupo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Resource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('capacidade', models.PositiveIntegerField(default=1)),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resources', to='core.salon')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='recursos',
+            field=models.ManyToManyField(blank=True, related_name='services', to='scheduling.resource'),
+        ),
+    ]
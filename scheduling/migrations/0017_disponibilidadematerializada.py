@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_salon_disponibilidade_materializada'),
+        ('scheduling', '0016_resource'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DisponibilidadeMaterializada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('grade', models.JSONField(null=True)),
+                ('livres', models.JSONField(default=list)),
+                ('lotados', models.JSONField(default=dict)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='scheduling.professional')),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.salon')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['salon', 'data'], name='disp_materializada_salao_idx')],
+                'constraints': [models.UniqueConstraint(fields=('professional', 'data'), name='disp_materializada_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_salon_disponibilidade_materializada'),
+        ('scheduling', '0018_calendarfeed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['data'], name='agendamento_data_idx'),
+        ),
+    ]
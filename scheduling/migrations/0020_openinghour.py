@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_salon_disponibilidade_materializada'),
+        ('scheduling', '0019_indice_data_agendamento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpeningHour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day_of_week', models.IntegerField(choices=[(0, 'Segunda'), (1, 'Terça'), (2, 'Quarta'), (3, 'Quinta'), (4, 'Sexta'), (5, 'Sábado'), (6, 'Domingo')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_hours', to='core.salon')),
+            ],
+            options={
+                'ordering': ['day_of_week'],
+                'constraints': [
+                    models.UniqueConstraint(fields=('salon', 'day_of_week'), name='horario_salao_unico'),
+                    models.CheckConstraint(condition=models.Q(('day_of_week__gte', 0), ('day_of_week__lte', 6)), name='horario_salao_dia_valido', violation_error_message='Dia da semana inválido (0=segunda a 6=domingo).'),
+                    models.CheckConstraint(condition=models.Q(('start_time__lt', models.F('end_time'))), name='horario_salao_inicio_antes_fim', violation_error_message='O horário de início precisa ser antes do fim.'),
+                ],
+            },
+        ),
+        migrations.AlterField(
+            model_name='professionalbreak',
+            name='day_of_week',
+            field=models.IntegerField(choices=[(0, 'Segunda'), (1, 'Terça'), (2, 'Quarta'), (3, 'Quinta'), (4, 'Sexta'), (5, 'Sábado'), (6, 'Domingo')]),
+        ),
+        migrations.AlterField(
+            model_name='workinghour',
+            name='day_of_week',
+            field=models.IntegerField(choices=[(0, 'Segunda'), (1, 'Terça'), (2, 'Quarta'), (3, 'Quinta'), (4, 'Sexta'), (5, 'Sábado'), (6, 'Domingo')]),
+        ),
+    ]
@@ -0,0 +1,118 @@
+import json
+from datetime import datetime
+
+from django.db import migrations
+from django.db.models import F, Q
+
+# Cópia da leitura antiga de scheduling.agenda (migrações não devem depender do código atual do app)
+
+
+def ler_hora(valor):
+    try:
+        return datetime.strptime(str(valor)[:5], "%H:%M").time()
+    except (TypeError, ValueError):
+        return None
+
+
+def ler_json(valor, padrao):
+    if isinstance(valor, str):
+        try:
+            return json.loads(valor) if valor.strip() else padrao
+        except ValueError:
+            return padrao
+    return valor
+
+
+def horarios_do_salao(salao):
+    """Mesmo resultado que horario_do_salao dava para os 7 dias: {dia: (abertura, fechamento)} dos dias abertos."""
+    fechados = {x.strip() for x in (salao.dias_fechados or '').split(',')}
+    custom = ler_json(salao.horarios_customizados, {})
+    grade = {}
+    for dia in range(7):
+        if str(dia) in fechados:
+            continue
+        abertura, fechamento = salao.hora_abertura_padrao, salao.hora_fechamento_padrao
+        if isinstance(custom, dict) and isinstance(custom.get(str(dia)), dict):
+            excecao = custom[str(dia)]
+            abertura = ler_hora(excecao.get('inicio')) if excecao.get('inicio') else abertura
+            fechamento = ler_hora(excecao.get('fim')) if excecao.get('fim') else fechamento
+        # Sem hora válida ou com o fim antes do início o dia já não tinha horário livre
+        if abertura is not None and fechamento is not None and abertura < fechamento:
+            grade[dia] = (abertura, fechamento)
+    return grade
+
+
+def converter(apps, schema_editor):
+    Salon = apps.get_model('core', 'Salon')
+    Professional = apps.get_model('scheduling', 'Professional')
+    OpeningHour = apps.get_model('scheduling', 'OpeningHour')
+    WorkingHour = apps.get_model('scheduling', 'WorkingHour')
+    ProfessionalBreak = apps.get_model('scheduling', 'ProfessionalBreak')
+
+    # Salão: dias_fechados + horarios_customizados -> uma linha por dia aberto
+    linhas = []
+    for salao in Salon.objects.iterator():
+        linhas += [
+            OpeningHour(salon_id=salao.pk, day_of_week=dia, start_time=inicio, end_time=fim)
+            for dia, (inicio, fim) in horarios_do_salao(salao).items()
+        ]
+        if len(linhas) >= 1000:
+            OpeningHour.objects.bulk_create(linhas)
+            linhas = []
+    OpeningHour.objects.bulk_create(linhas)
+
+    # Faixas que nunca valeram (dia fora de 0..6, fim antes do início) não passam nas constraints novas
+    invalidas = Q(day_of_week__lt=0) | Q(day_of_week__gt=6) | Q(start_time__gte=F('end_time'))
+    WorkingHour.objects.filter(invalidas).delete()
+    ProfessionalBreak.objects.filter(invalidas).delete()
+
+    # Profissional: o JSON `intervalos` valia todo dia -> ProfessionalBreak em cada dia de trabalho
+    for prof in Professional.objects.exclude(intervalos=[]).iterator():
+        pausas = set()
+        lista = ler_json(prof.intervalos, [])
+        for item in lista if isinstance(lista, list) else []:
+            if not isinstance(item, dict):
+                continue
+            inicio = ler_hora(item.get('start') or item.get('inicio'))
+            fim = ler_hora(item.get('end') or item.get('fim'))
+            if inicio is not None and fim is not None and inicio < fim:
+                pausas.add((inicio, fim))
+        if not pausas:
+            continue
+        existentes = set(ProfessionalBreak.objects.filter(professional=prof).values_list('day_of_week', 'start_time', 'end_time'))
+        dias = set(WorkingHour.objects.filter(professional=prof).values_list('day_of_week', flat=True))
+        ProfessionalBreak.objects.bulk_create([
+            ProfessionalBreak(professional=prof, day_of_week=dia, start_time=inicio, end_time=fim)
+            for dia in sorted(dias) for inicio, fim in sorted(pausas) if (dia, inicio, fim) not in existentes
+        ])
+
+
+def restaurar(apps, schema_editor):
+    """Volta a grade para dias_fechados/horarios_customizados. As pausas ficam como ProfessionalBreak."""
+    Salon = apps.get_model('core', 'Salon')
+    OpeningHour = apps.get_model('scheduling', 'OpeningHour')
+    grades = {}
+    for h in OpeningHour.objects.all():
+        grades.setdefault(h.salon_id, {})[h.day_of_week] = (h.start_time, h.end_time)
+    for salao in Salon.objects.iterator():
+        grade = grades.get(salao.pk, {})
+        salao.dias_fechados = ','.join(str(dia) for dia in range(7) if dia not in grade)
+        salao.horarios_customizados = {
+            str(dia): {'inicio': inicio.strftime('%H:%M'), 'fim': fim.strftime('%H:%M')}
+            for dia, (inicio, fim) in grade.items()
+            if (inicio, fim) != (salao.hora_abertura_padrao, salao.hora_fechamento_padrao)
+        }
+        salao.save(update_fields=['dias_fechados', 'horarios_customizados'])
+    OpeningHour.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_salon_disponibilidade_materializada'),
+        ('scheduling', '0020_openinghour'),
+    ]
+
+    operations = [
+        migrations.RunPython(converter, restaurar),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0021_horarios_tipados'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='professional',
+            name='intervalos',
+        ),
+        migrations.AddConstraint(
+            model_name='professionalbreak',
+            constraint=models.CheckConstraint(condition=models.Q(('day_of_week__gte', 0), ('day_of_week__lte', 6)), name='pausa_dia_valido', violation_error_message='Dia da semana inválido (0=segunda a 6=domingo).'),
+        ),
+        migrations.AddConstraint(
+            model_name='professionalbreak',
+            constraint=models.CheckConstraint(condition=models.Q(('start_time__lt', models.F('end_time'))), name='pausa_inicio_antes_fim', violation_error_message='O horário de início precisa ser antes do fim.'),
+        ),
+        migrations.AddConstraint(
+            model_name='workinghour',
+            constraint=models.CheckConstraint(condition=models.Q(('day_of_week__gte', 0), ('day_of_week__lte', 6)), name='expediente_dia_valido', violation_error_message='Dia da semana inválido (0=segunda a 6=domingo).'),
+        ),
+        migrations.AddConstraint(
+            model_name='workinghour',
+            constraint=models.CheckConstraint(condition=models.Q(('start_time__lt', models.F('end_time'))), name='expediente_inicio_antes_fim', violation_error_message='O horário de início precisa ser antes do fim.'),
+        ),
+    ]
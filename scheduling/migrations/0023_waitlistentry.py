@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:34
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_remove_salon_dias_fechados_and_more'),
+        ('scheduling', '0022_remove_professional_intervalos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('cliente_nome', models.CharField(max_length=255)),
+                ('cliente_whatsapp', models.CharField(max_length=20)),
+                ('data_inicio', models.DateField()),
+                ('data_fim', models.DateField()),
+                ('hora_inicio', models.TimeField(blank=True, null=True)),
+                ('hora_fim', models.TimeField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('aguardando', 'Aguardando'), ('atendido', 'Atendido'), ('cancelado', 'Cancelado')], default='aguardando', max_length=20)),
+                ('avisos', models.IntegerField(default=0)),
+                ('avisado_em', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('appointment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='scheduling.appointment')),
+                ('professional', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='scheduling.professional')),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lista_espera', to='core.salon')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='scheduling.service')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'aguardando')), fields=['salon', 'service', 'data_fim'], name='espera_salao_servico_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('data_inicio__lte', models.F('data_fim'))), name='espera_janela_valida'), models.CheckConstraint(condition=models.Q(('hora_inicio__isnull', True), ('hora_fim__isnull', True), ('hora_inicio__lt', models.F('hora_fim')), _connector='OR'), name='espera_faixa_valida')],
+            },
+        ),
+    ]
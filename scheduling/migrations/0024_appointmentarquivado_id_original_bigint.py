@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0023_waitlistentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointmentarquivado',
+            name='id_original',
+            field=models.BigIntegerField(unique=True),
+        ),
+    ]
@@ -0,0 +1,124 @@
+"""Geração de miniaturas (WebP + JPEG) para as fotos dos profissionais.
+
+As miniaturas ficam ao lado do arquivo original, com o hash do conteúdo no
+nome (ex: profissionais/mini_3f2a9c1b7e40_64.webp). Como o nome depende só
+do conteúdo, reenviar a mesma foto reaproveita os arquivos já gerados e os
+navegadores podem cachear as URLs para sempre.
+"""
+import hashlib
+import logging
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+
+from core.versoes import CATALOGO, incrementar_versao
+
+logger = logging.getLogger(__name__)
+
+# Lados (px) das miniaturas quadradas. Cobrem os avatares de 24px da agenda,
+# os cards de 128px do painel e os de 144px da página pública em telas 2x.
+TAMANHOS_MINIATURA = (64, 160, 320)
+
+# extensão -> (formato do Pillow, opções de gravação)
+FORMATOS_MINIATURA = {
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def _hash_conteudo(arquivo):
+    h = hashlib.sha256()
+    arquivo.open("rb")
+    try:
+        for bloco in arquivo.chunks():
+            h.update(bloco)
+    finally:
+        arquivo.close()
+    return h.hexdigest()[:12]
+
+
+def gerar_miniaturas(professional, forcar=False):
+    """Gera as miniaturas da foto atual e grava o mapa em `professional.miniaturas`.
+
+    O mapa tem o formato {"origem": <foto.name>, "64": {"webp": <nome>, "jpg": <nome>}, ...}.
+    """
+    from PIL import Image, ImageOps
+
+    foto = professional.foto
+    if not foto:
+        mapa = {}
+    else:
+        storage = foto.storage
+        pasta = posixpath.dirname(foto.name)
+        mapa = {"origem": foto.name}
+        try:
+            digest = _hash_conteudo(foto)
+            foto.open("rb")
+            try:
+                original = ImageOps.exif_transpose(Image.open(foto))
+                original.load()
+            finally:
+                foto.close()
+
+            if original.mode in ("RGBA", "LA", "P"):
+                # JPEG não tem transparência: aplica sobre fundo branco
+                original = original.convert("RGBA")
+                fundo = Image.new("RGB", original.size, (255, 255, 255))
+                fundo.paste(original, mask=original.split()[-1])
+                original = fundo
+            elif original.mode != "RGB":
+                original = original.convert("RGB")
+
+            for tamanho in TAMANHOS_MINIATURA:
+                lado = min(tamanho, *original.size)
+                imagem = None
+                mapa[str(tamanho)] = {}
+                for ext, (formato, opcoes) in FORMATOS_MINIATURA.items():
+                    nome = posixpath.join(pasta, f"mini_{digest}_{tamanho}.{ext}")
+                    if forcar or not storage.exists(nome):
+                        if imagem is None:
+                            imagem = ImageOps.fit(original, (lado, lado), Image.LANCZOS)
+                        buffer = BytesIO()
+                        imagem.save(buffer, formato, **opcoes)
+                        if storage.exists(nome):
+                            storage.delete(nome)
+                        nome = storage.save(nome, ContentFile(buffer.getvalue()))
+                    mapa[str(tamanho)][ext] = nome
+        except Exception:
+            # Mantém a 'origem' para não tentar de novo a cada save; os templates
+            # caem para a foto original.
+            logger.exception("Falha ao gerar miniaturas de %s", foto.name)
+            mapa = {"origem": foto.name}
+
+    type(professional).objects.filter(pk=professional.pk).update(miniaturas=mapa)
+    professional.miniaturas = mapa
+    # O update() não passa pelos signals: sem isto o fragmento do catálogo cacheado
+    # no upload (ainda com a foto original) seguiria valendo até expirar
+    incrementar_versao(CATALOGO, professional.salon_id)
+    return mapa
+
+
+def url_miniatura(professional, tamanho, formato="webp"):
+    """URL da menor miniatura >= `tamanho`; cai para a foto original se não houver."""
+    foto = professional.foto
+    if not foto:
+        return None
+    mapa = professional.miniaturas or {}
+    if mapa.get("origem") == foto.name:
+        candidatos = [t for t in TAMANHOS_MINIATURA if t >= tamanho] or [TAMANHOS_MINIATURA[-1]]
+        for t in candidatos:
+            nome = mapa.get(str(t), {}).get(formato)
+            if nome:
+                return foto.storage.url(nome)
+    return foto.url
+
+
+def urls_miniaturas(professional):
+    """Mapa {tamanho: {formato: url}} usado pelos serializers e pelo JS."""
+    if not professional.foto:
+        return {}
+    return {
+        str(t): {ext: url_miniatura(professional, t, ext) for ext in FORMATOS_MINIATURA}
+        for t in TAMANHOS_MINIATURA
+    }
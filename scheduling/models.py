@@ -1,4 +1,9 @@
-from django.db import models
+import uuid
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
 from core.models import Salon
 
 class Category(models.Model):
@@ -6,12 +11,26 @@ class Category(models.Model):
     nome = models.CharField(max_length=100)
     def __str__(self): return self.nome
 
+class Resource(models.Model):
+    """Recurso físico compartilhado (lavatório, sala, máquina) com N unidades.
+
+    Cada agendamento de um serviço que exige o recurso ocupa uma unidade durante
+    todo o serviço, não importa o profissional.
+    """
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='resources')
+    nome = models.CharField(max_length=100)
+    capacidade = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.nome} ({self.capacidade})"
+
 class Service(models.Model):
     salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='services')
     nome = models.CharField(max_length=100)
     preco = models.DecimalField(max_digits=10, decimal_places=2)
     duracao_minutos = models.IntegerField()
     category = models.ForeignKey('Category', on_delete=models.SET_NULL, null=True, blank=True, related_name='services')
+    recursos = models.ManyToManyField(Resource, blank=True, related_name='services')
 
     def __str__(self):
         return f"{self.nome} ({self.salon.nome})"
@@ -22,26 +41,72 @@ class Professional(models.Model):
     especialidade = models.CharField(max_length=100, blank=True, null=True)
     services = models.ManyToManyField(Service, related_name='professionals', blank=True)
     foto = models.ImageField(upload_to='profissionais/', blank=True, null=True)
-    
-    # NOVO CAMPO: Para armazenar pausas como JSON (ex: almoço)
-    intervalos = models.JSONField(default=list, blank=True) 
-    
+    # Mapa das miniaturas geradas a partir da foto (ver scheduling/miniaturas.py)
+    miniaturas = models.JSONField(default=dict, blank=True, editable=False)
+
     def __str__(self):
         return self.nome
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Foto nova: miniaturas são geradas pelo worker; foto removida: limpa na hora
+        if (self.foto.name or '') != (self.miniaturas or {}).get('origem', ''):
+            if self.foto:
+                from jobs.fila import enfileirar
+                enfileirar('scheduling.gerar_miniaturas', {'professional_id': self.pk}, salon=self.salon_id, chave=f'miniaturas:{self.pk}')
+            else:
+                from .miniaturas import gerar_miniaturas
+                gerar_miniaturas(self)
+
+DIAS_DA_SEMANA = [(0, 'Segunda'), (1, 'Terça'), (2, 'Quarta'), (3, 'Quinta'), (4, 'Sexta'), (5, 'Sábado'), (6, 'Domingo')]
+
+
+def _faixa_horaria_valida(nome):
+    """Constraints comuns às faixas semanais: dia 0..6 e início antes do fim."""
+    return [
+        models.CheckConstraint(condition=Q(day_of_week__gte=0, day_of_week__lte=6), name=f'{nome}_dia_valido',
+                               violation_error_message="Dia da semana inválido (0=segunda a 6=domingo)."),
+        models.CheckConstraint(condition=Q(start_time__lt=models.F('end_time')), name=f'{nome}_inicio_antes_fim',
+                               violation_error_message="O horário de início precisa ser antes do fim."),
+    ]
+
+
+class OpeningHour(models.Model):
+    """Horário de funcionamento do salão em um dia da semana. Dia sem linha: salão fechado."""
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name="opening_hours")
+    day_of_week = models.IntegerField(choices=DIAS_DA_SEMANA) # 0=Segunda, 6=Domingo
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    class Meta:
+        ordering = ['day_of_week']
+        constraints = [
+            models.UniqueConstraint(fields=['salon', 'day_of_week'], name='horario_salao_unico'),
+            *_faixa_horaria_valida('horario_salao'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_day_of_week_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
 class WorkingHour(models.Model):
     professional = models.ForeignKey(Professional, on_delete=models.CASCADE, related_name="working_hours")
-    day_of_week = models.IntegerField() # 0=Segunda, 6=Domingo
+    day_of_week = models.IntegerField(choices=DIAS_DA_SEMANA) # 0=Segunda, 6=Domingo
     start_time = models.TimeField()
     end_time = models.TimeField()
 
-# Mantido para compatibilidade, mas a lógica nova usa o JSONField 'intervalos' acima
+    class Meta:
+        constraints = _faixa_horaria_valida('expediente')
+
+# Pausas do profissional (ex: almoço), uma linha por dia da semana
 class ProfessionalBreak(models.Model):
     professional = models.ForeignKey(Professional, on_delete=models.CASCADE, related_name="breaks")
-    day_of_week = models.IntegerField()
+    day_of_week = models.IntegerField(choices=DIAS_DA_SEMANA)
     start_time = models.TimeField()
     end_time = models.TimeField()
 
+    class Meta:
+        constraints = _faixa_horaria_valida('pausa')
+
 class SpecialSchedule(models.Model):
     salon = models.ForeignKey(Salon, on_delete=models.CASCADE)
     professional = models.ForeignKey(Professional, on_delete=models.CASCADE)
@@ -58,7 +123,57 @@ class Holiday(models.Model):
     hora_inicio = models.TimeField(null=True, blank=True)
     hora_fim = models.TimeField(null=True, blank=True)
 
+class Customer(models.Model):
+    """Cliente do salão, identificado pelo WhatsApp normalizado (só dígitos, ver scheduling/clientes.py).
+
+    visitas/ultima_visita/total_gasto são mantidos pelo signal de Appointment,
+    para o painel não precisar agregar agendamentos a cada listagem.
+    """
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='customers')
+    nome = models.CharField(max_length=255)
+    whatsapp = models.CharField(max_length=20)
+
+    visitas = models.IntegerField(default=0)
+    # Data do agendamento mais recente que conta como visita (pode ser um já marcado para o futuro)
+    ultima_visita = models.DateField(null=True, blank=True)
+    total_gasto = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['salon', 'whatsapp'], name='cliente_whatsapp_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.nome} ({self.whatsapp})"
+
+class AppointmentQuerySet(models.QuerySet):
+    def ativos(self):
+        """Agendamentos que ocupam a agenda (usa os índices parciais de status)."""
+        return self.filter(status__in=Appointment.STATUS_ATIVOS)
+
+
 class Appointment(models.Model):
+    AGENDADO = 'agendado'
+    CONFIRMADO = 'confirmado'
+    CANCELADO = 'cancelado'
+    NAO_COMPARECEU = 'nao_compareceu'
+    CONCLUIDO = 'concluido'
+    STATUS_CHOICES = [
+        (AGENDADO, 'Agendado'),
+        (CONFIRMADO, 'Confirmado'),
+        (CANCELADO, 'Cancelado'),
+        (NAO_COMPARECEU, 'Não compareceu'),
+        (CONCLUIDO, 'Concluído'),
+    ]
+    # Só estes ocupam horário. Precisa bater com a condição dos índices parciais do Meta.
+    STATUS_ATIVOS = (AGENDADO, CONFIRMADO)
+    TRANSICOES = {
+        AGENDADO: {CONFIRMADO, CANCELADO, NAO_COMPARECEU, CONCLUIDO},
+        CONFIRMADO: {CANCELADO, NAO_COMPARECEU, CONCLUIDO},
+    }
+
     salon = models.ForeignKey(Salon, on_delete=models.CASCADE)
     professional = models.ForeignKey(Professional, on_delete=models.CASCADE)
     service = models.ForeignKey(Service, on_delete=models.SET_NULL, null=True)
@@ -66,13 +181,249 @@ class Appointment(models.Model):
     cliente_nome = models.CharField(max_length=255)
     cliente_whatsapp = models.CharField(max_length=20)
 
+    customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, blank=True, related_name='agendamentos')
+
     codigo_validacao = models.CharField(max_length=10, blank=True, null=True)
+    # Agendamentos reservados juntos em sequência (combo de serviços) compartilham o grupo
+    grupo = models.UUIDField(null=True, blank=True, editable=False, db_index=True)
     
     data = models.DateField()
     hora_inicio = models.TimeField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=AGENDADO)
+    created_at = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+    confirmado_em = models.DateTimeField(null=True, blank=True)
+    cancelado_em = models.DateTimeField(null=True, blank=True)
+    # Quando foi marcado como concluído ou não compareceu
+    finalizado_em = models.DateTimeField(null=True, blank=True)
+
+    # Documento normalizado para a busca do painel (scheduling/busca.py)
+    busca = models.TextField(blank=True, default='', editable=False)
+
+    objects = AppointmentQuerySet.as_manager()
     
     class Meta:
-        unique_together = ('professional', 'data', 'hora_inicio')
+        constraints = [
+            # Cancelados não bloqueiam o horário para um novo agendamento
+            models.UniqueConstraint(
+                fields=['professional', 'data', 'hora_inicio'],
+                condition=Q(status__in=['agendado', 'confirmado']),
+                name='agendamento_horario_ativo_unico',
+            ),
+        ]
+        indexes = [
+            # O índice da constraint acima já atende (professional, data); este cobre as consultas por salão/dia
+            models.Index(fields=['salon', 'data'], condition=Q(status__in=['agendado', 'confirmado']), name='agend_salao_data_ativo_idx'),
+            # Filtro/date_hierarchy por data no admin, que atravessa salões e status
+            models.Index(fields=['data'], name='agendamento_data_idx'),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Status lido do banco: os receivers de post_save comparam com ele para saber qual foi a transição
+        self._status_original = self.__dict__.get('status')
+
+    def __str__(self):
+        return f"{self.cliente_nome} - {self.data} {self.hora_inicio}"
+
+    def save(self, *args, **kwargs):
+        # Vincula (ou cria) o cliente pelo WhatsApp; troca de número troca o vínculo
+        if self.cliente_whatsapp and 'update_fields' not in kwargs:
+            from .clientes import normalizar_telefone, registrar_cliente
+            if not self.customer_id or self.customer.whatsapp != normalizar_telefone(self.cliente_whatsapp):
+                self.customer = registrar_cliente(self.salon_id, self.cliente_nome, self.cliente_whatsapp)
+        if 'update_fields' not in kwargs:
+            from .busca import documento_busca
+            self.busca = documento_busca(self)
+        # Na mesma transação que o que os signals gravam (lembretes, outbox de webhooks)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        self._status_original = self.status
+
+    @property
+    def ativo(self):
+        return self.status in self.STATUS_ATIVOS
+
+    def alterar_status(self, novo, agora=None):
+        """Aplica a transição de status e grava. Levanta ValidationError se não for permitida."""
+        agora = agora or timezone.now()
+        if novo == self.status:
+            return
+        if novo not in self.TRANSICOES.get(self.status, ()):
+            raise ValidationError(f"Não é possível mudar de '{self.get_status_display()}' para '{dict(self.STATUS_CHOICES).get(novo, novo)}'.")
+        if novo in (self.CONCLUIDO, self.NAO_COMPARECEU):
+            inicio = timezone.make_aware(datetime.combine(self.data, self.hora_inicio))
+            if inicio > agora:
+                raise ValidationError("O atendimento ainda não começou.")
+
+        campos = ['status', 'atualizado_em']
+        if novo == self.CONFIRMADO:
+            self.confirmado_em = agora
+            campos.append('confirmado_em')
+        elif novo == self.CANCELADO:
+            self.cancelado_em = agora
+            campos.append('cancelado_em')
+        else:
+            self.finalizado_em = agora
+            campos.append('finalizado_em')
+        self.status = novo
+        self.save(update_fields=campos)
+
+class AppointmentArquivado(models.Model):
+    """Agendamentos antigos, movidos da tabela quente por scheduling/arquivo.py.
+
+    Guarda nome/preço do serviço e nome do profissional da época, para o
+    histórico continuar legível mesmo que eles sejam alterados ou removidos.
+    """
+    id_original = models.BigIntegerField(unique=True)
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='+')
+    professional = models.ForeignKey(Professional, on_delete=models.SET_NULL, null=True, related_name='+')
+    service = models.ForeignKey(Service, on_delete=models.SET_NULL, null=True, related_name='+')
+    nome_profissional = models.CharField(max_length=100, blank=True)
+    nome_servico = models.CharField(max_length=100, blank=True)
+    preco_servico = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+
+    cliente_nome = models.CharField(max_length=255)
+    cliente_whatsapp = models.CharField(max_length=20)
+    customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, related_name='+')
+    codigo_validacao = models.CharField(max_length=10, blank=True, null=True)
+    data = models.DateField()
+    hora_inicio = models.TimeField()
+    status = models.CharField(max_length=20, choices=Appointment.STATUS_CHOICES)
+
+    created_at = models.DateTimeField()
+    confirmado_em = models.DateTimeField(null=True, blank=True)
+    cancelado_em = models.DateTimeField(null=True, blank=True)
+    finalizado_em = models.DateTimeField(null=True, blank=True)
+    arquivado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['salon', 'data'], name='arquivo_salao_data_idx')]
+
+    def __str__(self):
+        return f"{self.cliente_nome} - {self.data} {self.hora_inicio} (arquivado)"
+
+class AgendaLock(models.Model):
+    """Uma linha por profissional/dia, usada só para serializar reservas concorrentes.
+
+    Toda reserva começa com um UPDATE nesta linha dentro da transação
+    (booking/reservas.py): no Postgres isso trava a linha até o commit; no
+    SQLite adquire o lock de escrita do banco.
+    """
+    professional = models.ForeignKey(Professional, on_delete=models.CASCADE, related_name='+')
+    data = models.DateField()
+    versao = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('professional', 'data')
+
+
+class SlotHold(models.Model):
+    """Pré-reserva temporária de um horário escolhido na página pública."""
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE)
+    professional = models.ForeignKey(Professional, on_delete=models.CASCADE, related_name='holds')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, null=True)
+    data = models.DateField()
+    hora_inicio = models.TimeField()
+    duracao_minutos = models.IntegerField()
+    expira_em = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['professional', 'data', 'expira_em'], name='hold_prof_data_idx')]
+
+
+class DisponibilidadeMaterializada(models.Model):
+    """Horários livres pré-calculados de um profissional em um dia (scheduling/materializacao.py).
+
+    Só existe para salões com `disponibilidade_materializada`, numa janela que
+    anda para frente todo dia. `livres` já desconta expediente do salão,
+    intervalos, feriados, folgas e agendamentos ativos; `lotados` guarda, por
+    serviço, os trechos em que algum recurso que ele exige está sem unidade
+    livre. Pré-reservas (holds) não entram: são curtas demais para valer o
+    recálculo e a reserva confere tudo de novo.
+    """
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='+')
+    professional = models.ForeignKey(Professional, on_delete=models.CASCADE, related_name='+')
+    data = models.DateField()
+    # [ini, fim] do WorkingHour do dia em minutos (grade dos horários oferecidos), null se não trabalha
+    grade = models.JSONField(null=True)
+    livres = models.JSONField(default=list)       # [[ini, fim], ...]
+    lotados = models.JSONField(default=dict)      # {"<service_id>": [[ini, fim], ...]}
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['professional', 'data'], name='disp_materializada_unica'),
+        ]
+        indexes = [models.Index(fields=['salon', 'data'], name='disp_materializada_salao_idx')]
+
+
+class CalendarFeed(models.Model):
+    """Link secreto de um feed .ics (somente leitura) com a agenda do salão ou de um profissional.
+
+    Quem tem o link vê os agendamentos, então ele é revogado apagando a linha.
+    """
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='calendar_feeds')
+    # Vazio = agenda do salão inteiro
+    professional = models.ForeignKey(Professional, on_delete=models.CASCADE, null=True, blank=True, related_name='calendar_feeds')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Feed {self.professional or self.salon}"
+
+
+class WaitlistEntry(models.Model):
+    """Cliente na lista de espera de um serviço (ver booking/lista_espera.py).
+
+    Profissional vazio aceita qualquer um que faça o serviço; hora_inicio/
+    hora_fim vazios aceitam qualquer horário do dia. Continua AGUARDANDO
+    depois de avisado: só sai da lista quando confirma uma vaga ou desiste.
+    """
+    AGUARDANDO = 'aguardando'
+    ATENDIDO = 'atendido'
+    CANCELADO = 'cancelado'
+    STATUS_CHOICES = [
+        (AGUARDANDO, 'Aguardando'),
+        (ATENDIDO, 'Atendido'),
+        (CANCELADO, 'Cancelado'),
+    ]
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='lista_espera')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='+')
+    professional = models.ForeignKey(Professional, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    cliente_nome = models.CharField(max_length=255)
+    cliente_whatsapp = models.CharField(max_length=20)
+
+    data_inicio = models.DateField()
+    data_fim = models.DateField()
+    hora_inicio = models.TimeField(null=True, blank=True)
+    hora_fim = models.TimeField(null=True, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=AGUARDANDO)
+    avisos = models.IntegerField(default=0)
+    avisado_em = models.DateTimeField(null=True, blank=True)
+    # Agendamento criado quando o cliente confirmou uma vaga oferecida
+    appointment = models.ForeignKey(Appointment, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(condition=Q(data_inicio__lte=models.F('data_fim')), name='espera_janela_valida'),
+            models.CheckConstraint(
+                condition=Q(hora_inicio__isnull=True) | Q(hora_fim__isnull=True) | Q(hora_inicio__lt=models.F('hora_fim')),
+                name='espera_faixa_valida',
+            ),
+        ]
+        indexes = [
+            # Vaga aberta em (salão, serviço, dia D): só entradas aguardando com data_fim >= D.
+            # Quem já passou da janela sai da faixa pesquisada sem precisar de limpeza.
+            models.Index(fields=['salon', 'service', 'data_fim'], condition=Q(status='aguardando'), name='espera_salao_servico_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.cliente_nome} - {self.data} {self.hora_inicio}"
\ No newline at end of file
+        return f"{self.cliente_nome} - {self.data_inicio} a {self.data_fim} (espera)"
@@ -0,0 +1,146 @@
+"""Mapa de ocupação (profissional × dia × minuto) com NumPy, para relatórios de períodos longos.
+
+A Agenda (agenda.py) responde bem perguntas de um dia; para um heatmap de
+dois meses inteiros, checar horário a horário em Python vira milhões de
+comparações. Aqui cada fonte (expediente, intervalos, feriados, folgas,
+agendamentos) vira um vetor de intervalos e é "pintada" de uma vez:
+
+    diferenças[p, d, ini] += 1; diferenças[p, d, fim] -= 1; cumsum no eixo dos minutos
+
+O resultado é agregado em faixas de `faixa` minutos (padrão 15):
+
+    mapa = MapaOcupacao(salao, date(2026, 1, 1), date(2026, 2, 28))
+    mapa.aberto      # minutos de trabalho disponíveis em cada (prof, dia, faixa)
+    mapa.agendado    # desses, minutos com agendamento
+    mapa.ocupacao()  # agendado / aberto por faixa (NaN onde não há expediente)
+
+As regras são as mesmas da Agenda (expediente limitado pelo horário do
+salão, feriado/folga sem hora bloqueia o dia todo, agendamento sem serviço
+dura DURACAO_PADRAO); `manage.py benchmark_ocupacao` confere as duas.
+"""
+import numpy as np
+
+from .agenda import DURACAO_PADRAO, horario_do_salao, intervalos_fixos, minutos
+from .models import Appointment, Holiday, Professional, SpecialSchedule
+
+MINUTOS_DIA = 24 * 60
+
+# Para relatório, atendimento concluído ou falta também ocupou o horário
+STATUS_OCUPAM = Appointment.STATUS_ATIVOS + (Appointment.CONCLUIDO, Appointment.NAO_COMPARECEU)
+
+
+def pintar(forma, p, d, ini, fim):
+    """Máscara bool (P, D, MINUTOS_DIA) com [ini, fim) marcado em cada (p[i], d[i])."""
+    diferencas = np.zeros(forma[:2] + (MINUTOS_DIA + 1,), dtype=np.int16)
+    if len(p):
+        np.add.at(diferencas, (p, d, ini), 1)
+        np.add.at(diferencas, (p, d, fim), -1)
+    return np.cumsum(diferencas[:, :, :MINUTOS_DIA], axis=2, dtype=np.int16) > 0
+
+
+def _vetores(linhas):
+    """[(p, d, ini, fim)] -> quatro arrays, descartando intervalos vazios."""
+    if not linhas:
+        return (np.zeros(0, dtype=np.intp),) * 4
+    p, d, ini, fim = (np.asarray(c, dtype=np.intp) for c in zip(*linhas))
+    ini, fim = np.clip(ini, 0, MINUTOS_DIA), np.clip(fim, 0, MINUTOS_DIA)
+    validos = ini < fim
+    return p[validos], d[validos], ini[validos], fim[validos]
+
+
+class MapaOcupacao:
+    """Ocupação de [inicio, fim] (datas inclusivas) em 6 queries, qualquer que seja o período."""
+
+    def __init__(self, salao, inicio, fim, profissionais=None, faixa=15, status=STATUS_OCUPAM):
+        if MINUTOS_DIA % faixa:
+            raise ValueError("A faixa precisa dividir o dia em partes iguais (ex: 10, 15, 30, 60).")
+        self.salao = salao
+        self.inicio = inicio
+        self.fim = fim
+        self.faixa = faixa
+
+        profs = Professional.objects.filter(salon=salao).prefetch_related('working_hours', 'breaks').order_by('nome', 'id')
+        if profissionais is not None:
+            profs = profs.filter(id__in=[getattr(p, 'id', p) for p in profissionais])
+        self.profissionais = list(profs)
+        self.datas = np.arange(np.datetime64(inicio, 'D'), np.datetime64(fim, 'D') + 1)
+        forma = (len(self.profissionais), len(self.datas))
+        indice = {prof.id: i for i, prof in enumerate(self.profissionais)}
+        # datetime64 conta dias desde 1970-01-01 (quinta): +3 dá 0=segunda, como date.weekday()
+        dias_semana = (self.datas.astype(np.int64) + 3) % 7
+
+        def dia(datas):
+            return (np.asarray(datas, dtype='datetime64[D]') - self.datas[0]).astype(np.intp)
+
+        # Expediente: jornada do dia da semana ∩ horário do salão, expandida para todas as datas daquele dia
+        salao_dia = [horario_do_salao(salao, ds) for ds in range(7)]
+        jornadas, pausas = [], []
+        for prof in self.profissionais:
+            for wh in prof.working_hours.all():
+                horario = salao_dia[wh.day_of_week] if 0 <= wh.day_of_week < 7 else None
+                if horario:
+                    jornadas.append((indice[prof.id], wh.day_of_week, max(minutos(wh.start_time), horario[0]), min(minutos(wh.end_time), horario[1])))
+            for ds in range(7):
+                pausas += [(indice[prof.id], ds, i, f) for i, f in intervalos_fixos(prof, ds)]
+        self.expediente = pintar(forma, *self._por_dia_da_semana(jornadas, dias_semana))
+        bloqueios = [self._por_dia_da_semana(pausas, dias_semana)]
+
+        # Feriados valem para todos; sem hora = o dia todo (com hora de início e sem fim, a Agenda ignora)
+        feriados = []
+        for data, hora_inicio, hora_fim in Holiday.objects.filter(salon=salao, data__range=(inicio, fim)).values_list('data', 'hora_inicio', 'hora_fim'):
+            if hora_inicio and not hora_fim:
+                continue
+            ini, f = (minutos(hora_inicio), minutos(hora_fim)) if hora_inicio else (0, MINUTOS_DIA)
+            feriados += [(p, dia([data])[0], ini, f) for p in range(forma[0])]
+        bloqueios.append(_vetores(feriados))
+
+        folgas = SpecialSchedule.objects.filter(salon=salao, professional_id__in=indice, data__range=(inicio, fim))
+        bloqueios.append(_vetores([
+            (indice[prof_id], d, *((minutos(hi), minutos(hf)) if hi else (0, MINUTOS_DIA)))
+            for prof_id, d, hi, hf in zip(*self._colunas(folgas.values_list('professional_id', 'data', 'hora_inicio', 'hora_fim'), dia))
+            if not hi or hf
+        ]))
+        self.bloqueado = pintar(forma, *(np.concatenate(v) for v in zip(*bloqueios)))
+
+        agendamentos = (
+            Appointment.objects.filter(salon=salao, professional_id__in=indice, data__range=(inicio, fim), status__in=status)
+            .values_list('professional_id', 'data', 'hora_inicio', 'service__duracao_minutos')
+        )
+        linhas = []
+        for prof_id, d, hora, duracao in zip(*self._colunas(agendamentos, dia)):
+            ini = minutos(hora)
+            linhas.append((indice[prof_id], d, ini, ini + (duracao or DURACAO_PADRAO)))
+        self.agendamentos = pintar(forma, *_vetores(linhas))
+
+        aberto = self.expediente & ~self.bloqueado
+        agendado = aberto & self.agendamentos
+        por_faixa = forma + (MINUTOS_DIA // faixa, faixa)
+        self.aberto = aberto.reshape(por_faixa).sum(axis=3, dtype=np.int16)
+        self.agendado = agendado.reshape(por_faixa).sum(axis=3, dtype=np.int16)
+
+    @staticmethod
+    def _por_dia_da_semana(linhas, dias_semana):
+        """[(p, dia_da_semana, ini, fim)] -> vetores (p, d, ini, fim) com uma entrada por data daquele dia."""
+        p, ds, ini, fim = _vetores(linhas)
+        casa = ds[:, None] == dias_semana[None, :]          # (intervalos × datas)
+        linha, d = np.nonzero(casa)
+        return p[linha], d, ini[linha], fim[linha]
+
+    @staticmethod
+    def _colunas(values_list, dia):
+        linhas = list(values_list)
+        if not linhas:
+            return [], [], [], []
+        colunas = [list(c) for c in zip(*linhas)]
+        colunas[1] = dia(colunas[1])
+        return colunas
+
+    def ocupacao(self):
+        """agendado / aberto por (prof, dia, faixa); NaN onde não há minuto aberto."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.aberto > 0, self.agendado / self.aberto, np.nan)
+
+    def faixas_com_expediente(self):
+        """(primeira, última+1) faixa com algum minuto aberto no período, para recortar o heatmap."""
+        usadas = np.nonzero(self.aberto.any(axis=(0, 1)))[0]
+        return (int(usadas[0]), int(usadas[-1]) + 1) if len(usadas) else (0, 0)
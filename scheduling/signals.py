@@ -0,0 +1,157 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from core.models import Salon
+from core.tenant import invalidar_salao
+from core.versoes import AGENDA, CATALOGO, incrementar_versao
+from .clientes import atualizar_estatisticas
+from .horarios import grade_padrao, gravar_grade_do_salao
+from .materializacao import agendar_recalculo
+from .models import (
+    Appointment, Category, DisponibilidadeMaterializada, Holiday, OpeningHour, Professional, ProfessionalBreak, Resource,
+    Service, SpecialSchedule, WorkingHour,
+)
+
+
+# --- VERSÃO DO CATÁLOGO (invalida os fragmentos cacheados do painel) ---
+
+@receiver([post_save, post_delete], sender=Salon)
+def _salao_alterado(sender, instance, **kwargs):
+    incrementar_versao(CATALOGO, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Service)
+@receiver([post_save, post_delete], sender=Professional)
+@receiver([post_save, post_delete], sender=Holiday)
+@receiver([post_save, post_delete], sender=SpecialSchedule)
+@receiver([post_save, post_delete], sender=OpeningHour)
+def _catalogo_alterado(sender, instance, **kwargs):
+    incrementar_versao(CATALOGO, instance.salon_id)
+
+
+@receiver([post_save, post_delete], sender=WorkingHour)
+@receiver([post_save, post_delete], sender=ProfessionalBreak)
+def _escala_alterada(sender, instance, **kwargs):
+    salon_id = Professional.objects.filter(pk=instance.professional_id).values_list('salon_id', flat=True).first()
+    incrementar_versao(CATALOGO, salon_id)
+
+
+@receiver([post_save, post_delete], sender=Appointment)
+def _agenda_alterada(sender, instance, **kwargs):
+    # Feeds .ics usam a versão como ETag. De novo depois do commit: um poll no meio
+    # da transação leu o corpo antigo com a versão nova e ficaria recebendo 304
+    salon_id = instance.salon_id
+    incrementar_versao(AGENDA, salon_id)
+    transaction.on_commit(lambda: incrementar_versao(AGENDA, salon_id))
+
+
+@receiver(m2m_changed, sender=Professional.services.through)
+def _servicos_do_profissional_alterados(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        # instance pode ser um Professional ou um Service, ambos têm salon_id
+        incrementar_versao(CATALOGO, instance.salon_id)
+
+
+# --- HORÁRIO DE FUNCIONAMENTO ---
+
+@receiver(post_save, sender=Salon)
+def _salao_criado(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        gravar_grade_do_salao(instance, grade_padrao(instance))
+
+
+@receiver([post_save, post_delete], sender=OpeningHour)
+def _horario_do_salao_alterado(sender, instance, **kwargs):
+    # O Tenant guarda a grade da semana já interpretada
+    invalidar_salao(instance.salon_id)
+
+
+# --- ESTATÍSTICAS DO CLIENTE ---
+
+@receiver(post_save, sender=Appointment)
+def _agendamento_do_cliente_gravado(sender, instance, raw=False, **kwargs):
+    if not raw and instance.customer_id:
+        atualizar_estatisticas(instance.customer_id)
+
+
+# --- BUSCA (o documento de busca dos agendamentos leva nome do serviço/profissional) ---
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Professional)
+def _nome_para_busca_alterado(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created or (update_fields is not None and 'nome' not in update_fields):
+        return
+    from jobs.fila import enfileirar
+    campo = 'service_id' if sender is Service else 'professional_id'
+    enfileirar('scheduling.reindexar_busca', {campo: instance.pk}, salon=instance.salon_id, chave=f'busca:{campo}:{instance.pk}')
+
+
+# --- DISPONIBILIDADE MATERIALIZADA (só recalcula os profissionais/dias afetados) ---
+
+@receiver(post_init, sender=Appointment)
+@receiver(post_init, sender=Holiday)
+@receiver(post_init, sender=SpecialSchedule)
+def _guardar_dia_original(sender, instance, **kwargs):
+    # Ao editar, o dia/profissional de onde o registro saiu também muda. Lê do
+    # __dict__ para não disparar query em campos adiados (.only()/.defer()).
+    instance._dia_original = (instance.__dict__.get('professional_id'), instance.__dict__.get('data'))
+
+
+def _dias_afetados(instance):
+    prof_original, data_original = getattr(instance, '_dia_original', (None, None))
+    dias = {(getattr(instance, 'professional_id', None), instance.data)}
+    if data_original:
+        dias.add((prof_original, data_original))
+    return dias
+
+
+@receiver([post_save, post_delete], sender=Appointment)
+@receiver([post_save, post_delete], sender=SpecialSchedule)
+def _agenda_do_profissional_alterada(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for prof_id, data in _dias_afetados(instance):
+        agendar_recalculo(instance.salon_id, [data], prof_id, service_id=getattr(instance, 'service_id', None))
+    instance._dia_original = (instance.professional_id, instance.data)
+
+
+@receiver([post_save, post_delete], sender=Holiday)
+def _feriado_alterado(sender, instance, raw=False, **kwargs):
+    if not raw:
+        agendar_recalculo(instance.salon_id, [data for _, data in _dias_afetados(instance)])
+        instance._dia_original = (None, instance.data)
+
+
+@receiver([post_save, post_delete], sender=WorkingHour)
+@receiver([post_save, post_delete], sender=ProfessionalBreak)
+def _expediente_alterado(sender, instance, raw=False, **kwargs):
+    if not raw:
+        salon_id = Professional.objects.filter(pk=instance.professional_id).values_list('salon_id', flat=True).first()
+        agendar_recalculo(salon_id, professional_id=instance.professional_id)
+
+
+@receiver([post_save, post_delete], sender=Service)
+@receiver([post_save, post_delete], sender=Resource)
+@receiver([post_save, post_delete], sender=OpeningHour)
+def _duracao_ou_recurso_alterado(sender, instance, raw=False, created=False, **kwargs):
+    # Serviço novo ainda não tem agendamento; os demais mudam duração/uso de recurso/horário de todo o salão
+    if not raw and not (sender is Service and created):
+        agendar_recalculo(instance.salon_id)
+
+
+@receiver(m2m_changed, sender=Service.recursos.through)
+def _recursos_do_servico_alterados(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        agendar_recalculo(instance.salon_id)
+
+
+@receiver(post_save, sender=Salon)
+def _configuracao_do_salao_alterada(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.disponibilidade_materializada:
+        agendar_recalculo(instance.pk)
+    else:
+        DisponibilidadeMaterializada.objects.filter(salon=instance).delete()
@@ -0,0 +1,42 @@
+from jobs.fila import tarefa
+from .models import Professional
+
+
+@tarefa('scheduling.gerar_miniaturas', max_tentativas=3)
+def gerar_miniaturas_profissional(professional_id):
+    from .miniaturas import gerar_miniaturas
+    prof = Professional.objects.filter(pk=professional_id).first()
+    if prof is None:
+        return None
+    return sorted(gerar_miniaturas(prof))
+
+
+@tarefa('scheduling.arquivar_agendamentos', max_tentativas=3)
+def arquivar_agendamentos(max_lotes=20, tamanho_lote=500):
+    """Arquiva uma fatia e, se ainda sobrou, se reenfileira (não prende o worker)."""
+    from jobs.fila import enfileirar
+    from .arquivo import arquivar_agendamentos as arquivar
+    movidos, terminou = arquivar(tamanho_lote=tamanho_lote, max_lotes=max_lotes)
+    if not terminou:
+        enfileirar('scheduling.arquivar_agendamentos', {'max_lotes': max_lotes, 'tamanho_lote': tamanho_lote},
+                   chave='arquivar_agendamentos')
+    return {'movidos': movidos, 'terminou': terminou}
+
+
+@tarefa('scheduling.reindexar_busca', max_tentativas=3)
+def reindexar_busca(professional_id=None, service_id=None):
+    from .busca import reindexar
+    return {'alterados': reindexar(professional_id=professional_id, service_id=service_id)}
+
+
+@tarefa('scheduling.materializar_disponibilidade', max_tentativas=3)
+def materializar_disponibilidade(salon_id, professional_id=None, datas=None):
+    """Recalcula a disponibilidade materializada dos dias afetados (datas=None: a janela toda)."""
+    from datetime import date
+    from core.models import Salon
+    from .materializacao import recalcular
+    salao = Salon.objects.filter(pk=salon_id, disponibilidade_materializada=True).first()
+    if salao is None:
+        return {'gravadas': 0}
+    datas = [date.fromisoformat(d) for d in datas] if datas is not None else None
+    return {'gravadas': recalcular(salao, datas, professional_id=professional_id)}
@@ -0,0 +1,11 @@
+from django import template
+
+from scheduling.miniaturas import url_miniatura
+
+register = template.Library()
+
+
+@register.simple_tag
+def miniatura_url(professional, tamanho, formato="webp"):
+    """Uso: {% miniatura_url a.professional 64 'jpg' %}"""
+    return url_miniatura(professional, int(tamanho), formato) or ''
@@ -1,5 +1,7 @@
 from django.urls import path
+from . import views
 
 urlpatterns = [
-    # Cole suas rotas aqui
+    # Feed .ics assinado pelos apps de calendário (o token é o único controle de acesso)
+    path('feeds/<uuid:token>.ics', views.feed_calendario, name='feed_calendario'),
 ]
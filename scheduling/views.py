@@ -1,3 +1,25 @@
-from django.shortcuts import render
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
 
-# Create your views here.
+from .ics import etag_feed, gerar_feed
+from .models import CalendarFeed
+
+
+@require_safe
+def feed_calendario(request, token):
+    """Feed .ics somente leitura (link secreto). Sem mudanças desde o último poll: 304 sem ler os agendamentos."""
+    feed = CalendarFeed.objects.select_related('salon', 'professional').filter(token=token).first()
+    if feed is None:
+        raise Http404
+    etag = etag_feed(feed)
+    nao_mudou = get_conditional_response(request, etag=etag)
+    if nao_mudou is not None:
+        nao_mudou['Cache-Control'] = 'private, max-age=300'
+        return nao_mudou
+
+    response = StreamingHttpResponse(gerar_feed(feed), content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=300'
+    response['Content-Disposition'] = 'inline; filename="agenda.ics"'
+    return response
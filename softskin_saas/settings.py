@@ -24,6 +24,8 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # WhiteNoise também no runserver, para o dev servir estáticos igual à produção
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
 
     # MEUS APPS
@@ -31,26 +33,38 @@ INSTALLED_APPS = [
     'scheduling',
     'dashboard',
     'booking',
+    'jobs',
+    'notifications',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.ServerTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.tenant.TenantMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'softskin_saas.urls'
 
+_TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Em produção os templates compilados ficam em memória (cached loader);
+            # em DEBUG são relidos do disco a cada request.
+            'loaders': _TEMPLATE_LOADERS if DEBUG else [('django.template.loaders.cached.Loader', _TEMPLATE_LOADERS)],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -63,11 +77,32 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'softskin_saas.wsgi.application'
 
+# Cache (fragmentos do painel, versões por salão). Redis quando configurado,
+# senão memória local do processo — que NÃO é compartilhada entre workers do
+# gunicorn: em produção com mais de um worker, defina REDIS_URL.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'softskin',
+        }
+    }
+
 # Database
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # BEGIN IMMEDIATE: transações pegam o lock de escrita logo no início,
+        # evitando "database is locked" em reservas concorrentes
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
@@ -93,6 +128,24 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Destino do `collectstatic` (servido pelo WhiteNoise em produção)
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Manifest com hash no nome + variantes .gz/.br geradas no collectstatic
+# (o .br exige o pacote Brotli). Arquivos com hash recebem do WhiteNoise
+# Cache-Control: max-age=315360000, public, immutable.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+# Arquivos sem hash (ex: favicon) ficam 1h em cache
+WHITENOISE_MAX_AGE = 0 if DEBUG else 3600
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -114,4 +167,83 @@ LOGIN_REDIRECT_URL = '/api/v1/app'
 LOGOUT_REDIRECT_URL = '/api/v1/login/'
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# =========================================================
+# FILA DE JOBS (app 'jobs', executada por `manage.py runworker`)
+# =========================================================
+JOBS_LIMITE_POR_SALAO = 2          # jobs simultâneos de um mesmo salão
+JOBS_BACKOFF_BASE_SEGUNDOS = 10    # 10s, 20s, 40s... entre tentativas
+JOBS_BACKOFF_MAXIMO_SEGUNDOS = 3600
+JOBS_TIMEOUT_SEGUNDOS = 600        # job EXECUTANDO há mais tempo volta para a fila
+JOBS_EXECUTAR_NA_HORA = False      # True executa no próprio request (útil sem worker)
+
+# Backend de envio de WhatsApp/SMS (ver notifications/senders.py)
+MENSAGENS_SENDER = 'notifications.senders.ConsoleSender'
+
+# Lembretes de agendamento (app 'notifications', `manage.py enviar_lembretes`)
+LEMBRETES_HORAS_ANTES = (24,)      # um lembrete para cada antecedência
+LEMBRETES_LIMITE_POR_MINUTO = 30   # mensagens por salão por minuto
+LEMBRETES_MAX_TENTATIVAS = 3
+
+# Webhooks de agendamento (notifications/webhooks.py; entregues pelo runworker)
+WEBHOOKS_LOTE = 50                     # eventos por POST
+WEBHOOKS_TIMEOUT_SEGUNDOS = 10
+WEBHOOKS_BACKOFF_BASE_SEGUNDOS = 30    # 30s, 1min, 2min... entre tentativas do endpoint
+WEBHOOKS_BACKOFF_MAXIMO_SEGUNDOS = 6 * 3600
+WEBHOOKS_MAX_FALHAS = 12               # falhas seguidas até desativar o endpoint
+WEBHOOKS_RETENCAO_DIAS = 30            # eventos entregues e log (`manage.py limpar_webhooks`)
+WEBHOOKS_PERMITIR_HTTP = DEBUG         # em produção, só https
+
+# Pré-reserva (hold) de horário na página pública
+HOLD_MINUTOS = 5
+
+# Agendamentos mais antigos que isso vão para a tabela de arquivo (`manage.py arquivar_agendamentos`)
+ARQUIVO_AGENDAMENTOS_DIAS = 180
+
+# Dias à frente mantidos na disponibilidade materializada (salões com Salon.disponibilidade_materializada)
+DISPONIBILIDADE_MATERIALIZADA_DIAS = 30
+
+# Janela dos feeds .ics de agenda (scheduling/ics.py), em dias antes e depois de hoje
+CALENDARIO_FEED_DIAS_ANTES = 30
+CALENDARIO_FEED_DIAS_DEPOIS = 90
+
+# Lista de espera (booking/lista_espera.py): até quantos dias à frente o cliente pode esperar
+# e quantos clientes são avisados de cada horário que vaga (o primeiro a confirmar leva)
+LISTA_ESPERA_DIAS_MAXIMO = 60
+LISTA_ESPERA_AVISOS_POR_VAGA = 5
+# Endereço público do site (ex: https://app.softskin.com.br), para os links das mensagens.
+# Obrigatório para os avisos da lista de espera: sem ele o job falha em vez de mandar link relativo
+URL_PUBLICA = os.environ.get('URL_PUBLICA', '')
+
+# Limite de taxa das rotas públicas (core/limite.py), por salão + IP: (rajada, fichas repostas por minuto).
+# Rota fora do dicionário (ou com None) não tem limite.
+LIMITES_REQUISICAO = {
+    'disponibilidade': (60, 120),
+    'reservar': (10, 20),
+    'agendar': (5, 10),
+    'lista_espera': (5, 10),
+}
+# Só ligue atrás de um proxy que acrescenta o IP real no X-Forwarded-For
+LIMITE_CONFIAR_X_FORWARDED_FOR = False
+
+# Medição de requests (core.middleware.ServerTimingMiddleware)
+SERVER_TIMING_HEADER = True
+SERVER_TIMING_AMOSTRAGEM = 1.0 if DEBUG else 0.05  # fração com medição de SQL
+REQUISICAO_LENTA_MS = 500
+REQUISICAO_LENTA_TOP_QUERIES = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'softskin.requisicao_lenta': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# /metrics (Prometheus): se definido, exige 'Authorization: Bearer <token>'.
+# Com DEBUG=False e sem token o endpoint responde 404: defina-o em produção.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
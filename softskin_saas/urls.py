@@ -29,11 +29,14 @@ urlpatterns = [
     # O arquivo booking/urls.py deve conter apenas as rotas de agendar
     path('agendar/', include('booking.urls')), 
     
+    # Métricas para o Prometheus
+    path('metrics', views.metrics_view, name='metrics'),
+
     # Redirecionamento da raiz (opcional)
     path('', redirect_to_login, name='root_redirect'),
 ]
 
-# Configuração para arquivos de mídia e estáticos em ambiente de desenvolvimento
+# Estáticos são servidos pelo WhiteNoise (ver settings.MIDDLEWARE).
+# Mídia enviada pelos usuários só é servida pelo Django em desenvolvimento.
 if settings.DEBUG:
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -0,0 +1,536 @@
+function getJsonData(id) {
+    try {
+        const el = document.getElementById(id);
+        return el ? JSON.parse(el.textContent) : [];
+    } catch (e) { return []; }
+}
+
+const SERVICOS = getJsonData('SERVICOS_JSON');
+const PROFISSIONAIS_ALL = getJsonData('PROFISSIONAIS_JSON');
+const rawFeriados = getJsonData('FERIADOS_JSON');
+const FERIADOS = Array.isArray(rawFeriados) ? rawFeriados : [];
+const rawFolgas = getJsonData('FOLGAS_JSON');
+const FOLGAS = Array.isArray(rawFolgas) ? rawFolgas : [];
+const rawDias = getJsonData('DIAS_FECHADOS_JSON');
+const DIAS_FECHADOS = Array.isArray(rawDias) ? rawDias : [];
+
+const CONFIG_PAGINA = getJsonData('CONFIG_JSON');
+const SLUG = CONFIG_PAGINA.slug;
+const BASE_URL = "/agendar/saloes/" + SLUG;
+const THEME_HEX = (getComputedStyle(document.documentElement).getPropertyValue('--cor-primaria').trim().replace('#','') || 'D81B60');
+
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+let selectedService = null;
+let selectedServiceName = "Serviço";
+let selectedProfessional = null;
+let selectedDate = null;
+let selectedTime = null;
+let holdToken = null;
+let mesAtual = new Date();
+
+window.addEventListener('DOMContentLoaded', () => {
+    const firstCatBtn = document.querySelector('.cat-btn');
+    if(firstCatBtn) filtrarCategoria(firstCatBtn);
+    updateStepper(1);
+    document.querySelectorAll('.service-card').forEach((card, index) => {
+        card.style.animationDelay = `${index * 0.1}s`;
+    });
+    abrirOfertaListaEspera();
+});
+
+function updateStepper(currentStep) {
+    for (let i = 1; i <= 4; i++) {
+        const stepEl = document.querySelector(`.step-${i}`);
+        const spanEl = stepEl.querySelector('span');
+
+        spanEl.classList.remove('bg-theme', 'text-white');
+        spanEl.classList.add('bg-theme-light', 'text-theme');
+        stepEl.classList.remove('active', 'completed');
+
+        if (i < currentStep) {
+            stepEl.classList.add('completed');
+        } else if (i === currentStep) {
+            stepEl.classList.add('active');
+            spanEl.classList.remove('bg-theme-light', 'text-theme');
+            spanEl.classList.add('bg-theme', 'text-white');
+        }
+
+        if (i < 4) {
+            const lineEl = document.querySelector(`.line-${i}`);
+            if (i < currentStep) {
+                lineEl.classList.add('line-completed');
+            } else {
+                lineEl.classList.remove('line-completed');
+            }
+        }
+    }
+}
+
+function filtrarCategoria(btn) {
+    if(!btn) return;
+    resetarEstado(1);
+    document.querySelectorAll('.cat-btn').forEach(b => b.classList.remove('active'));
+    btn.classList.add('active');
+
+    const catId = btn.dataset.id;
+    const cards = document.querySelectorAll('.service-card');
+    let visibleCount = 0;
+
+    cards.forEach(card => {
+        if (card.dataset.cat === catId) {
+            card.style.display = 'flex';
+            visibleCount++;
+            card.classList.remove('animate-pop');
+            void card.offsetWidth;
+            card.classList.add('animate-pop');
+        } else {
+            card.style.display = 'none';
+        }
+    });
+    document.getElementById('msg-sem-servico').style.display = (visibleCount === 0) ? 'block' : 'none';
+    document.getElementById('section-profissionais').classList.add('hidden');
+}
+
+function resetarEstado(nivel) {
+    if (nivel === 1) {
+        selectedService = null;
+        selectedServiceName = null;
+        document.querySelectorAll('.service-card').forEach(c => c.classList.remove('selected-card'));
+    }
+    if (nivel <= 2) {
+        selectedProfessional = null;
+        document.querySelectorAll('.prof-img-container').forEach(c => c.classList.remove('selected-prof', 'border-theme', 'scale-110'));
+        document.getElementById('section-calendario').classList.add('hidden');
+        if (nivel === 1) {
+            const listaProf = document.getElementById('lista-profissionais');
+            if(listaProf) listaProf.innerHTML = '<p class="text-gray-400 italic text-md ml-4 col-span-full">Selecione o serviço acima para ver especialistas...</p>';
+        }
+    }
+    selectedDate = null;
+    selectedTime = null;
+    liberarHold();
+    document.getElementById('section-horarios').classList.add('hidden');
+    document.getElementById('section-finalizar').classList.add('hidden');
+    document.getElementById('lista-horarios').innerHTML = '';
+    document.querySelectorAll('.day-selected').forEach(d => d.classList.remove('day-selected'));
+    updateStepper(1); 
+}
+
+function selecionarServico(id, nome, cardEl) {
+    resetarEstado(2);
+    selectedService = id;
+    selectedServiceName = nome;
+
+    document.querySelectorAll('.service-card').forEach(c => c.classList.remove('selected-card'));
+    cardEl.classList.add('selected-card');
+
+    const container = document.getElementById('lista-profissionais');
+    container.innerHTML = '';
+
+    const profsFiltrados = PROFISSIONAIS_ALL.filter(p => p.servicos.includes(parseInt(id)));
+
+    if (profsFiltrados.length === 0) {
+        container.innerHTML = '<p class="text-aviso font-bold text-md ml-4 col-span-full">Nenhum especialista disponível para este serviço premium.</p>';
+    } else {
+        profsFiltrados.forEach(p => {
+            const div = document.createElement('div');
+            div.className = "prof-card flex-shrink-0 text-center w-full max-w-[200px] cursor-pointer group";
+
+            let imgHtml = p.foto
+                ? `<picture><source type="image/webp" srcset="${p.foto}"><img src="${p.foto_jpg || p.foto}" loading="lazy" class="rounded-full w-full h-full object-cover"></picture>`
+                : `<img src="https://ui-avatars.com/api/?name=${encodeURIComponent(p.nome)}&background=${THEME_HEX}&color=fff&bold=true" class="rounded-full w-full h-full">`;
+
+            let especialidade = p.especialidade || 'Especialista';
+
+            div.innerHTML = `
+                <div class="prof-img-container w-36 h-36 mx-auto rounded-full bg-white mb-4 border-4 border-gray-100 transition-all shadow-md flex items-center justify-center overflow-hidden hover-glow" data-pid="${p.id}">
+                    ${imgHtml}
+                </div>
+                <span class="block text-sm font-black uppercase text-gray-500">${p.nome}</span>
+                <p class="text-xs text-gray-400 mt-1 px-2 line-clamp-2 leading-tight">${especialidade}</p>
+            `;
+            div.onclick = () => {
+                selecionarProfissionalUI(p.id, div);
+            };
+            container.appendChild(div);
+        });
+    }
+
+    document.querySelectorAll('.prof-card').forEach((card, index) => {
+        card.style.animationDelay = `${index * 0.1}s`;
+    });
+
+    const sectionProf = document.getElementById('section-profissionais');
+    sectionProf.classList.remove('hidden');
+    sectionProf.scrollIntoView({behavior:'smooth', block: 'center'});
+    updateStepper(2);
+}
+
+function selecionarProfissionalUI(pid, divEl) {
+    resetarEstado(3);
+    selectedProfessional = pid;
+    document.querySelectorAll('.prof-img-container').forEach(c => c.classList.remove('selected-prof', 'border-theme', 'scale-110'));
+    divEl.querySelector('.prof-img-container').classList.add('selected-prof', 'border-theme', 'scale-110');
+    document.getElementById('section-calendario').classList.remove('hidden');
+    renderizarCalendario();
+    document.getElementById('section-calendario').scrollIntoView({behavior:'smooth'});
+    updateStepper(3);
+}
+
+function renderizarCalendario() {
+    try {
+        const grid = document.getElementById('calendar-grid');
+        grid.innerHTML = '';
+        const diasS = ['Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb'];
+        diasS.forEach(d => grid.innerHTML += `<div class="font-black text-gray-300 text-sm pb-3">${d}</div>`);
+
+        const hoje = new Date();
+        hoje.setHours(0,0,0,0);
+        const ano = mesAtual.getFullYear();
+        const mes = mesAtual.getMonth();
+        const meses = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"];
+
+        document.getElementById('label-mes-ano').innerHTML = `
+            <button onclick="mudarMes(-1)" class="px-3 text-2xl hover:text-theme transition-all">‹</button>
+            <span class="mx-3 text-lg">${meses[mes]} ${ano}</span>
+            <button onclick="mudarMes(1)" class="px-3 text-2xl hover:text-theme transition-all">›</button>
+        `;
+
+        const primeiroDiaExibido = new Date(ano, mes, 1).getDay();
+        const diasNoMes = new Date(ano, mes + 1, 0).getDate();
+
+        for (let j = 0; j < primeiroDiaExibido; j++) { grid.appendChild(document.createElement('div')); }
+
+        const profDados = PROFISSIONAIS_ALL.find(p => p.id === selectedProfessional);
+        const diasTrabalhoProf = (profDados && profDados.dias_trabalho) ? profDados.dias_trabalho : [0,1,2,3,4,5,6];
+        const folgasProf = (profDados && profDados.folgas) ? profDados.folgas : [];
+
+        let bloqueios = {
+            feriados: FERIADOS.map(f => f.data || f),
+            dias_recorrentes: DIAS_FECHADOS
+        };
+
+        for (let d = 1; d <= diasNoMes; d++) {
+            const data = new Date(ano, mes, d);
+            const iso = data.toISOString().split('T')[0];
+            const jsDay = data.getDay();
+            const pythonDay = { 0: 6, 1: 0, 2: 1, 3: 2, 4: 3, 5: 4, 6: 5 }[jsDay];
+
+            const ehPassado = data < hoje;
+            const ehFeriado = bloqueios.feriados.includes(iso);
+            const ehDiaFechadoSalao = bloqueios.dias_recorrentes.includes(pythonDay);
+            const profNaoTrabalha = !diasTrabalhoProf.includes(pythonDay);
+            const ehFolgaProf = folgasProf.includes(iso);
+
+            const estaBloqueado = ehPassado || ehFeriado || ehDiaFechadoSalao || profNaoTrabalha || ehFolgaProf;
+
+            const btn = document.createElement('button');
+            btn.innerText = d;
+            btn.className = `p-4 rounded-2xl font-bold transition-all flex flex-col items-center justify-center h-14 shadow-md border border-gray-100 hover-glow`;
+
+            if (estaBloqueado) {
+                btn.className += ` calendar-day disabled`;
+                btn.disabled = true;
+            } else {
+                btn.className += ` bg-white text-gray-700 hover:bg-theme-light hover:text-theme hover:border-theme cursor-pointer`;
+                if (selectedDate === iso) btn.classList.add('day-selected');
+                btn.onclick = () => {
+                    selectedDate = iso;
+                    renderizarCalendario();
+                    buscarHorarios(iso);
+                };
+            }
+            grid.appendChild(btn);
+        }
+    } catch(e) { console.error("Erro renderizarCalendario:", e); }
+}
+
+function mudarMes(delta) {
+    mesAtual.setMonth(mesAtual.getMonth() + delta);
+    renderizarCalendario();
+}
+
+async function buscarHorarios(iso) {
+    const container = document.getElementById('lista-horarios');
+    document.getElementById('section-horarios').classList.remove('hidden');
+    container.innerHTML = '<p class="col-span-full text-center text-theme font-bold p-6 text-lg">Consultando horários premium...</p>';
+    try {
+        const res = await fetch(`${BASE_URL}/disponibilidade/${iso}?service_id=${selectedService}&professional_id=${selectedProfessional}`);
+        const data = await res.json();
+        const profData = data.find(p => p.professional_id == selectedProfessional);
+        container.innerHTML = '';
+
+        if (!profData || !profData.horarios || profData.horarios.length === 0) {
+            container.innerHTML = '<p class="col-span-full text-center text-gray-400 font-bold p-6 bg-gray-50 rounded-3xl italic text-lg">Nenhum horário premium disponível.</p>';
+            return;
+        }
+
+        profData.horarios.forEach(h => {
+            const btn = document.createElement('button');
+            btn.className = "slot-btn bg-white rounded-3xl py-5 text-md font-black text-gray-700 shadow-md hover-glow";
+            btn.innerText = h;
+            btn.onclick = async () => {
+                // Segura o horário por alguns minutos enquanto o cliente preenche os dados
+                const ok = await reservarHold(iso, h);
+                if (!ok) {
+                    btn.remove();
+                    return mostrarErro("Ops! Esse horário acabou de ser reservado. Escolha outro.");
+                }
+                selectedTime = h;
+                document.querySelectorAll('.slot-btn').forEach(b => b.classList.remove('slot-selected'));
+                btn.classList.add('slot-selected');
+                document.getElementById('section-finalizar').classList.remove('hidden');
+                document.getElementById('section-finalizar').scrollIntoView({behavior:'smooth'});
+                updateStepper(4);
+            };
+            container.appendChild(btn);
+        });
+
+        document.querySelectorAll('.slot-btn').forEach((btn, index) => {
+            btn.style.animationDelay = `${index * 0.1}s`;
+        });
+        document.getElementById('section-horarios').scrollIntoView({behavior:'smooth'});
+    } catch(e) {
+        container.innerHTML = '<p class="col-span-full text-center text-erro text-lg">Erro na consulta premium.</p>';
+    }
+}
+
+async function reservarHold(iso, hora) {
+    liberarHold();
+    try {
+        const res = await fetch(`${BASE_URL}/reservar`, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({ servico_id: selectedService, profissional_id: selectedProfessional, data: iso, horario: hora })
+        });
+        if (res.status === 409) return false;
+        if (res.ok) holdToken = (await res.json()).hold_token;
+    } catch (e) { }
+    // Falha de rede não bloqueia: a confirmação final revalida o horário
+    return true;
+}
+
+function liberarHold() {
+    if (!holdToken) return;
+    fetch(`${BASE_URL}/reservar/${holdToken}`, { method: 'DELETE' }).catch(() => {});
+    holdToken = null;
+}
+
+function mostrarModalSucesso() {
+    const modal = document.getElementById('modal-sucesso');
+    modal.classList.remove('hidden');
+    modal.classList.add('show');
+}
+
+function mostrarErro(mensagem) {
+    document.getElementById('msg-erro-texto').innerText = mensagem;
+    const modal = document.getElementById('modal-erro');
+    modal.classList.remove('hidden');
+    modal.classList.add('show');
+}
+
+function fecharModalErro() {
+    const modal = document.getElementById('modal-erro');
+    modal.classList.add('closing');
+    setTimeout(() => {
+        modal.classList.add('hidden');
+        modal.classList.remove('show', 'closing');
+    }, 300);
+}
+
+async function finalizarReserva() {
+    const nome = document.getElementById('cliente-nome').value;
+    const fone = document.getElementById('cliente-whatsapp').value;
+    if (!nome || fone.length < 14) return mostrarErro("Preencha seu nome e um telefone completo para prosseguir.");
+
+    const btn = document.getElementById('btn-confirmar');
+    btn.disabled = true;
+    btn.innerText = "Processando Premium...";
+
+    const siteKey = CONFIG_PAGINA.turnstile_site_key || '';
+    if (siteKey && typeof turnstile !== 'undefined' && turnstileWidgetId !== null) {
+        try {
+            turnstile.execute(turnstileWidgetId);
+            return;
+        } catch (e) { }
+    }
+    submitAgendamento(null);
+}
+
+async function submitAgendamento(token) {
+    const nome = document.getElementById('cliente-nome').value;
+    const fone = document.getElementById('cliente-whatsapp').value;
+    const btn = document.getElementById('btn-confirmar');
+
+    try {
+        const res = await fetch(`${BASE_URL}/agendar`, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({
+                servico_id: selectedService,
+                profissional_id: selectedProfessional,
+                data: selectedDate,
+                horario: selectedTime,
+                nome_cliente: nome,
+                whatsapp: fone,
+                hold_token: holdToken,
+                turnstile_token: token
+            })
+        });
+        const data = await res.json();
+        if (res.ok) {
+            holdToken = null;
+            mostrarModalSucesso();
+            gerarVoucher(nome, fone, selectedDate, selectedTime, selectedServiceName, data.codigo);
+        } else {
+            mostrarErro(data.message || "Erro no agendamento premium.");
+            btn.disabled = false;
+            btn.innerText = "Confirmar Agendamento Premium";
+        }
+    } catch(e) {
+        mostrarErro("Erro de conexão premium.");
+        btn.disabled = false;
+        btn.innerText = "Confirmar Agendamento Premium";
+    }
+}
+
+// --- LISTA DE ESPERA (link do WhatsApp: ?espera=<token>&profissional=&data=&horario=) ---
+let ofertaEspera = null;
+
+async function abrirOfertaListaEspera() {
+    const params = new URLSearchParams(window.location.search);
+    const token = params.get('espera');
+    if (!token) return;
+    ofertaEspera = {
+        token: token,
+        profissional_id: params.get('profissional'),
+        data: params.get('data'),
+        horario: params.get('horario'),
+    };
+    try {
+        const consulta = new URLSearchParams({ profissional: ofertaEspera.profissional_id, data: ofertaEspera.data, horario: ofertaEspera.horario });
+        const res = await fetch(`${BASE_URL}/lista-espera/${encodeURIComponent(token)}?${consulta}`);
+        const info = await res.json();
+        if (!res.ok) return mostrarErro(info.message || "Link da lista de espera inválido.");
+        if (info.status !== 'aguardando') return mostrarErro("Sua inscrição na lista de espera não está mais ativa.");
+        if (!info.vaga || !info.vaga.disponivel) return mostrarErro("Esse horário já foi preenchido. Você continua na lista de espera e avisaremos da próxima vaga.");
+        ofertaEspera.servico = info.servico;
+        document.getElementById('espera-descricao').innerText =
+            `${info.servico} com ${info.vaga.profissional} em ${info.vaga.data.split('-').reverse().join('/')} às ${info.vaga.horario}.`;
+        const modal = document.getElementById('modal-lista-espera');
+        modal.classList.remove('hidden');
+        modal.classList.add('show');
+    } catch (e) {
+        mostrarErro("Erro de conexão premium.");
+    }
+}
+
+function fecharOfertaListaEspera() {
+    const modal = document.getElementById('modal-lista-espera');
+    modal.classList.add('hidden');
+    modal.classList.remove('show');
+}
+
+async function confirmarVagaListaEspera() {
+    if (!ofertaEspera) return;
+    const btn = document.getElementById('btn-confirmar-espera');
+    btn.disabled = true;
+    btn.innerText = "Confirmando...";
+    try {
+        const res = await fetch(`${BASE_URL}/lista-espera/${encodeURIComponent(ofertaEspera.token)}/confirmar`, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({ profissional_id: ofertaEspera.profissional_id, data: ofertaEspera.data, horario: ofertaEspera.horario })
+        });
+        const data = await res.json();
+        fecharOfertaListaEspera();
+        if (res.ok) {
+            mostrarModalSucesso();
+            gerarVoucher(data.nome_cliente, data.whatsapp, ofertaEspera.data, ofertaEspera.horario, data.servico || ofertaEspera.servico, data.codigo);
+        } else {
+            mostrarErro(data.message || "Não foi possível confirmar o horário.");
+        }
+    } catch (e) {
+        mostrarErro("Erro de conexão premium.");
+    } finally {
+        btn.disabled = false;
+        btn.innerText = "Confirmar Horário";
+    }
+}
+
+let turnstileWidgetId = null;
+function turnstileOnload() {
+    try {
+        const siteKey = CONFIG_PAGINA.turnstile_site_key || '';
+        if (!siteKey) return;
+        turnstileWidgetId = turnstile.render('#turnstile-widget', {
+            sitekey: siteKey, size: 'invisible',
+            callback: submitAgendamento
+        });
+    } catch (e) {}
+}
+
+const phoneInput = document.getElementById('cliente-whatsapp');
+if (phoneInput) {
+    phoneInput.addEventListener('input', function (e) {
+        let v = e.target.value.replace(/\D/g, "");
+        if (v.length > 11) v = v.substring(0, 11);
+        if (v.length > 10) {
+            v = v.replace(/^(\d\d)(\d)(\d{4})(\d{4})/, "($1) $2 $3-$4");
+        } else if (v.length > 5) {
+            v = v.replace(/^(\d\d)(\d{4})(\d{0,4})/, "($1) $2-$3");
+        } else if (v.length > 2) {
+            v = v.replace(/^(\d\d)/, "($1) ");
+        }
+        e.target.value = v;
+    });
+}
+
+function gerarVoucher(nome, tel, data, hora, servico, codigoBackend) {
+    const safeNome = nome || "Cliente";
+    const safeData = data ? data.split('-').reverse().join('/') : "--/--";
+    const safeHora = hora || "--:--";
+    const safeServico = servico || "Serviço";
+
+    document.getElementById('v-nome').innerText = safeNome;
+    document.getElementById('v-tel').innerText = tel;
+    document.getElementById('v-data').innerText = safeData;
+    document.getElementById('v-hora').innerText = safeHora;
+    document.getElementById('v-servico').innerText = safeServico;
+
+    new QRCode(document.getElementById("qrcode-voucher"), {
+        text: codigoBackend || "PENDENTE",
+        width: 128,
+        height: 128,
+        colorDark : "#000000",
+        colorLight : "#ffffff",
+        correctLevel : QRCode.CorrectLevel.H
+    });
+
+    setTimeout(() => {
+        const elemento = document.getElementById('voucher-template');
+        html2canvas(elemento, { scale: 3, backgroundColor: "#ffffff" }).then(canvas => {
+            const imgData = canvas.toDataURL("image/png");
+            document.getElementById('img-ticket-gerado').src = imgData;
+            document.getElementById('loading-ticket').classList.add('hidden');
+            document.getElementById('area-ticket-pronto').classList.remove('hidden');
+            const btnDown = document.getElementById('btn-download-ticket');
+            btnDown.href = imgData;
+            btnDown.download = `Voucher-Premium-${codigoBackend}.png`;
+        });
+    }, 500);
+}